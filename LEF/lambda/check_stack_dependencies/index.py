@@ -1,9 +1,19 @@
 import boto3
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from urllib.request import urlopen, Request, HTTPError
 
-cfn = boto3.client('cloudformation')
+# Maximum number of ListImports calls in flight
+MAX_WORKERS = int(os.environ.get('MAX_WORKERS', '8'))
+
+# Custom resource responses are limited to 4 KB, so long dependency lists are truncated
+MAX_REASON_LENGTH = 3000
+
+# Adaptive retries back off client side when CloudFormation throttles the ListImports fan-out
+cfn = boto3.client('cloudformation', config=Config(retries={'max_attempts': 10, 'mode': 'adaptive'}))
 
 def send_response(event, context, status, reason=None, physical_id=None, data=None):
     body = json.dumps({
@@ -15,32 +25,154 @@ def send_response(event, context, status, reason=None, physical_id=None, data=No
         'LogicalResourceId': event['LogicalResourceId'],
         'Data': data or {}
     })
-    
+
     req = Request(event['ResponseURL'], data=body.encode('utf-8'), headers={'Content-Type': ''}, method='PUT')
     urlopen(req)  # nosec B310 # nosemgrep: python.lang.security.audit.dynamic-urllib-use-detected.dynamic-urllib-use-detected
 
+def get_stack_name(stack_id):
+    """Stack name from a stack ID ('arn:aws:cloudformation:<region>:<account>:stack/<name>/<uuid>')."""
+    return stack_id.split('/')[1] if stack_id.startswith('arn:') else stack_id
+
+def list_exports_by_stack():
+    """
+    List the exports of all stacks in the region.
+
+    Returns:
+    dict: Stack names mapped to the names of their exports.
+    """
+    exports = {}
+    for page in cfn.get_paginator('list_exports').paginate():
+        for export in page['Exports']:
+            exports.setdefault(get_stack_name(export['ExportingStackId']), []).append(export['Name'])
+    return exports
+
+def list_imports(export_name):
+    """
+    List the stacks importing an export, following NextToken.
+
+    Returns:
+    list: Names of the importing stacks.
+    """
+    imports = []
+    try:
+        for page in cfn.get_paginator('list_imports').paginate(ExportName=export_name):
+            imports.extend(page.get('Imports', []))
+    except ClientError as e:
+        # Exports without imports are reported as an error
+        if 'is not imported by any stack' not in str(e) and 'does not exist' not in str(e):
+            raise
+    return imports
+
+class DependencyWalker:
+    """
+    Walk the stacks that depend on a stack through exports, transitively.
+
+    The imports of each export are listed once and cached, and the exports of each level of the
+    graph are listed concurrently.
+    """
+
+    def __init__(self, exports_by_stack):
+        self.exports_by_stack = exports_by_stack
+        self.imports_cache = {}
+
+    def get_imports(self, export_names):
+        missing = [name for name in export_names if name not in self.imports_cache]
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, MAX_WORKERS)) as executor:
+                for name, imports in zip(missing, executor.map(list_imports, missing)):
+                    self.imports_cache[name] = imports
+        return {name: self.imports_cache[name] for name in export_names}
+
+    def walk(self, stack_name):
+        """
+        Build the graph of stacks depending on a stack.
+
+        Args:
+        stack_name (str): Stack being deleted.
+
+        Returns:
+        dict: Names of the stacks in the graph mapped to a dictionary of their dependent stacks and
+              the exports each of them imports.
+        """
+        graph = {}
+        level = [stack_name]
+        while level:
+            export_names = [name for stack in level for name in self.exports_by_stack.get(stack, [])]
+            imports = self.get_imports(export_names)
+            next_level = []
+            for stack in level:
+                dependents = graph.setdefault(stack, {})
+                for export_name in self.exports_by_stack.get(stack, []):
+                    for importer in imports[export_name]:
+                        dependents.setdefault(importer, []).append(export_name)
+                        if importer not in graph and importer not in next_level:
+                            next_level.append(importer)
+            level = next_level
+        return graph
+
+def get_deletion_order(graph, stack_name):
+    """
+    Order the dependent stacks so that each stack is deleted before the stacks it imports from.
+
+    Returns:
+    list: Names of the dependent stacks, the stack itself excluded.
+    """
+    order = []
+    visited = set()
+
+    def visit(stack):
+        if stack in visited:
+            return
+        visited.add(stack)
+        for dependent in sorted(graph.get(stack, {})):
+            visit(dependent)
+        order.append(stack)
+
+    visit(stack_name)
+    return [stack for stack in order if stack != stack_name]
+
+def describe_dependencies(stack_name, graph):
+    """
+    Describe the dependent stacks of a stack in a custom resource failure reason.
+
+    Returns:
+    str: The reason.
+    """
+    dependents = []
+    for stack in sorted(graph):
+        for dependent, export_names in sorted(graph[stack].items()):
+            via = '' if stack == stack_name else f" via {stack}"
+            dependents.append(f"{dependent} (imports {', '.join(sorted(export_names))}{via})")
+    order = get_deletion_order(graph, stack_name)
+
+    reason = f"Cannot delete stack {stack_name}. {len(order)} dependent stack(s): "
+    suffix = f". Delete them first, in this order: {', '.join(order)}"
+    if len(reason) + len(', '.join(dependents)) + len(suffix) > MAX_REASON_LENGTH:
+        suffix = ". See the function log for the deletion order"
+    listed = []
+    for index, dependent in enumerate(dependents):
+        remaining = len(dependents) - index
+        if len(reason) + len(', '.join(listed + [dependent])) + len(suffix) + 20 > MAX_REASON_LENGTH:
+            listed.append(f"and {remaining} more")
+            break
+        listed.append(dependent)
+    return reason + ', '.join(listed) + suffix
+
 def lambda_handler(event, context):
     try:
         request_type = event['RequestType']
         stack_name = os.environ['STACK_NAME']
         physical_id = f'{stack_name}-dependency-check'
-        
+
         if request_type == 'Delete':
-            try:
-                response = cfn.list_imports(ExportName=stack_name + '-' + os.environ['EXPORT_SUFFIX'])
-                imports = response.get('Imports', [])
-                
-                if imports:
-                    send_response(event, context, 'FAILED', 
-                                f"Cannot delete stack {stack_name}. Dependent stacks: {', '.join(imports)}", 
-                                physical_id)
-                    return
-            except cfn.exceptions.ClientError as e:
-                error_msg = str(e)
-                # Allow deletion if export doesn't exist or has no imports
-                if 'does not exist' not in error_msg and 'is not imported by any stack' not in error_msg:
-                    raise
-        
+            walker = DependencyWalker(list_exports_by_stack())
+            graph = walker.walk(stack_name)
+            if graph.get(stack_name):
+                print(json.dumps({'stack': stack_name, 'dependencies': graph,
+                                  'deletionOrder': get_deletion_order(graph, stack_name)}))
+                send_response(event, context, 'FAILED', describe_dependencies(stack_name, graph), physical_id)
+                return
+
         send_response(event, context, 'SUCCESS', physical_id=physical_id)
         return
     except Exception as e:
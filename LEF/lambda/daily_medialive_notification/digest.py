@@ -0,0 +1,236 @@
+#
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#
+
+import html
+import json
+from urllib.parse import quote
+
+# SNS messages are limited to 256 KB. The default leaves room for the subject and message attributes.
+DEFAULT_MAX_MESSAGE_BYTES = 250000
+REPORT_KEY_PREFIX = 'medialive-reports'
+
+def byte_length(text):
+    return len(text.encode('utf-8'))
+
+def build_json_digest(report, report_link=None):
+    """
+    Build the machine readable form of a report.
+
+    Channels listed under Started and IdleActionChanges are referenced by key, since their details
+    are already in EventGroups.
+
+    Args:
+    report (dict): The cost report.
+    report_link (str): Link to the full report in S3. When set, channel details are left out.
+
+    Returns:
+    dict: JSON serialisable digest.
+    """
+    digest = dict(report)
+    digest['Started'] = [channel['Key'] for channel in report['Started']]
+    digest['IdleActionChanges'] = [channel['Key'] for channel in report['IdleActionChanges']]
+    if report_link:
+        digest['ReportLink'] = report_link
+        digest['EventGroups'] = [dict(group, Channels=[channel['Key'] for channel in group['Channels']])
+                                 for group in report['EventGroups']]
+    return digest
+
+def _split_block(block, max_bytes):
+    """Split a block that is too large on line boundaries, cutting lines that are too long on their own."""
+    pieces = []
+    current = ''
+    for line in block.split('\n'):
+        while byte_length(line) > max_bytes:
+            if current:
+                pieces.append(current)
+                current = ''
+            cut = max_bytes
+            while byte_length(line[:cut]) > max_bytes:
+                cut -= 1
+            pieces.append(line[:cut])
+            line = line[cut:]
+        candidate = f"{current}\n{line}" if current else line
+        if byte_length(candidate) > max_bytes:
+            pieces.append(current)
+            current = line
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+def chunk_text(message, max_bytes=DEFAULT_MAX_MESSAGE_BYTES):
+    """
+    Split a text message into parts under max_bytes, keeping blank line separated blocks together.
+
+    Args:
+    message (str): Notification message.
+    max_bytes (int): Maximum UTF-8 size of a part.
+
+    Returns:
+    list: Message parts.
+    """
+    if byte_length(message) <= max_bytes:
+        return [message]
+    parts = []
+    current = ''
+    for block in message.split('\n\n'):
+        candidate = f"{current}\n\n{block}" if current else block
+        if byte_length(candidate) <= max_bytes:
+            current = candidate
+            continue
+        if current:
+            parts.append(current)
+        if byte_length(block) <= max_bytes:
+            current = block
+        else:
+            pieces = _split_block(block, max_bytes)
+            parts.extend(pieces[:-1])
+            current = pieces[-1]
+    if current:
+        parts.append(current)
+    return parts
+
+def chunk_json_digest(digest, max_bytes=DEFAULT_MAX_MESSAGE_BYTES):
+    """
+    Split a JSON digest into JSON documents under max_bytes.
+
+    When the digest is too large, the first part holds everything except the channel details and
+    the following parts hold the channels of each event group. Every part carries Part and Parts.
+
+    Args:
+    digest (dict): Digest as returned by build_json_digest.
+    max_bytes (int): Maximum UTF-8 size of a part.
+
+    Returns:
+    list: Serialised JSON parts.
+    """
+    document = json.dumps(dict(digest, Part=1, Parts=1))
+    if byte_length(document) <= max_bytes:
+        return [document]
+
+    # Reserve room for the Part and Parts fields added once the number of parts is known
+    budget = max_bytes - 64
+    summary = dict(digest)
+    summary['EventGroups'] = [
+        {key: value for key, value in group.items() if key != 'Channels'} for group in digest['EventGroups']
+    ]
+    parts = [summary]
+    current = None
+    for group in digest['EventGroups']:
+        for channel in group['Channels']:
+            if current is not None:
+                candidate = dict(current, Channels=current['Channels'] + [channel])
+                if byte_length(json.dumps(candidate)) <= budget:
+                    current = candidate
+                    continue
+                parts.append(current)
+            current = {'GeneratedAt': digest['GeneratedAt'], 'Channels': [channel]}
+    if current is not None:
+        parts.append(current)
+    return [json.dumps(dict(part, Part=index + 1, Parts=len(parts))) for index, part in enumerate(parts)]
+
+def build_html_digest(report, describe_channel_spec):
+    """
+    Render a report as a standalone HTML page.
+
+    Args:
+    report (dict): The cost report.
+    describe_channel_spec: Function summarising the specification of a channel.
+
+    Returns:
+    str: HTML document.
+    """
+    currency = html.escape(report['Currency'])
+    escape = lambda value: html.escape(str(value))
+    rows = []
+    for group in report['EventGroups']:
+        rows.append(
+            f"<tr class=\"group\"><th colspan=\"6\">{escape(group['EventGroup'])}</th>"
+            f"<th>{group['EstimatedCost']:.2f} {currency}</th></tr>"
+        )
+        for channel in group['Channels']:
+            idle = f"{channel['IdleReason']} - {channel['IdleAction'] or 'ignored'}" if channel['IdleReason'] else ''
+            rows.append(
+                "<tr>"
+                f"<td>{escape(channel['Name'])}</td>"
+                f"<td>{escape(channel['ChannelId'])}</td>"
+                f"<td>{escape(channel['AccountId'])} {escape(channel['Region'])}</td>"
+                f"<td>{escape(describe_channel_spec(channel))}</td>"
+                f"<td>{channel['RunningHours']:.1f}</td>"
+                f"<td>{escape(idle)}</td>"
+                f"<td>{channel['EstimatedCost']:.2f} {currency}</td>"
+                "</tr>"
+            )
+
+    changes = [
+        f"<li>Started: {escape(channel['Name'])} ({escape(channel['ChannelId'])}, {escape(channel['Region'])})</li>"
+        for channel in report['Started']
+    ] + [
+        f"<li>Stopped: {escape(channel['Name'])} ({escape(channel['ChannelId'])}, {escape(channel['Region'])})</li>"
+        for channel in report['Stopped']
+    ]
+    errors = [
+        f"<li>{escape(error['AccountId'])} {escape(error['Region'])}: {escape(error['Error'])}</li>"
+        for error in report['Errors']
+    ]
+
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>MediaLive running channels cost report {escape(report['GeneratedAt'])}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; width: 100%; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: left; }}
+tr.group th {{ background: #eee; }}
+</style>
+</head>
+<body>
+<h1>MediaLive running channels cost report</h1>
+<p>Generated {escape(report['GeneratedAt'])}. Estimated cost over the last {report['PeriodHours']:g} hours:
+<strong>{report['EstimatedCost']:.2f} {currency}</strong> for {report['ChannelCount']} channel(s).</p>
+{'<h2>Changes</h2><ul>' + ''.join(changes) + '</ul>' if changes else ''}
+{'<h2>Accounts and regions that could not be scanned</h2><ul>' + ''.join(errors) + '</ul>' if errors else ''}
+<table>
+<tr><th>Channel</th><th>ID</th><th>Account/Region</th><th>Specification</th><th>Hours</th><th>Idle</th><th>Estimated cost</th></tr>
+{''.join(rows)}
+</table>
+</body>
+</html>
+"""
+
+def offload_report(s3_client, bucket, region, report, html_digest):
+    """
+    Store the full report in S3 as JSON and HTML.
+
+    Args:
+    s3_client: S3 client.
+    bucket (str): Report bucket.
+    region (str): Region of the bucket, used for the console link.
+    report (dict): The cost report.
+    html_digest (str): HTML form of the report.
+
+    Returns:
+    str: AWS console link to the HTML report.
+    """
+    timestamp = report['GeneratedAt'].replace(':', '')
+    key_prefix = f"{REPORT_KEY_PREFIX}/{report['GeneratedAt'][:10].replace('-', '/')}/{timestamp}"
+    s3_client.put_object(Bucket=bucket, Key=f"{key_prefix}.json",
+                         Body=json.dumps(build_json_digest(report), indent=2).encode('utf-8'),
+                         ContentType='application/json')
+    s3_client.put_object(Bucket=bucket, Key=f"{key_prefix}.html", Body=html_digest.encode('utf-8'),
+                         ContentType='text/html; charset=utf-8')
+    return (f"https://{region}.console.aws.amazon.com/s3/object/{bucket}"
+            f"?region={region}&prefix={quote(key_prefix + '.html', safe='')}")
@@ -0,0 +1,253 @@
+#
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+# Channel tag selecting the policy applied when the channel is idle
+IDLE_POLICY_TAG = 'LefIdlePolicy'
+# Channel tag holding the time after which a 'schedule-stop' channel is stopped if it is still idle
+STOP_AFTER_TAG = 'LefIdleStopAfter'
+
+POLICY_IGNORE = 'ignore'
+POLICY_WARN = 'warn'
+POLICY_SCHEDULE_STOP = 'schedule-stop'
+POLICY_STOP = 'stop'
+POLICIES = (POLICY_IGNORE, POLICY_WARN, POLICY_SCHEDULE_STOP, POLICY_STOP)
+
+IDLE_POLICY_ENABLED = os.environ.get('IDLE_POLICY_ENABLED', 'true').lower() == 'true'
+# Channels are only reported, never stopped or tagged, unless dry run is explicitly disabled
+IDLE_POLICY_DRY_RUN = os.environ.get('IDLE_POLICY_DRY_RUN', 'true').lower() != 'false'
+IDLE_DEFAULT_POLICY = os.environ.get('IDLE_DEFAULT_POLICY', POLICY_WARN)
+IDLE_LOOKBACK_MINUTES = int(os.environ.get('IDLE_LOOKBACK_MINUTES', '60'))
+IDLE_STOP_DELAY_MINUTES = int(os.environ.get('IDLE_STOP_DELAY_MINUTES', '120'))
+
+# MediaLive publishes NetworkIn and NetworkOut per pipeline in megabits per second
+IDLE_METRICS = {
+    'NetworkIn': 'no active input',
+    'NetworkOut': 'no egress',
+}
+METRIC_PERIOD_SECONDS = 300
+# GetMetricData accepts at most 500 queries per request
+MAX_METRIC_QUERIES = 500
+
+def audit(action, channel, **details):
+    """
+    Write an audit record of a policy decision to the function log as a single JSON line.
+
+    Args:
+    action (str): Action taken or, in dry run mode, the action that would have been taken.
+    channel (dict): Channel cost entry.
+    details: Additional fields of the record.
+    """
+    record = {
+        'audit': 'IdleChannelPolicy',
+        'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'action': action,
+        'dryRun': IDLE_POLICY_DRY_RUN,
+        'accountId': channel['AccountId'],
+        'region': channel['Region'],
+        'channelId': channel['ChannelId'],
+        'channelName': channel['Name'],
+        'eventGroup': channel['EventGroup'],
+    }
+    record.update(details)
+    print(json.dumps(record))
+
+def get_pipeline_ids(channel):
+    """
+    Pipelines of a channel.
+
+    Args:
+    channel (dict): Channel cost entry.
+
+    Returns:
+    list: Pipeline IDs.
+    """
+    return ['0'] if channel['ChannelClass'] == 'SINGLE_PIPELINE' else ['0', '1']
+
+def get_idle_reasons(cloudwatch_client, channels, now=None):
+    """
+    Find running channels without input or egress over the lookback period.
+
+    The NetworkIn and NetworkOut metrics of every pipeline of every channel are fetched in as few
+    GetMetricData requests as possible. A channel is idle when a metric has datapoints and all of
+    them are zero on every pipeline. Channels without datapoints are not considered idle.
+
+    Args:
+    cloudwatch_client: CloudWatch client for the region of the channels.
+    channels (list): Channel cost entries.
+    now (datetime): End of the lookback period (default: now).
+
+    Returns:
+    dict: Channel IDs of idle channels mapped to the reason they are idle.
+    """
+    now = now or datetime.now(timezone.utc)
+    queries = []
+    query_metrics = {}
+    for channel in channels:
+        for metric_name in IDLE_METRICS:
+            for pipeline_id in get_pipeline_ids(channel):
+                query_id = f"m{len(queries)}"
+                query_metrics[query_id] = (channel['ChannelId'], metric_name)
+                queries.append({
+                    'Id': query_id,
+                    'MetricStat': {
+                        'Metric': {
+                            'Namespace': 'AWS/MediaLive',
+                            'MetricName': metric_name,
+                            'Dimensions': [
+                                {'Name': 'ChannelId', 'Value': channel['ChannelId']},
+                                {'Name': 'Pipeline', 'Value': pipeline_id},
+                            ],
+                        },
+                        'Period': METRIC_PERIOD_SECONDS,
+                        'Stat': 'Maximum',
+                    },
+                    'ReturnData': True,
+                })
+
+    # Highest value of each metric across pipelines, None when no pipeline reported datapoints
+    maximums = {}
+    for start in range(0, len(queries), MAX_METRIC_QUERIES):
+        paginator = cloudwatch_client.get_paginator('get_metric_data')
+        pages = paginator.paginate(
+            MetricDataQueries=queries[start:start + MAX_METRIC_QUERIES],
+            StartTime=now - timedelta(minutes=IDLE_LOOKBACK_MINUTES),
+            EndTime=now,
+        )
+        for page in pages:
+            for result in page['MetricDataResults']:
+                key = query_metrics[result['Id']]
+                if result['Values']:
+                    maximums[key] = max(maximums.get(key) or 0.0, max(result['Values']))
+
+    idle_reasons = {}
+    for channel in channels:
+        for metric_name, reason in IDLE_METRICS.items():
+            if maximums.get((channel['ChannelId'], metric_name)) == 0:
+                idle_reasons[channel['ChannelId']] = reason
+                break
+    return idle_reasons
+
+def get_policy(channel):
+    """
+    Policy of a channel from its tags, falling back to the default policy.
+
+    Args:
+    channel (dict): Channel cost entry.
+
+    Returns:
+    str: One of POLICIES.
+    """
+    policy = channel['Tags'].get(IDLE_POLICY_TAG, IDLE_DEFAULT_POLICY).strip().lower()
+    if policy not in POLICIES:
+        print(f"Unknown {IDLE_POLICY_TAG} '{policy}' on channel {channel['ChannelId']}, using '{POLICY_WARN}'")
+        return POLICY_WARN
+    return policy
+
+def stop_channel(medialive_client, channel, reason):
+    """
+    Stop an idle channel, or only record the stop in dry run mode.
+
+    Returns:
+    str: Description of the action.
+    """
+    if IDLE_POLICY_DRY_RUN:
+        audit('stop', channel, reason=reason)
+        return 'would be stopped (dry run)'
+    medialive_client.stop_channel(ChannelId=channel['ChannelId'])
+    if STOP_AFTER_TAG in channel['Tags']:
+        medialive_client.delete_tags(ResourceArn=channel['Arn'], TagKeys=[STOP_AFTER_TAG])
+    audit('stop', channel, reason=reason)
+    return 'stopped'
+
+def apply_policy(medialive_client, channel, reason, now=None):
+    """
+    Apply the idle policy of a channel.
+
+    'warn' only reports the channel. 'stop' stops it now. 'schedule-stop' tags the channel with the
+    time after which it is stopped, and stops it at the first run after that time if it is still
+    idle. A scheduled stop is cancelled when the channel is no longer idle.
+
+    Args:
+    medialive_client: MediaLive client for the account and region of the channel.
+    channel (dict): Channel cost entry.
+    reason (str): Why the channel is idle, or None when it is not idle.
+    now (datetime): Current time (default: now).
+
+    Returns:
+    str: Description of the action taken, or None when no action applies.
+    """
+    now = now or datetime.now(timezone.utc)
+    stop_after = channel['Tags'].get(STOP_AFTER_TAG)
+
+    if reason is None:
+        if stop_after:
+            if not IDLE_POLICY_DRY_RUN:
+                medialive_client.delete_tags(ResourceArn=channel['Arn'], TagKeys=[STOP_AFTER_TAG])
+            audit('cancel-scheduled-stop', channel, stopAfter=stop_after)
+        return None
+
+    policy = get_policy(channel)
+    if policy == POLICY_IGNORE:
+        return None
+    if policy == POLICY_WARN:
+        audit('warn', channel, reason=reason)
+        return 'idle'
+    if policy == POLICY_STOP:
+        return stop_channel(medialive_client, channel, reason)
+
+    if stop_after:
+        try:
+            deadline = datetime.fromisoformat(stop_after)
+        except ValueError:
+            deadline = None
+        if deadline is not None and now >= deadline:
+            return stop_channel(medialive_client, channel, reason)
+        if deadline is not None:
+            return f"stop scheduled after {stop_after}"
+
+    deadline = (now + timedelta(minutes=IDLE_STOP_DELAY_MINUTES)).isoformat(timespec='seconds')
+    if not IDLE_POLICY_DRY_RUN:
+        medialive_client.create_tags(ResourceArn=channel['Arn'], Tags={STOP_AFTER_TAG: deadline})
+    audit('schedule-stop', channel, reason=reason, stopAfter=deadline)
+    suffix = ' (dry run)' if IDLE_POLICY_DRY_RUN else ''
+    return f"stop scheduled after {deadline}{suffix}"
+
+def evaluate_idle_channels(session, region, medialive_client, channels):
+    """
+    Detect idle channels in one account and region and apply their policies.
+
+    Each channel entry gets 'IdleReason' and 'IdleAction' fields. A failure to apply the policy of
+    one channel is recorded in its entry and does not affect the others.
+
+    Args:
+    session: boto3 session for the account of the channels.
+    region (str): Region of the channels.
+    medialive_client: MediaLive client for the account and region.
+    channels (list): Channel cost entries.
+    """
+    if not IDLE_POLICY_ENABLED or not channels:
+        return
+    cloudwatch_client = session.client('cloudwatch', region_name=region)
+    idle_reasons = get_idle_reasons(cloudwatch_client, channels)
+    for channel in channels:
+        channel['IdleReason'] = idle_reasons.get(channel['ChannelId'])
+        try:
+            channel['IdleAction'] = apply_policy(medialive_client, channel, channel['IdleReason'])
+        except Exception as e:
+            print(f"Error applying idle policy to channel {channel['ChannelId']}: {str(e)}")
+            audit('error', channel, reason=channel['IdleReason'], error=str(e))
+            channel['IdleAction'] = f"policy failed: {str(e)}"
@@ -14,74 +14,763 @@
 import boto3
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from botocore.config import Config
+
+import digest
+import idle_policy
+import ledger
+import pricing
+import state_store
+
+LEF_VERSION_TAG = 'LiveEventFrameworkVersion'
+EVENT_GROUP_TAG = 'EventGroupStackName'
+FOUNDATION_TAG = 'FoundationStackName'
+NO_EVENT_GROUP = '(no event group)'
+ROLE_SESSION_NAME = 'lef-daily-medialive-report'
+
+# Maximum number of DescribeChannel calls in flight per account and region
+MAX_DESCRIBE_WORKERS = int(os.environ.get('MAX_DESCRIBE_WORKERS', '8'))
+
+# Maximum number of account and region combinations scanned at the same time
+MAX_SCAN_WORKERS = int(os.environ.get('MAX_SCAN_WORKERS', '8'))
+
+# Channels running when the report is generated are assumed to have run for the whole period,
+# unless the state snapshot shows they started later
+REPORT_PERIOD_HOURS = float(os.environ.get('REPORT_PERIOD_HOURS', '24'))
+
+# Location of the snapshot of running channels ('dynamodb://<table>', 's3://<bucket>/<key>' or
+# 'file://<path>'). Without it every run reports all running channels.
+STATE_STORE = os.environ.get('STATE_STORE')
+
+# Hour (UTC) of the run that sends the full report. Other runs only notify when something changed.
+DAILY_REPORT_HOUR = int(os.environ.get('DAILY_REPORT_HOUR', '0'))
+
+# Channel details copied into the snapshot. Encoder settings cannot change while a channel is
+# running, so channels that were already running reuse them instead of being described again.
+CACHED_CHANNEL_FIELDS = ('Arn', 'ChannelClass', 'InputSpecification', 'Outputs')
+
+# Format of the SNS message: 'text' for people, 'json' for subscribers that process the report
+REPORT_FORMAT = os.environ.get('REPORT_FORMAT', 'text').lower()
+
+# Bucket the full JSON and HTML reports are written to. When set, the SNS message only holds the
+# summary and a link to the full report.
+REPORT_BUCKET = os.environ.get('REPORT_BUCKET')
+
+# Reports larger than this are published as several SNS messages
+SNS_MAX_MESSAGE_BYTES = int(os.environ.get('SNS_MAX_MESSAGE_BYTES', str(digest.DEFAULT_MAX_MESSAGE_BYTES)))
+
+REPORT_SUBJECT = 'MediaLive Running Channels Cost Report'
+
+# Adaptive retries back off client side when MediaLive throttles the describe fan-out
+medialive_config = Config(retries={'max_attempts': 10, 'mode': 'adaptive'})
 
 # Initialize AWS clients outside the handler for better performance
-medialive_client = boto3.client('medialive')
 sns_client = boto3.client('sns')
+s3_client = boto3.client('s3')
+sts_client = boto3.client('sts')
+
+def get_list_from_environment(name):
+    """
+    Read a comma separated list from an environment variable.
 
-def get_running_channels():
+    Args:
+    name (str): Name of the environment variable.
+
+    Returns:
+    list: The non-empty values.
+    """
+    return [value.strip() for value in os.environ.get(name, '').split(',') if value.strip()]
+
+def get_scan_targets():
+    """
+    Build the accounts and regions to scan.
+
+    The Lambda's own account is scanned in every region in REPORT_REGIONS (default: the Lambda's
+    region), and so is the account of every role in CROSS_ACCOUNT_ROLE_ARNS.
+
+    Returns:
+    tuple: A list of targets (dictionaries with AccountId, Region and Session) and a list of errors
+           for roles that could not be assumed.
+    """
+    regions = get_list_from_environment('REPORT_REGIONS') or [os.environ.get('AWS_REGION')]
+    sessions = [(sts_client.get_caller_identity()['Account'], boto3.Session())]
+    errors = []
+
+    for role_arn in get_list_from_environment('CROSS_ACCOUNT_ROLE_ARNS'):
+        account_id = role_arn.split(':')[4]
+        try:
+            credentials = sts_client.assume_role(RoleArn=role_arn, RoleSessionName=ROLE_SESSION_NAME)['Credentials']
+        except Exception as e:
+            print(f"Error assuming role {role_arn}: {str(e)}")
+            errors.append({'AccountId': account_id, 'Region': '*', 'Error': f"Unable to assume {role_arn}: {str(e)}"})
+            continue
+        sessions.append((account_id, boto3.Session(
+            aws_access_key_id=credentials['AccessKeyId'],
+            aws_secret_access_key=credentials['SecretAccessKey'],
+            aws_session_token=credentials['SessionToken'],
+        )))
+
+    targets = [
+        {'AccountId': account_id, 'Region': region, 'Session': session}
+        for account_id, session in sessions for region in regions
+    ]
+    return targets, errors
+
+def get_ledger_targets():
+    """
+    Build the target covered by the channel ledger: the ledger only receives the channel state
+    change events of the Lambda's own account and region.
+
+    Returns:
+    list: A list with one target (a dictionary with AccountId, Region and Session).
+    """
+    return [{
+        'AccountId': sts_client.get_caller_identity()['Account'],
+        'Region': os.environ.get('AWS_REGION'),
+        'Session': boto3.Session(),
+    }]
+
+def get_running_channels(medialive_client):
     """
     Query MediaLive to identify all running channels with a 'LiveEventFrameworkVersion' tag.
 
+    Channels are filtered on the state and tags returned by ListChannels. DescribeChannel is only
+    called, on a bounded thread pool, for running channels whose summary does not include tags.
+
+    Args:
+    medialive_client: MediaLive client for the account and region to scan.
+
     Returns:
-    list: A list of dictionaries containing channel information.
+    list: A list of channel summaries.
     """
     channels = []
+    untagged_summaries = []
     paginator = medialive_client.get_paginator('list_channels')
-    
+
+    for page in paginator.paginate():
+        for channel in page['Channels']:
+            if channel['State'] != 'RUNNING':
+                continue
+            if 'Tags' not in channel:
+                untagged_summaries.append(channel)
+            elif LEF_VERSION_TAG in channel['Tags']:
+                channels.append(channel)
+
+    if untagged_summaries:
+        print(f"Describing {len(untagged_summaries)} running channels without tags in the channel list.")
+        with ThreadPoolExecutor(max_workers=max(1, MAX_DESCRIBE_WORKERS)) as executor:
+            details = executor.map(lambda channel: medialive_client.describe_channel(ChannelId=channel['Id']),
+                                   untagged_summaries)
+            for channel, detail in zip(untagged_summaries, details):
+                if LEF_VERSION_TAG in detail.get('Tags', {}):
+                    channels.append(dict(channel, Tags=detail['Tags']))
+
+    return channels
+
+def get_channel_key(account_id, region, channel_id):
+    """
+    Key of a channel in the state snapshot.
+
+    Returns:
+    str: '<account>:<region>:<channel id>'.
+    """
+    return f"{account_id}:{region}:{channel_id}"
+
+def get_running_hours(now, first_seen_running, previous_run):
+    """
+    Estimate how long a channel ran during the report period.
+
+    Args:
+    now (datetime): Time of this run.
+    first_seen_running (str): When the channel was first seen running, None when it is new.
+    previous_run (str): Time of the previous run, None when there is no snapshot.
+
+    Returns:
+    float: Running hours, at most REPORT_PERIOD_HOURS.
+    """
+    # A new channel started at some point after the previous run
+    running_since = first_seen_running or previous_run
+    if running_since is None:
+        return REPORT_PERIOD_HOURS
+    hours = (now - datetime.fromisoformat(running_since)).total_seconds() / 3600
+    return min(REPORT_PERIOD_HOURS, max(hours, 0.0))
+
+def get_channel_cost(medialive_client, channel, account_id, region, prices, previous=None, previous_run=None,
+                     now=None):
+    """
+    Estimate the cost of a running channel over the report period.
+
+    The channel is described unless it was already running at the previous run, in which case
+    the details cached in the snapshot are used.
+
+    Args:
+    medialive_client: MediaLive client for the account and region of the channel.
+    channel (dict): Channel summary from ListChannels.
+    account_id (str): Account of the channel.
+    region (str): Region of the channel.
+    prices (dict): The price table.
+    previous (dict): Snapshot entry of the channel from the previous run, if any.
+    previous_run (str): Time of the previous run, None when there is no snapshot.
+    now (datetime): Time of this run.
+
+    Returns:
+    dict: Channel information and cost estimate.
+    """
+    now = now or datetime.now(timezone.utc)
+    if previous and all(field in previous for field in CACHED_CHANNEL_FIELDS):
+        details = {field: previous[field] for field in CACHED_CHANNEL_FIELDS}
+    else:
+        detail = medialive_client.describe_channel(ChannelId=channel['Id'])
+        details = {
+            'Arn': detail.get('Arn'),
+            'ChannelClass': detail.get('ChannelClass', 'STANDARD'),
+            'InputSpecification': detail.get('InputSpecification', {}),
+            'Outputs': pricing.get_output_specs(detail.get('EncoderSettings', {})),
+        }
+    channel_class = details['ChannelClass']
+    input_specification = details['InputSpecification']
+    outputs = details['Outputs']
+    hourly_cost = pricing.estimate_hourly_cost(channel_class, input_specification, outputs, region, prices)
+    first_seen_running = previous.get('FirstSeenRunning') if previous else None
+    running_hours = get_running_hours(now, first_seen_running, previous_run)
+    tags = channel.get('Tags', {})
+    return {
+        'ChannelId': channel['Id'],
+        'Key': get_channel_key(account_id, region, channel['Id']),
+        'Arn': details['Arn'],
+        'Name': channel['Name'],
+        'Tags': tags,
+        'AccountId': account_id,
+        'Region': region,
+        'EventGroup': tags.get(EVENT_GROUP_TAG, NO_EVENT_GROUP),
+        'Foundation': tags.get(FOUNDATION_TAG),
+        'ChannelClass': channel_class,
+        'InputSpecification': input_specification,
+        'Outputs': outputs,
+        'HourlyCost': hourly_cost,
+        'RunningHours': running_hours,
+        'EstimatedCost': hourly_cost * running_hours,
+        'FirstSeenRunning': first_seen_running or now.isoformat(timespec='seconds'),
+        'Started': previous is None and previous_run is not None,
+        'Running': True,
+        'StoppedAt': None,
+        'IdleReason': None,
+        'IdleAction': None,
+    }
+
+def scan_target(target, prices, previous_state=None, now=None, check_idle=True):
+    """
+    Find the running LEF channels in one account and region, estimate their cost and apply the
+    policies of idle channels.
+
+    Args:
+    target (dict): Target as returned by get_scan_targets.
+    prices (dict): The price table.
+    previous_state (dict): Snapshot of the previous run.
+    now (datetime): Time of this run.
+    check_idle (bool): Apply the policies of idle channels.
+
+    Returns:
+    list: Channel cost entries.
+    """
+    medialive_client = target['Session'].client('medialive', region_name=target['Region'], config=medialive_config)
+    channels = get_running_channels(medialive_client)
+    print(f"Found {len(channels)} running channels with '{LEF_VERSION_TAG}' tag "
+          f"in {target['AccountId']} {target['Region']}.")
+    previous_state = previous_state or state_store.empty_state()
+    previous_channels = previous_state['Channels']
+
+    def get_cost(channel):
+        previous = previous_channels.get(get_channel_key(target['AccountId'], target['Region'], channel['Id']))
+        return get_channel_cost(medialive_client, channel, target['AccountId'], target['Region'], prices,
+                                previous=previous, previous_run=previous_state['UpdatedAt'], now=now)
+
+    with ThreadPoolExecutor(max_workers=max(1, MAX_DESCRIBE_WORKERS)) as executor:
+        channel_costs = list(executor.map(get_cost, channels))
+
+    if check_idle:
+        check_idle_channels(target['Session'], target['AccountId'], target['Region'], channel_costs, medialive_client)
+    return channel_costs
+
+def check_idle_channels(session, account_id, region, channels, medialive_client=None):
+    """
+    Apply the policies of idle channels in one account and region, recording a failure in the
+    channel entries instead of raising it.
+
+    Args:
+    session: boto3 session for the account of the channels.
+    account_id (str): Account of the channels.
+    region (str): Region of the channels.
+    channels (list): Channel cost entries of running channels.
+    medialive_client: MediaLive client for the account and region (default: created from the session).
+    """
     try:
-        for page in paginator.paginate():
-            for channel in page['Channels']:
-                if channel['State'] == 'RUNNING':
-                    channel_id = channel['Id']
-                    channel_detail = medialive_client.describe_channel(ChannelId=channel_id)
-                    
-                    if 'Tags' in channel_detail and 'LiveEventFrameworkVersion' in channel_detail['Tags']:
-                        channels.append({
-                            'ChannelId': channel_id,
-                            'Name': channel['Name']
-                        })
-        
-        print(f"Found {len(channels)} running channels with 'LiveEventFrameworkVersion' tag.")
-        return channels
+        medialive_client = medialive_client or session.client('medialive', region_name=region,
+                                                              config=medialive_config)
+        idle_policy.evaluate_idle_channels(session, region, medialive_client, channels)
     except Exception as e:
-        print(f"Error querying MediaLive channels: {str(e)}")
-        raise
+        print(f"Error checking idle channels in {account_id} {region}: {str(e)}")
+        for channel in channels:
+            channel['IdleAction'] = f"idle check failed: {str(e)}"
 
-def send_sns_notification(channels):
+def get_ledger_channel_cost(item, prices, previous_run, now):
     """
-    Send a summary of running channels to the specified SNS topic.
+    Cost of a channel over the report period from its running intervals in the channel ledger.
 
     Args:
-    channels (list): A list of dictionaries containing channel information.
+    item (dict): Ledger item of the channel.
+    prices (dict): The price table.
+    previous_run (str): Time of the previous run, None when there is no snapshot.
+    now (datetime): Time of this run.
+
+    Returns:
+    dict: Channel cost entry, or None when the channel did not run during the period.
     """
-    sns_topic_arn = os.environ.get('SNS_TOPIC_ARN')
-    if not sns_topic_arn:
-        raise ValueError("SNS_TOPIC_ARN environment variable is not set.")
+    period_start = now - timedelta(hours=REPORT_PERIOD_HOURS)
+    running_seconds = ledger.get_running_seconds(item, period_start, now)
+    running = bool(item.get('RunningSince'))
+    if not running and not running_seconds:
+        return None
+
+    details = json.loads(item['Details'])
+    starts = [interval[0] for interval in item.get('Intervals', [])]
+    if running:
+        starts.append(item['RunningSince'])
+    hourly_cost = pricing.estimate_hourly_cost(details['ChannelClass'], details['InputSpecification'],
+                                               details['Outputs'], item['Region'], prices)
+    running_hours = running_seconds / 3600
+    tags = details['Tags']
+    return {
+        'ChannelId': item['ChannelId'],
+        'Key': item['ChannelKey'],
+        'Arn': details['Arn'],
+        'Name': details['Name'],
+        'Tags': tags,
+        'AccountId': item['AccountId'],
+        'Region': item['Region'],
+        'EventGroup': tags.get(EVENT_GROUP_TAG, NO_EVENT_GROUP),
+        'Foundation': tags.get(FOUNDATION_TAG),
+        'ChannelClass': details['ChannelClass'],
+        'InputSpecification': details['InputSpecification'],
+        'Outputs': details['Outputs'],
+        'HourlyCost': hourly_cost,
+        'RunningHours': running_hours,
+        'EstimatedCost': hourly_cost * running_hours,
+        'FirstSeenRunning': starts[-1],
+        'Started': previous_run is not None and any(start > previous_run for start in starts),
+        'Running': running,
+        'StoppedAt': None if running else item['Intervals'][-1][1],
+        'IdleReason': None,
+        'IdleAction': None,
+    }
+
+def refresh_ledger_channels(session, account_id, region, channels):
+    """
+    Refresh the tags of running ledger channels in one account and region and apply the policies
+    of idle channels.
+
+    The ledger records the tags of a channel when it starts, so idle policy tags changed since then
+    are read again with ListTagsForResource, one request per running channel. The policies are not
+    applied to a channel whose tags cannot be read.
+
+    Args:
+    session: boto3 session for the account of the channels.
+    account_id (str): Account of the channels.
+    region (str): Region of the channels.
+    channels (list): Channel cost entries of running channels.
+    """
+    try:
+        medialive_client = session.client('medialive', region_name=region, config=medialive_config)
+    except Exception as e:
+        print(f"Error creating the MediaLive client for {account_id} {region}: {str(e)}")
+        for channel in channels:
+            channel['IdleAction'] = f"idle check failed: {str(e)}"
+        return
+    checked = []
+    for channel in channels:
+        try:
+            tags = medialive_client.list_tags_for_resource(ResourceArn=channel['Arn']).get('Tags', {})
+        except Exception as e:
+            print(f"Error reading the tags of channel {channel['ChannelId']} in {account_id} {region}: {str(e)}")
+            channel['IdleAction'] = f"idle check failed: {str(e)}"
+            continue
+        channel.update(Tags=tags, EventGroup=tags.get(EVENT_GROUP_TAG, NO_EVENT_GROUP),
+                       Foundation=tags.get(FOUNDATION_TAG))
+        checked.append(channel)
+    if checked:
+        check_idle_channels(session, account_id, region, checked, medialive_client)
+
+def collect_ledger_channels(channel_ledger, targets, prices, previous_state, now):
+    """
+    Read the channels that ran during the report period from the channel ledger and apply the
+    policies of idle channels to those still running.
+
+    The first time the ledger is read, it is seeded with the channels found running by a scan,
+    because their state change events happened before the ledger existed.
+
+    Args:
+    channel_ledger (ledger.ChannelLedger): The channel ledger.
+    targets (list): Targets covered by the ledger, as returned by get_ledger_targets.
+    prices (dict): The price table.
+    previous_state (dict): Snapshot of the previous run.
+    now (datetime): Time of this run.
 
-    message = "Summary of running MediaLive channels:\n\n"
+    Returns:
+    tuple: A list of channel cost entries and a list of errors.
+    """
+    errors = []
+    if not channel_ledger.is_seeded():
+        print("Seeding the channel ledger with the channels currently running.")
+        seed_channels = []
+        for target in targets:
+            try:
+                seed_channels.extend(scan_target(target, prices, previous_state, now, check_idle=False))
+            except Exception as e:
+                print(f"Error querying MediaLive channels in {target['AccountId']} {target['Region']}: {str(e)}")
+                errors.append({'AccountId': target['AccountId'], 'Region': target['Region'], 'Error': str(e)})
+        channel_ledger.seed(seed_channels, now)
+
+    channels = []
+    for item in channel_ledger.load_channels():
+        channel = get_ledger_channel_cost(item, prices, previous_state['UpdatedAt'], now)
+        if channel:
+            channels.append(channel)
+
+    sessions = {target['AccountId']: target['Session'] for target in targets}
+    running = {}
     for channel in channels:
-        message += f"Channel ID: {channel['ChannelId']}\n"
-        message += f"Name: {channel['Name']}\n\n"
+        if channel['Running'] and channel['AccountId'] in sessions:
+            running.setdefault((channel['AccountId'], channel['Region']), []).append(channel)
+    with ThreadPoolExecutor(max_workers=max(1, MAX_SCAN_WORKERS)) as executor:
+        futures = {executor.submit(refresh_ledger_channels, sessions[account_id], account_id, region,
+                                   region_channels): (account_id, region)
+                   for (account_id, region), region_channels in running.items()}
+        for future, (account_id, region) in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error checking idle channels in {account_id} {region}: {str(e)}")
+                errors.append({'AccountId': account_id, 'Region': region, 'Error': str(e)})
+    return channels, errors
+
+def build_state(previous_state, channels, errors, now):
+    """
+    Build the snapshot of this run and the channels that stopped since the previous run.
+
+    Channels in accounts or regions that could not be scanned are carried over unchanged, so they
+    are not reported as stopped.
+
+    Args:
+    previous_state (dict): Snapshot of the previous run.
+    channels (list): Channel cost entries of this run.
+    errors (list): Accounts and regions that could not be scanned.
+    now (datetime): Time of this run.
+
+    Returns:
+    tuple: The new snapshot and a list of snapshot entries of stopped channels.
+    """
+    failed = {(error['AccountId'], error['Region']) for error in errors}
+    state = {
+        'Version': state_store.STATE_VERSION,
+        'UpdatedAt': now.isoformat(timespec='seconds'),
+        'Channels': {},
+    }
+    for channel in channels:
+        entry = {field: channel[field] for field in CACHED_CHANNEL_FIELDS}
+        entry.update({
+            'ChannelId': channel['ChannelId'],
+            'Name': channel['Name'],
+            'AccountId': channel['AccountId'],
+            'Region': channel['Region'],
+            'EventGroup': channel['EventGroup'],
+            'FirstSeenRunning': channel['FirstSeenRunning'],
+            'IdleAction': channel['IdleAction'],
+        })
+        state['Channels'][channel['Key']] = entry
+
+    stopped = []
+    for key, entry in previous_state['Channels'].items():
+        if key in state['Channels']:
+            continue
+        if (entry['AccountId'], entry['Region']) in failed or (entry['AccountId'], '*') in failed:
+            state['Channels'][key] = entry
+        else:
+            stopped.append(entry)
+    return state, stopped
+
+def build_cost_report(previous_state=None, channel_ledger=None):
+    """
+    Scan all configured accounts and regions concurrently and group the running channels by event group.
+
+    A failure in one account or region is recorded in the report and does not stop the others.
+    With a channel ledger, channels are read from the ledger instead, and the report covers every
+    channel of the Lambda's account and region that ran during the period with its exact running time.
+
+    Args:
+    previous_state (dict): Snapshot of the previous run, None when no state is kept.
+    channel_ledger (ledger.ChannelLedger): Channel ledger, None to scan the channels.
+
+    Returns:
+    tuple: The cost report and the snapshot of this run.
+    """
+    now = datetime.now(timezone.utc)
+    previous_state = previous_state or state_store.empty_state()
+    prices = pricing.load_price_table()
+    if channel_ledger:
+        targets, errors = get_ledger_targets(), []
+    else:
+        targets, errors = get_scan_targets()
+    channels = []
+
+    def scan(target):
+        try:
+            return scan_target(target, prices, previous_state, now), None
+        except Exception as e:
+            print(f"Error querying MediaLive channels in {target['AccountId']} {target['Region']}: {str(e)}")
+            return [], {'AccountId': target['AccountId'], 'Region': target['Region'], 'Error': str(e)}
+
+    if channel_ledger:
+        channels, ledger_errors = collect_ledger_channels(channel_ledger, targets, prices, previous_state, now)
+        errors.extend(ledger_errors)
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, MAX_SCAN_WORKERS)) as executor:
+            for target_channels, error in executor.map(scan, targets):
+                channels.extend(target_channels)
+                if error:
+                    errors.append(error)
+
+    event_groups = {}
+    for channel in sorted(channels, key=lambda channel: channel['EstimatedCost'], reverse=True):
+        group = event_groups.setdefault(channel['EventGroup'], {
+            'EventGroup': channel['EventGroup'],
+            'Foundation': channel['Foundation'],
+            'EstimatedCost': 0.0,
+            'Channels': [],
+        })
+        group['EstimatedCost'] += channel['EstimatedCost']
+        group['Channels'].append(channel)
+
+    state, stopped = build_state(previous_state, [channel for channel in channels if channel['Running']], errors, now)
+    if channel_ledger:
+        # The ledger knows exactly which channels stopped, including those started since the previous run
+        previous_run = previous_state['UpdatedAt']
+        stopped = [
+            channel for channel in channels
+            if previous_run and channel['StoppedAt'] and channel['StoppedAt'] > previous_run
+        ]
+    previous_actions = {key: entry.get('IdleAction') for key, entry in previous_state['Channels'].items()}
+    report = {
+        'GeneratedAt': now.isoformat(timespec='seconds'),
+        'PreviousRun': previous_state['UpdatedAt'],
+        'Source': 'ledger' if channel_ledger else 'scan',
+        'PeriodHours': REPORT_PERIOD_HOURS,
+        'Currency': prices['currency'],
+        'ScannedTargets': [{'AccountId': target['AccountId'], 'Region': target['Region']} for target in targets],
+        'ChannelCount': len(channels),
+        'EstimatedCost': sum(channel['EstimatedCost'] for channel in channels),
+        'EventGroups': sorted(event_groups.values(), key=lambda group: group['EstimatedCost'], reverse=True),
+        'Started': [channel for channel in channels if channel['Started']],
+        'Stopped': stopped,
+        # Idle actions are only news when they differ from the previous run
+        'IdleActionChanges': [
+            channel for channel in channels
+            if channel['IdleAction'] and channel['IdleAction'] != previous_actions.get(channel['Key'])
+        ],
+        'Errors': errors,
+    }
+    return report, state
+
+def has_changes(report):
+    """
+    Check whether a report contains anything not already reported by the previous run.
+
+    Args:
+    report (dict): The cost report.
+
+    Returns:
+    bool: True when channels started or stopped, idle actions changed or scans failed.
+    """
+    return bool(report['Started'] or report['Stopped'] or report['IdleActionChanges'] or report['Errors'])
+
+def format_duration(since, now):
+    """
+    Format the time elapsed since an ISO 8601 timestamp.
+
+    Returns:
+    str: e.g. '2 days 3 hours' or '45 minutes'.
+    """
+    elapsed = now - datetime.fromisoformat(since)
+    days, hours, minutes = elapsed.days, elapsed.seconds // 3600, (elapsed.seconds % 3600) // 60
+    if days:
+        return f"{days} day(s) {hours} hour(s)"
+    if hours:
+        return f"{hours} hour(s) {minutes} minute(s)"
+    return f"{minutes} minute(s)"
+
+def describe_channel_spec(channel):
+    """
+    Summarise the class, input and outputs of a channel on one line.
+
+    Args:
+    channel (dict): Channel cost entry.
 
+    Returns:
+    str: Human readable specification.
+    """
+    input_specification = channel['InputSpecification']
+    input_description = ' '.join(
+        input_specification.get(key, '?') for key in ('Codec', 'Resolution', 'MaximumBitrate')
+    )
+    output_types = {}
+    for output in channel['Outputs']:
+        label = output['Type'] if output['Type'] != 'VIDEO' else f"{output['Codec']} {output['Resolution']}"
+        output_types[label] = output_types.get(label, 0) + 1
+    output_description = ', '.join(f"{count}x {label}" for label, count in output_types.items()) or 'no outputs'
+    return f"{channel['ChannelClass']}, input {input_description}, outputs {output_description}"
+
+def format_report(report, report_link=None):
+    """
+    Format the cost report as a plain text notification.
+
+    Args:
+    report (dict): The cost report.
+    report_link (str): Link to the full report in S3. When set, channel details are left out.
+
+    Returns:
+    str: Notification message.
+    """
+    currency = report['Currency']
+    regions = sorted({channel['Region'] for group in report['EventGroups'] for channel in group['Channels']})
+    message = f"Estimated cost of running MediaLive channels over the last {report['PeriodHours']:g} hours:\n\n"
+    message += (f"Total: {report['EstimatedCost']:.2f} {currency} for {report['ChannelCount']} channel(s) "
+                f"in {len(regions)} region(s): {', '.join(regions)}\n")
+    now = datetime.fromisoformat(report['GeneratedAt'])
+
+    if report['PreviousRun'] and (report['Started'] or report['Stopped']):
+        message += f"\nChanges since {report['PreviousRun']}:\n"
+        for channel in report['Started']:
+            message += (f"  Started: {channel['Name']} ({channel['ChannelId']}, {channel['AccountId']} "
+                        f"{channel['Region']}), event group {channel['EventGroup']}\n")
+        for channel in report['Stopped']:
+            if channel.get('StoppedAt'):
+                duration = format_duration(channel['FirstSeenRunning'], datetime.fromisoformat(channel['StoppedAt']))
+                message += (f"  Stopped: {channel['Name']} ({channel['ChannelId']}, {channel['AccountId']} "
+                            f"{channel['Region']}) at {channel['StoppedAt']} after running for {duration}\n")
+                continue
+            message += (f"  Stopped: {channel['Name']} ({channel['ChannelId']}, {channel['AccountId']} "
+                        f"{channel['Region']}) after running for at least "
+                        f"{format_duration(channel['FirstSeenRunning'], now)}\n")
+
+    idle_channels = [
+        channel for group in report['EventGroups'] for channel in group['Channels'] if channel['IdleReason']
+    ]
+    if idle_channels:
+        dry_run = " (dry run, no channels were stopped)" if idle_policy.IDLE_POLICY_DRY_RUN else ""
+        message += f"\nIdle channels{dry_run}:\n"
+        for channel in idle_channels:
+            message += (f"  {channel['Name']} ({channel['ChannelId']}, {channel['AccountId']} {channel['Region']}): "
+                        f"{channel['IdleReason']} - {channel['IdleAction'] or 'ignored'}\n")
+
+    if report_link:
+        message += f"\nFull report: {report_link}\n"
+
+    for group in report['EventGroups']:
+        foundation = f" (foundation {group['Foundation']})" if group['Foundation'] else ""
+        message += f"\nEvent group: {group['EventGroup']}{foundation} - {group['EstimatedCost']:.2f} {currency}"
+        message += f" for {len(group['Channels'])} channel(s)\n" if report_link else "\n"
+        if report_link:
+            continue
+        for channel in group['Channels']:
+            message += f"  Channel ID: {channel['ChannelId']}\n"
+            message += f"  Name: {channel['Name']}\n"
+            message += f"  Account/Region: {channel['AccountId']} {channel['Region']}\n"
+            if not channel['Running']:
+                message += f"  Stopped at: {channel['StoppedAt']}\n"
+            elif report['Source'] == 'ledger':
+                message += f"  Running for: {format_duration(channel['FirstSeenRunning'], now)}\n"
+            elif report['PreviousRun'] and not channel['Started']:
+                message += f"  Running for: at least {format_duration(channel['FirstSeenRunning'], now)}\n"
+            message += f"  Specification: {describe_channel_spec(channel)}\n"
+            if channel['IdleReason']:
+                message += f"  Idle: {channel['IdleReason']} - {channel['IdleAction'] or 'ignored'}\n"
+            message += (f"  Estimated cost: {channel['HourlyCost']:.2f} {currency}/hour x "
+                        f"{channel['RunningHours']:.1f} hours = {channel['EstimatedCost']:.2f} {currency}\n\n")
+
+    if report['Errors']:
+        message += "\nThe following accounts and regions could not be scanned:\n"
+        for error in report['Errors']:
+            message += f"  {error['AccountId']} {error['Region']}: {error['Error']}\n"
+
+    message += "\nCosts are estimates based on the price table bundled with the notification function "
+    if report['Source'] == 'ledger':
+        message += "and the running times recorded from channel state change events.\n"
+    else:
+        message += "and assume channels ran for the whole period unless they were first seen running later.\n"
     message += "\nWARNING: Running MediaLive channels incur AWS charges. "
     message += "Over a long period of time, these charges can add up significantly. "
     message += "Please review your channel usage regularly to optimize costs."
+    return message
+
+def send_sns_notification(message, subject=REPORT_SUBJECT):
+    """
+    Send the cost report to the specified SNS topic.
+
+    Args:
+    message (str): Notification message.
+    subject (str): Notification subject.
+    """
+    sns_topic_arn = os.environ.get('SNS_TOPIC_ARN')
+    if not sns_topic_arn:
+        raise ValueError("SNS_TOPIC_ARN environment variable is not set.")
 
     try:
         response = sns_client.publish(
             TopicArn=sns_topic_arn,
             Message=message,
-            Subject="MediaLive Running Channels Summary and Cost Warning"
+            Subject=subject
         )
         print(f"SNS notification sent successfully. Message ID: {response['MessageId']}")
     except Exception as e:
         print(f"Error sending SNS notification: {str(e)}")
         raise
 
+def publish_report(report):
+    """
+    Publish the cost report, split into several SNS messages when it exceeds SNS_MAX_MESSAGE_BYTES.
+
+    When REPORT_BUCKET is set, the full report is stored in S3 as JSON and HTML and the messages
+    only hold the summary and a link to it. If the upload fails the full report is sent instead.
+
+    Args:
+    report (dict): The cost report.
+
+    Returns:
+    int: Number of messages published.
+    """
+    report_link = None
+    if REPORT_BUCKET:
+        try:
+            report_link = digest.offload_report(s3_client, REPORT_BUCKET, os.environ.get('AWS_REGION'), report,
+                                                digest.build_html_digest(report, describe_channel_spec))
+            print(f"Full report stored in bucket {REPORT_BUCKET}.")
+        except Exception as e:
+            print(f"Error storing the full report in bucket {REPORT_BUCKET}: {str(e)}")
+
+    if REPORT_FORMAT == 'json':
+        parts = digest.chunk_json_digest(digest.build_json_digest(report, report_link), SNS_MAX_MESSAGE_BYTES)
+    else:
+        parts = digest.chunk_text(format_report(report, report_link), SNS_MAX_MESSAGE_BYTES)
+
+    for index, part in enumerate(parts):
+        subject = REPORT_SUBJECT if len(parts) == 1 else f"{REPORT_SUBJECT} (part {index + 1}/{len(parts)})"
+        send_sns_notification(part, subject)
+    return len(parts)
+
 def lambda_handler(event, context):
     """
-    AWS Lambda function handler to query running MediaLive channels and send a summary via SNS.
+    AWS Lambda function handler to report the estimated cost of running MediaLive channels via SNS.
 
     Args:
     event (dict): The event dict containing input parameters.
@@ -92,16 +781,39 @@ def lambda_handler(event, context):
     """
     try:
         print("Starting Lambda function execution.")
-        running_channels = get_running_channels()
-        
-        if running_channels:
-            send_sns_notification(running_channels)
+        store = state_store.create_state_store(STATE_STORE)
+        previous_state = store.load() if store else None
+        channel_ledger = ledger.ChannelLedger(ledger.CHANNEL_LEDGER_TABLE) if ledger.CHANNEL_LEDGER_TABLE else None
+        report, state = build_cost_report(previous_state, channel_ledger)
+        print(f"Found {report['ChannelCount']} running channels with an estimated cost of "
+              f"{report['EstimatedCost']:.2f} {report['Currency']}.")
+
+        # The snapshot is only saved once the report is published, so the changes of a run whose
+        # notification failed are reported again by the next run.
+        # Runs other than the daily report only notify about changes.
+        daily_run = (report['PreviousRun'] is None
+                     or datetime.fromisoformat(report['GeneratedAt']).hour == DAILY_REPORT_HOUR)
+        if not daily_run and not has_changes(report):
+            print("No changes since the previous run.")
+            if store:
+                store.save(state)
             return {
                 'statusCode': 200,
-                'body': json.dumps('Successfully sent running channels summary with cost warning.')
+                'body': json.dumps('No changes in running channels since the previous run.')
+            }
+
+        if report['ChannelCount'] or report['Stopped'] or report['Errors']:
+            publish_report(report)
+            if store:
+                store.save(state)
+            return {
+                'statusCode': 200,
+                'body': json.dumps('Successfully sent running channels cost report.')
             }
         else:
             print("No running channels found with 'LiveEventFrameworkVersion' tag.")
+            if store:
+                store.save(state)
             return {
                 'statusCode': 200,
                 'body': json.dumps('No running channels found with LiveEventFrameworkVersion tag.')
@@ -113,4 +825,3 @@ def lambda_handler(event, context):
             'statusCode': 500,
             'body': json.dumps(error_message)
         }
-
@@ -0,0 +1,301 @@
+#
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#
+
+import boto3
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+import pricing
+
+LEF_VERSION_TAG = 'LiveEventFrameworkVersion'
+
+# Table holding one item per channel with its running intervals
+CHANNEL_LEDGER_TABLE = os.environ.get('CHANNEL_LEDGER_TABLE')
+
+# Intervals that ended before this many days ago are dropped, and items of stopped channels expire
+# after it. It must be longer than the report period.
+LEDGER_RETENTION_DAYS = int(os.environ.get('LEDGER_RETENTION_DAYS', '8'))
+
+# Key of the item recording that the ledger was seeded with the channels already running
+SEED_KEY = '#seeded'
+
+RUNNING_STATE = 'RUNNING'
+# Channel states that end a running interval. Other states (e.g. STARTING) do not change the ledger.
+STOPPED_STATES = ('STOPPING', 'STOPPED', 'IDLE', 'DELETING', 'DELETED')
+
+# Number of times a ledger update is retried when another event updated the channel concurrently
+MAX_UPDATE_ATTEMPTS = 5
+
+def normalize_time(timestamp):
+    """
+    Normalise an ISO 8601 timestamp to UTC with second precision, so timestamps compare as strings.
+
+    Args:
+    timestamp (str): Timestamp, e.g. '2024-05-01T10:00:00Z'.
+
+    Returns:
+    str: e.g. '2024-05-01T10:00:00+00:00'.
+    """
+    return datetime.fromisoformat(timestamp).astimezone(timezone.utc).isoformat(timespec='seconds')
+
+def apply_state_change(item, state, event_time, now=None):
+    """
+    Apply a channel state change to a ledger item.
+
+    Events can be delivered more than once and out of order. Events older than the last applied
+    event are ignored, and so are repeated states.
+
+    Args:
+    item (dict): Ledger item of the channel.
+    state (str): New state of the channel.
+    event_time (str): Normalised time of the state change.
+    now (datetime): Current time, used to drop old intervals (default: now).
+
+    Returns:
+    dict: The updated item, or None when the event does not change the ledger.
+    """
+    now = now or datetime.now(timezone.utc)
+    last_event_time = item.get('LastEventTime')
+    if last_event_time and (event_time < last_event_time
+                            or (event_time == last_event_time and state == item.get('LastState'))):
+        return None
+
+    updated = dict(item, LastEventTime=event_time, LastState=state)
+    if state == RUNNING_STATE:
+        if item.get('RunningSince'):
+            return updated
+        updated['RunningSince'] = event_time
+        updated.pop('ExpiresAt', None)
+    elif state in STOPPED_STATES:
+        if not item.get('RunningSince'):
+            return updated
+        updated['Intervals'] = list(item.get('Intervals', [])) + [[item['RunningSince'], event_time]]
+        del updated['RunningSince']
+        updated['ExpiresAt'] = int((now + timedelta(days=LEDGER_RETENTION_DAYS)).timestamp())
+    else:
+        return None
+
+    cutoff = (now - timedelta(days=LEDGER_RETENTION_DAYS)).isoformat(timespec='seconds')
+    updated['Intervals'] = [interval for interval in updated.get('Intervals', []) if interval[1] >= cutoff]
+    return updated
+
+def get_running_seconds(item, start, end):
+    """
+    Time a channel ran between two times.
+
+    Args:
+    item (dict): Ledger item of the channel.
+    start (datetime): Start of the period.
+    end (datetime): End of the period.
+
+    Returns:
+    float: Running seconds within the period.
+    """
+    intervals = list(item.get('Intervals', []))
+    if item.get('RunningSince'):
+        intervals.append([item['RunningSince'], end.isoformat(timespec='seconds')])
+    seconds = 0.0
+    for interval_start, interval_end in intervals:
+        overlap_start = max(start, datetime.fromisoformat(interval_start))
+        overlap_end = min(end, datetime.fromisoformat(interval_end))
+        seconds += max((overlap_end - overlap_start).total_seconds(), 0.0)
+    return seconds
+
+def get_channel_details(detail):
+    """
+    Channel details kept in the ledger, from a DescribeChannel response.
+
+    Returns:
+    dict: Name, Arn, Tags, ChannelClass, InputSpecification and billable Outputs of the channel.
+    """
+    return {
+        'Name': detail.get('Name'),
+        'Arn': detail.get('Arn'),
+        'Tags': detail.get('Tags', {}),
+        'ChannelClass': detail.get('ChannelClass', 'STANDARD'),
+        'InputSpecification': detail.get('InputSpecification', {}),
+        'Outputs': pricing.get_output_specs(detail.get('EncoderSettings', {})),
+    }
+
+class ChannelLedger:
+    """Running intervals of LEF channels, one DynamoDB item per channel keyed by 'ChannelKey'."""
+
+    def __init__(self, table_name):
+        self.table = boto3.resource('dynamodb').Table(table_name)
+
+    def get(self, key):
+        return self.table.get_item(Key={'ChannelKey': key}, ConsistentRead=True).get('Item')
+
+    def put(self, item, previous_event_time):
+        """
+        Write an item unless another event updated the channel since it was read.
+
+        Returns:
+        bool: False when the item was updated concurrently.
+        """
+        if previous_event_time:
+            condition = Attr('LastEventTime').eq(previous_event_time)
+        else:
+            condition = Attr('LastEventTime').not_exists()
+        try:
+            self.table.put_item(Item=item, ConditionExpression=condition)
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+        return True
+
+    def record_state_change(self, key, state, event_time, describe):
+        """
+        Record a channel state change.
+
+        Args:
+        key (str): '<account>:<region>:<channel id>'.
+        state (str): New state of the channel.
+        event_time (str): Normalised time of the state change.
+        describe: Function returning the channel details, called when a channel starts. It returns
+                  None for channels that were not deployed with LEF.
+
+        Returns:
+        bool: True when the ledger changed.
+        """
+        for _ in range(MAX_UPDATE_ATTEMPTS):
+            item = self.get(key)
+            if item is None:
+                if state != RUNNING_STATE:
+                    return False
+                details = describe()
+                if details is None:
+                    return False
+                account_id, region, channel_id = key.split(':')
+                item = {
+                    'ChannelKey': key,
+                    'AccountId': account_id,
+                    'Region': region,
+                    'ChannelId': channel_id,
+                    'Details': json.dumps(details),
+                    'Intervals': [],
+                }
+            elif state == RUNNING_STATE and not item.get('RunningSince'):
+                # Encoder settings can change while a channel is stopped
+                details = describe()
+                if details is not None:
+                    item = dict(item, Details=json.dumps(details))
+            updated = apply_state_change(item, state, event_time)
+            if updated is None:
+                return False
+            if self.put(updated, item.get('LastEventTime')):
+                return True
+        raise RuntimeError(f"Channel {key} was updated concurrently {MAX_UPDATE_ATTEMPTS} times")
+
+    def load_channels(self):
+        """
+        Read the ledger.
+
+        Returns:
+        list: Ledger items of all channels.
+        """
+        items = []
+        kwargs = {'ConsistentRead': True}
+        while True:
+            response = self.table.scan(**kwargs)
+            items.extend(item for item in response['Items'] if item['ChannelKey'] != SEED_KEY)
+            if 'LastEvaluatedKey' not in response:
+                return items
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def is_seeded(self):
+        return self.get(SEED_KEY) is not None
+
+    def seed(self, channels, now):
+        """
+        Add channels that were already running when the ledger was created.
+
+        Their start time is unknown, so they are recorded as running since the start assumed by the
+        scan: when they were first seen running, or the start of the report period for channels not
+        in the snapshot. Channels already in the ledger are left unchanged.
+
+        Args:
+        channels (list): Channel cost entries from a scan.
+        now (datetime): Time of the scan.
+        """
+        for channel in channels:
+            running_since = min(channel['FirstSeenRunning'],
+                                (now - timedelta(hours=channel['RunningHours'])).isoformat(timespec='seconds'))
+            details = {field: channel[field] for field in
+                       ('Name', 'Arn', 'Tags', 'ChannelClass', 'InputSpecification', 'Outputs')}
+            item = {
+                'ChannelKey': channel['Key'],
+                'AccountId': channel['AccountId'],
+                'Region': channel['Region'],
+                'ChannelId': channel['ChannelId'],
+                'Details': json.dumps(details),
+                'Intervals': [],
+                'RunningSince': running_since,
+                'LastEventTime': running_since,
+                'LastState': RUNNING_STATE,
+            }
+            try:
+                self.table.put_item(Item=item, ConditionExpression=Attr('ChannelKey').not_exists())
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+        self.table.put_item(Item={'ChannelKey': SEED_KEY, 'SeededAt': now.isoformat(timespec='seconds')})
+
+def lambda_handler(event, context):
+    """
+    AWS Lambda function handler recording 'MediaLive Channel State Change' events in the channel ledger.
+
+    The report reads the ledger for the account and region of the function only, so events
+    forwarded from other accounts or regions are ignored.
+
+    Args:
+    event (dict): The EventBridge event.
+    context (object): The context object providing runtime information.
+
+    Returns:
+    dict: A dictionary containing the execution status and any error messages.
+    """
+    channel_arn = event['detail']['channel_arn']
+    state = event['detail']['state']
+    region, account_id = channel_arn.split(':')[3:5]
+    channel_id = channel_arn.split(':')[-1]
+    key = f"{account_id}:{region}:{channel_id}"
+    if account_id != context.invoked_function_arn.split(':')[4] or region != os.environ.get('AWS_REGION'):
+        print(f"Channel {key} is not in the account and region of the ledger: ignored.")
+        return {
+            'statusCode': 200,
+            'body': json.dumps('Ignored channel state change.')
+        }
+
+    def describe():
+        detail = boto3.client('medialive', region_name=region).describe_channel(ChannelId=channel_id)
+        if LEF_VERSION_TAG not in detail.get('Tags', {}):
+            return None
+        return get_channel_details(detail)
+
+    try:
+        channel_ledger = ChannelLedger(CHANNEL_LEDGER_TABLE)
+        changed = channel_ledger.record_state_change(key, state, normalize_time(event['time']), describe)
+        print(f"Channel {key} {state} at {event['time']}: {'recorded' if changed else 'ignored'}.")
+        return {
+            'statusCode': 200,
+            'body': json.dumps('Recorded channel state change.' if changed else 'Ignored channel state change.')
+        }
+    except Exception as e:
+        print(f"Error recording state change of channel {key}: {str(e)}")
+        # Raise so the event is retried and sent to the dead letter queue if it keeps failing
+        raise
@@ -0,0 +1,154 @@
+#
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#
+
+import json
+import os
+
+# Price table bundled with the function, in USD per pipeline hour
+PRICE_TABLE_PATH = os.path.join(os.path.dirname(__file__), 'medialive_prices.json')
+
+VIDEO_CODECS = {
+    'H264Settings': 'AVC',
+    'H265Settings': 'HEVC',
+    'Mpeg2Settings': 'MPEG2',
+    'Av1Settings': 'AV1',
+}
+
+def load_price_table(path=PRICE_TABLE_PATH):
+    """
+    Load the MediaLive price table.
+
+    Args:
+    path (str): Path of the JSON price table.
+
+    Returns:
+    dict: The price table.
+    """
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def get_resolution(height):
+    """
+    Map a video height to a MediaLive pricing resolution.
+
+    Args:
+    height (int): Output height in lines, or None when it follows the source.
+
+    Returns:
+    str: 'SD', 'HD' or 'UHD'.
+    """
+    if not height:
+        return 'HD'
+    if height <= 576:
+        return 'SD'
+    if height <= 1080:
+        return 'HD'
+    return 'UHD'
+
+def get_bitrate_tier(bitrate):
+    """
+    Map an output bitrate in bits per second to a MediaLive pricing tier.
+
+    Args:
+    bitrate (int): Output bitrate, or None when unknown.
+
+    Returns:
+    str: 'MAX_10_MBPS', 'MAX_20_MBPS' or 'MAX_50_MBPS'.
+    """
+    if not bitrate or bitrate <= 10000000:
+        return 'MAX_10_MBPS'
+    if bitrate <= 20000000:
+        return 'MAX_20_MBPS'
+    return 'MAX_50_MBPS'
+
+def get_output_specs(encoder_settings):
+    """
+    Describe the billable outputs of a channel.
+
+    Each video encode referenced by an output is billed once. Audio encodes are only billed when
+    they are referenced by outputs without video. Caption only outputs are not billed.
+
+    Args:
+    encoder_settings (dict): EncoderSettings of the channel.
+
+    Returns:
+    list: A list of dictionaries with the Type, Codec, Resolution and BitrateTier of each output encode.
+    """
+    video_descriptions = {
+        description['Name']: description for description in encoder_settings.get('VideoDescriptions', [])
+    }
+    video_names = set()
+    audio_only_names = set()
+    for output_group in encoder_settings.get('OutputGroups', []):
+        for output in output_group.get('Outputs', []):
+            if output.get('VideoDescriptionName'):
+                video_names.add(output['VideoDescriptionName'])
+            else:
+                audio_only_names.update(output.get('AudioDescriptionNames', []))
+
+    specs = []
+    for name in sorted(video_names):
+        description = video_descriptions.get(name, {})
+        codec_settings = description.get('CodecSettings', {})
+        if 'FrameCaptureSettings' in codec_settings:
+            specs.append({'Type': 'FRAME_CAPTURE'})
+            continue
+        settings_key = next((key for key in VIDEO_CODECS if key in codec_settings), 'H264Settings')
+        settings = codec_settings.get(settings_key, {})
+        specs.append({
+            'Type': 'VIDEO',
+            'Codec': VIDEO_CODECS[settings_key],
+            'Resolution': get_resolution(description.get('Height')),
+            'BitrateTier': get_bitrate_tier(settings.get('Bitrate') or settings.get('MaxBitrate')),
+        })
+    specs.extend({'Type': 'AUDIO'} for _ in sorted(audio_only_names))
+    return specs
+
+def get_output_price(spec, prices):
+    """
+    Price of one output encode per pipeline hour.
+
+    Args:
+    spec (dict): Output spec as returned by get_output_specs.
+    prices (dict): The price table.
+
+    Returns:
+    float: Price in the currency of the price table.
+    """
+    if spec['Type'] == 'AUDIO':
+        return prices['audioOutput']
+    if spec['Type'] == 'FRAME_CAPTURE':
+        return prices['frameCaptureOutput']
+    return prices['outputs'][spec['Codec']][spec['Resolution']][spec['BitrateTier']]
+
+def estimate_hourly_cost(channel_class, input_specification, output_specs, region, prices):
+    """
+    Estimate the hourly cost of a running channel.
+
+    Args:
+    channel_class (str): 'STANDARD' (two pipelines) or 'SINGLE_PIPELINE'.
+    input_specification (dict): InputSpecification of the channel.
+    output_specs (list): Output specs as returned by get_output_specs.
+    region (str): Region of the channel.
+    prices (dict): The price table.
+
+    Returns:
+    float: Estimated cost per hour in the currency of the price table.
+    """
+    pipelines = 1 if channel_class == 'SINGLE_PIPELINE' else 2
+    input_price = prices['inputs'][input_specification.get('Codec', 'AVC')][
+        input_specification.get('Resolution', 'HD')][input_specification.get('MaximumBitrate', 'MAX_20_MBPS')]
+    output_price = sum(get_output_price(spec, prices) for spec in output_specs)
+    multipliers = prices.get('regionMultipliers', {})
+    multiplier = multipliers.get(region, multipliers.get('default', 1.0))
+    return pipelines * (input_price + output_price) * multiplier
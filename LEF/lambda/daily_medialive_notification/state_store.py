@@ -0,0 +1,187 @@
+#
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#
+
+import json
+import os
+import time
+import uuid
+from urllib.parse import urlparse
+
+import boto3
+
+STATE_VERSION = 1
+# Partition key value of the snapshot item in the DynamoDB table
+SNAPSHOT_ID = 'running-channels'
+# Channel items of older snapshots are removed by the table's time to live after this many days
+SNAPSHOT_RETENTION_DAYS = int(os.environ.get('SNAPSHOT_RETENTION_DAYS', '7'))
+# Maximum number of keys in a BatchGetItem request
+BATCH_GET_SIZE = 100
+
+def empty_state():
+    """
+    State before the first run.
+
+    Returns:
+    dict: An empty snapshot.
+    """
+    return {'Version': STATE_VERSION, 'UpdatedAt': None, 'Channels': {}}
+
+def parse_state(document):
+    """
+    Validate a stored snapshot, discarding snapshots written by an incompatible version.
+
+    Args:
+    document (str): JSON snapshot, or None when nothing is stored.
+
+    Returns:
+    dict: The snapshot.
+    """
+    if not document:
+        return empty_state()
+    state = json.loads(document)
+    if state.get('Version') != STATE_VERSION:
+        print(f"Ignoring channel state snapshot with version {state.get('Version')}")
+        return empty_state()
+    return state
+
+class DynamoDBStateStore:
+    """
+    Snapshot stored in a DynamoDB table with an 'Id' partition key.
+
+    Each channel is stored as its own item, so the snapshot is not bound by the 400 KB item size
+    limit. The channel items of a run are written first, under keys holding a run marker. The
+    snapshot item is then written with the run marker and the number of channels, which makes the
+    new snapshot current in one write. A failed save leaves the previous snapshot in place. Channel
+    items of older runs expire through the table's 'ExpiresAt' time to live attribute.
+    """
+
+    def __init__(self, table_name):
+        self.dynamodb = boto3.resource('dynamodb')
+        self.table = self.dynamodb.Table(table_name)
+
+    @staticmethod
+    def channel_id(run, index):
+        return f"{SNAPSHOT_ID}#{run}#{index}"
+
+    def load(self):
+        item = self.table.get_item(Key={'Id': SNAPSHOT_ID}, ConsistentRead=True).get('Item')
+        if not item:
+            return empty_state()
+        if 'State' in item:
+            # Snapshot written as a single item by an earlier version
+            return parse_state(item['State'])
+        if item.get('Version') != STATE_VERSION:
+            print(f"Ignoring channel state snapshot with version {item.get('Version')}")
+            return empty_state()
+
+        count = int(item['ChannelCount'])
+        channel_items = self.get_items([self.channel_id(item['Run'], index) for index in range(count)])
+        if len(channel_items) != count:
+            print(f"Ignoring channel state snapshot {item['Run']}: found {len(channel_items)} of {count} channels")
+            return empty_state()
+        state = {'Version': STATE_VERSION, 'UpdatedAt': item['UpdatedAt'], 'Channels': {}}
+        for channel_item in channel_items:
+            state['Channels'][channel_item['ChannelKey']] = json.loads(channel_item['Channel'])
+        return state
+
+    def get_items(self, ids):
+        """
+        Read items by id with consistent BatchGetItem requests, retrying unprocessed keys.
+
+        Args:
+        ids (list): Partition key values of the items.
+
+        Returns:
+        list: The items found.
+        """
+        items = []
+        for start in range(0, len(ids), BATCH_GET_SIZE):
+            request = {self.table.name: {'Keys': [{'Id': item_id} for item_id in ids[start:start + BATCH_GET_SIZE]],
+                                         'ConsistentRead': True}}
+            while request:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                items.extend(response['Responses'].get(self.table.name, []))
+                request = response.get('UnprocessedKeys')
+        return items
+
+    def save(self, state):
+        run = f"{state['UpdatedAt']}-{uuid.uuid4().hex[:8]}"
+        expires_at = int(time.time()) + SNAPSHOT_RETENTION_DAYS * 86400
+        with self.table.batch_writer() as batch:
+            for index, (key, entry) in enumerate(state['Channels'].items()):
+                batch.put_item(Item={'Id': self.channel_id(run, index), 'ChannelKey': key,
+                                     'Channel': json.dumps(entry), 'ExpiresAt': expires_at})
+        self.table.put_item(Item={'Id': SNAPSHOT_ID, 'Version': STATE_VERSION, 'UpdatedAt': state['UpdatedAt'],
+                                  'Run': run, 'ChannelCount': len(state['Channels'])})
+
+class S3StateStore:
+    """Snapshot stored as a JSON object in S3."""
+
+    def __init__(self, bucket, key):
+        self.bucket = bucket
+        self.key = key
+        self.s3_client = boto3.client('s3')
+
+    def load(self):
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=self.key)
+        except self.s3_client.exceptions.NoSuchKey:
+            return empty_state()
+        return parse_state(response['Body'].read().decode('utf-8'))
+
+    def save(self, state):
+        self.s3_client.put_object(Bucket=self.bucket, Key=self.key, Body=json.dumps(state).encode('utf-8'),
+                                  ContentType='application/json')
+
+class FileStateStore:
+    """Snapshot stored in a local file, for testing outside Lambda."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return parse_state(f.read())
+        except FileNotFoundError:
+            return empty_state()
+
+    def save(self, state):
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(temporary_path, self.path)
+
+def create_state_store(location):
+    """
+    Create the state store for a location.
+
+    Args:
+    location (str): 'dynamodb://<table>', 's3://<bucket>/<key>' or 'file://<path>'.
+
+    Returns:
+    The state store, or None when no location is configured.
+
+    Raises:
+    ValueError: If the location is not supported.
+    """
+    if not location:
+        return None
+    parsed = urlparse(location)
+    if parsed.scheme == 'dynamodb':
+        return DynamoDBStateStore(parsed.netloc)
+    if parsed.scheme == 's3':
+        return S3StateStore(parsed.netloc, parsed.path.lstrip('/'))
+    if parsed.scheme == 'file':
+        return FileStateStore(parsed.netloc + parsed.path)
+    raise ValueError(f"Unsupported state store location: {location}")
@@ -325,10 +325,12 @@ export class LefEventGroupStack extends LefBaseStack {
       eventGroupConfig.cloudFront.nominalSegmentLength.toString();
 
     // Add deletion protection check
-    this.addDeletionProtectionCheck("CloudFront-Domain-Name");
+    this.addDeletionProtectionCheck();
   }
 
-  addDeletionProtectionCheck(exportSuffix: string) {
+  // Block deletion of the event group while other stacks import any of its exports, directly or
+  // through the exports of a dependent stack
+  addDeletionProtectionCheck() {
     const role = new iam.Role(this, "DeletionCheckRole", {
       assumedBy: new iam.ServicePrincipal("lambda.amazonaws.com"),
       roleName: `${Aws.STACK_NAME}-${getRegionCode(this)}-DeletionCheckRole`,
@@ -338,7 +340,7 @@ export class LefEventGroupStack extends LefBaseStack {
     role.addToPolicy(
       new iam.PolicyStatement({
         effect: iam.Effect.ALLOW,
-        actions: ["cloudformation:ListImports"],
+        actions: ["cloudformation:ListExports", "cloudformation:ListImports"],
         resources: ["*"],
       }),
     );
@@ -365,8 +367,8 @@ export class LefEventGroupStack extends LefBaseStack {
       role: role,
       environment: {
         STACK_NAME: Aws.STACK_NAME,
-        EXPORT_SUFFIX: exportSuffix,
       },
+      timeout: cdk.Duration.minutes(2),
       reservedConcurrentExecutions: 1,
     });
     TaggingUtils.applyTagsToResource(fn, this.resourceTags);
@@ -380,7 +382,7 @@ export class LefEventGroupStack extends LefBaseStack {
         {
           id: "AwsSolutions-IAM5",
           reason:
-            "ListImports requires wildcard. Log group wildcard needed for unpredictable names.",
+            "ListExports and ListImports require wildcard. Log group wildcard needed for unpredictable names.",
         },
       ]);
     }
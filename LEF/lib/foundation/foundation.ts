@@ -14,6 +14,7 @@
 import {
   Aws,
   aws_cloudfront as cloudfront,
+  aws_dynamodb as dynamodb,
   aws_iam as iam,
   aws_kms as kms,
   aws_s3 as s3,
@@ -31,7 +32,10 @@ import * as cdk from "aws-cdk-lib";
 import * as lambda from "aws-cdk-lib/aws-lambda";
 import { getRegionCode } from "../utils/region-mapping";
 import { NagSuppressions } from "cdk-nag";
-import { ICloudFrontConfig } from "./foundationConfigInterface";
+import {
+  ICloudFrontConfig,
+  IDailyNotificationConfig,
+} from "./foundationConfigInterface";
 import { TaggingUtils } from "../utils/tagging";
 
 const ONE_YEAR_IN_SECONDS = 31536000;
@@ -66,6 +70,7 @@ const SECURITY_HEADERS_CONFIG: cloudfront.ResponseSecurityHeadersBehavior = {
 export interface FoundationProps {
   userEmail: string;
   config: ICloudFrontConfig;
+  dailyNotification?: IDailyNotificationConfig;
   tags: Record<string, string>[];
 }
 
@@ -135,7 +140,10 @@ export class Foundation extends Construct {
      * Create resources to send a daily notification containing a list of running MediaLive channels
      * deployed using Live Event Framework
      */
-    this.createResourcesToSendDailyNotification(snsTopic.topicArn);
+    this.createResourcesToSendDailyNotification(
+      snsTopic.topicArn,
+      props.dailyNotification,
+    );
   }
 
   // Generic method to create S3 buckets with standard settings
@@ -587,8 +595,18 @@ export class Foundation extends Construct {
 
   // Function to create Event Bridge rule to invoke a lambda function at midnight UTC each night.
   // The lambda function will list all the running MediaLive channels with a 'LiveEventFrameworkVersion' tag.
-  // The lambda will send a summary of the running channels to the SNS topic created in the foundation stack.
-  createResourcesToSendDailyNotification(snsTopicArn: string) {
+  // The lambda will send a cost report of the running channels in the configured regions and accounts
+  // to the SNS topic created in the foundation stack. A snapshot of the running channels is kept in
+  // DynamoDB so the report can show what changed and hourly runs only notify about changes.
+  createResourcesToSendDailyNotification(
+    snsTopicArn: string,
+    config: IDailyNotificationConfig = {},
+  ) {
+    const reportRegions = config.reportRegions ?? [];
+    const crossAccountRoleArns = config.crossAccountRoleArns ?? [];
+    const idlePolicy = config.idlePolicy ?? {};
+    const idlePolicyDryRun = idlePolicy.dryRun ?? true;
+
     // Create a Role for to send daily medialive notifications
     // Create an IAM role for the Lambda function
     const lambdaRole = new iam.Role(this, "DailyMediaLiveNotificationRole", {
@@ -599,13 +617,15 @@ export class Foundation extends Construct {
     });
     TaggingUtils.applyTagsToResource(lambdaRole, this.tags);
 
-    // Create a medialive policy statement querying
+    // Create a medialive policy statement querying channels in every region of the report
     const medialivePolicy = new iam.PolicyStatement({
       effect: iam.Effect.ALLOW,
-      actions: ["medialive:ListChannels", "medialive:DescribeChannel"],
-      resources: [
-        `arn:aws:medialive:${Aws.REGION}:${Aws.ACCOUNT_ID}:channel:*`,
+      actions: [
+        "medialive:ListChannels",
+        "medialive:DescribeChannel",
+        "medialive:ListTagsForResource",
       ],
+      resources: [`arn:aws:medialive:*:${Aws.ACCOUNT_ID}:channel:*`],
     });
 
     // Create a sns policy statement publishing daily summary
@@ -630,6 +650,37 @@ export class Foundation extends Construct {
     lambdaRole.addToPolicy(cloudWatchPolicy);
     lambdaRole.addToPolicy(medialivePolicy);
     lambdaRole.addToPolicy(snsPolicy);
+    // Read the input and egress metrics used to detect idle channels
+    lambdaRole.addToPolicy(
+      new iam.PolicyStatement({
+        effect: iam.Effect.ALLOW,
+        actions: ["cloudwatch:GetMetricData"],
+        resources: ["*"],
+      }),
+    );
+    // Stopping and tagging idle channels is only allowed when the idle policy is not a dry run
+    if (!idlePolicyDryRun) {
+      lambdaRole.addToPolicy(
+        new iam.PolicyStatement({
+          effect: iam.Effect.ALLOW,
+          actions: [
+            "medialive:StopChannel",
+            "medialive:CreateTags",
+            "medialive:DeleteTags",
+          ],
+          resources: [`arn:aws:medialive:*:${Aws.ACCOUNT_ID}:channel:*`],
+        }),
+      );
+    }
+    if (crossAccountRoleArns.length > 0) {
+      lambdaRole.addToPolicy(
+        new iam.PolicyStatement({
+          effect: iam.Effect.ALLOW,
+          actions: ["sts:AssumeRole"],
+          resources: crossAccountRoleArns,
+        }),
+      );
+    }
 
     NagSuppressions.addResourceSuppressions(
       lambdaRole,
@@ -640,12 +691,67 @@ export class Foundation extends Construct {
             "Resource is limited to log-groups in the account/region but a wildcard needs to " +
             "be specified at the end of the resources due to the full resource name being unpredictable. " +
             "Read-only permissions are granted to all MediaLive Channels in the account so the lambda " +
-            "can check if they were deployed with LEF and are in a running state for notifications",
+            "can check if they were deployed with LEF and are in a running state for notifications. " +
+            "Channels are read in all regions because the report can scan additional regions. " +
+            "GetMetricData does not support resource level permissions. " +
+            "Full reports are written under any key of the report bucket.",
         },
       ],
       true,
     );
 
+    // Snapshot of the running channels from the previous run
+    const stateTable = new dynamodb.Table(this, "DailyNotificationStateTable", {
+      partitionKey: { name: "Id", type: dynamodb.AttributeType.STRING },
+      billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      encryption: dynamodb.TableEncryption.AWS_MANAGED,
+      pointInTimeRecoverySpecification: { pointInTimeRecoveryEnabled: true },
+      timeToLiveAttribute: "ExpiresAt",
+      removalPolicy: cdk.RemovalPolicy.DESTROY,
+    });
+    TaggingUtils.applyTagsToResource(stateTable, this.tags);
+    stateTable.grant(
+      lambdaRole,
+      "dynamodb:GetItem",
+      "dynamodb:PutItem",
+      "dynamodb:BatchGetItem",
+      "dynamodb:BatchWriteItem",
+    );
+
+    // Optional bucket holding the full JSON and HTML reports linked from the notification
+    const reportEnvironment: { [key: string]: string } = {};
+    if (config.reportArchive) {
+      const reportBucket = this.createS3Bucket(
+        "DailyNotificationReportBucket",
+        config.reportArchive.retentionDays ?? 90,
+        "DailyNotificationReportBucketOutput",
+        "DailyNotificationReportBucket",
+        "Bucket holding the full MediaLive running channels cost reports",
+      );
+      reportBucket.grantPut(lambdaRole);
+      reportEnvironment.REPORT_BUCKET = reportBucket.bucketName;
+    }
+
+    // Optional ledger of running intervals read by the report instead of scanning the channels
+    const ledgerEnvironment: { [key: string]: string } = {};
+    if (config.source === "ledger") {
+      // The ledger only receives the channel state change events of this account and region
+      if (reportRegions.length > 0 || crossAccountRoleArns.length > 0) {
+        throw new Error(
+          'dailyNotification source "ledger" only covers the account and region of the foundation stack. ' +
+            'Remove reportRegions and crossAccountRoleArns, or use source "scan".',
+        );
+      }
+      const ledgerTable = this.createChannelLedger();
+      ledgerTable.grant(
+        lambdaRole,
+        "dynamodb:GetItem",
+        "dynamodb:PutItem",
+        "dynamodb:Scan",
+      );
+      ledgerEnvironment.CHANNEL_LEDGER_TABLE = ledgerTable.tableName;
+    }
+
     // Create a lambda function to invoke at midnight UTC each night
     const dlq = new sqs.Queue(this, "DailyNotificationDLQ", {
       retentionPeriod: Duration.days(14),
@@ -665,20 +771,34 @@ export class Foundation extends Construct {
         ),
         environment: {
           SNS_TOPIC_ARN: snsTopicArn,
+          REPORT_REGIONS: reportRegions.join(","),
+          CROSS_ACCOUNT_ROLE_ARNS: crossAccountRoleArns.join(","),
+          IDLE_POLICY_ENABLED: String(idlePolicy.enabled ?? true),
+          IDLE_POLICY_DRY_RUN: String(idlePolicyDryRun),
+          IDLE_DEFAULT_POLICY: idlePolicy.defaultPolicy ?? "warn",
+          IDLE_LOOKBACK_MINUTES: String(idlePolicy.lookbackMinutes ?? 60),
+          IDLE_STOP_DELAY_MINUTES: String(idlePolicy.stopDelayMinutes ?? 120),
+          STATE_STORE: `dynamodb://${stateTable.tableName}`,
+          DAILY_REPORT_HOUR: "0",
+          REPORT_PERIOD_HOURS: "24",
+          REPORT_FORMAT: config.format ?? "text",
+          ...reportEnvironment,
+          ...ledgerEnvironment,
         },
         role: lambdaRole,
+        timeout: Duration.minutes(5),
         reservedConcurrentExecutions: 1,
         deadLetterQueue: dlq,
       },
     );
     TaggingUtils.applyTagsToResource(lambdaFunction, this.tags);
 
-    // Create a rule to invoke the lambda function at midnight UTC each night
+    // Create a rule to invoke the lambda function at midnight UTC each night, or every hour
     new events.Rule(this, "DailyMediaLiveNotificationRule", {
       ruleName: Aws.STACK_NAME + "-DailyMediaLiveNotificationRule",
       schedule: events.Schedule.cron({
         minute: "0",
-        hour: "0",
+        hour: config.schedule === "hourly" ? "*" : "0",
         day: "*",
         month: "*",
         year: "*",
@@ -689,6 +809,95 @@ export class Foundation extends Construct {
     return;
   }
 
+  // Function to create the ledger of running MediaLive channels. A lambda function invoked by
+  // 'MediaLive Channel State Change' events records when each LEF channel starts and stops.
+  createChannelLedger(): dynamodb.Table {
+    const ledgerTable = new dynamodb.Table(this, "ChannelLedgerTable", {
+      partitionKey: { name: "ChannelKey", type: dynamodb.AttributeType.STRING },
+      billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      encryption: dynamodb.TableEncryption.AWS_MANAGED,
+      pointInTimeRecoverySpecification: { pointInTimeRecoveryEnabled: true },
+      timeToLiveAttribute: "ExpiresAt",
+      removalPolicy: cdk.RemovalPolicy.DESTROY,
+    });
+    TaggingUtils.applyTagsToResource(ledgerTable, this.tags);
+
+    const ledgerRole = new iam.Role(this, "ChannelLedgerRole", {
+      assumedBy: new iam.ServicePrincipal("lambda.amazonaws.com"),
+      roleName: `${Aws.STACK_NAME}-${getRegionCode(this)}-ChannelLedgerRole`,
+      description: "Role for the ChannelLedger Lambda function",
+    });
+    TaggingUtils.applyTagsToResource(ledgerRole, this.tags);
+    ledgerRole.addToPolicy(
+      new iam.PolicyStatement({
+        effect: iam.Effect.ALLOW,
+        actions: [
+          "logs:CreateLogGroup",
+          "logs:CreateLogStream",
+          "logs:PutLogEvents",
+        ],
+        resources: [`arn:aws:logs:${Aws.REGION}:${Aws.ACCOUNT_ID}:log-group`],
+      }),
+    );
+    // Channels are described when they start to record their tags and billable outputs
+    ledgerRole.addToPolicy(
+      new iam.PolicyStatement({
+        effect: iam.Effect.ALLOW,
+        actions: ["medialive:DescribeChannel"],
+        resources: [`arn:aws:medialive:*:${Aws.ACCOUNT_ID}:channel:*`],
+      }),
+    );
+    ledgerTable.grant(ledgerRole, "dynamodb:GetItem", "dynamodb:PutItem");
+
+    NagSuppressions.addResourceSuppressions(
+      ledgerRole,
+      [
+        {
+          id: "AwsSolutions-IAM5",
+          reason:
+            "Resource is limited to log-groups in the account/region but a wildcard needs to " +
+            "be specified at the end of the resources due to the full resource name being unpredictable. " +
+            "Any MediaLive channel in the account can emit a state change event, so all channels " +
+            "can be described to check if they were deployed with LEF.",
+        },
+      ],
+      true,
+    );
+
+    const ledgerDlq = new sqs.Queue(this, "ChannelLedgerDLQ", {
+      retentionPeriod: Duration.days(14),
+      enforceSSL: true,
+    });
+    TaggingUtils.applyTagsToResource(ledgerDlq, this.tags);
+
+    const ledgerFunction = new lambda.Function(this, "ChannelLedgerFunction", {
+      functionName: Aws.STACK_NAME + "-ChannelLedgerFunction",
+      runtime: lambda.Runtime.PYTHON_3_14,
+      handler: "ledger.lambda_handler",
+      code: lambda.Code.fromAsset(
+        __dirname + "/../../lambda/daily_medialive_notification",
+      ),
+      environment: {
+        CHANNEL_LEDGER_TABLE: ledgerTable.tableName,
+      },
+      role: ledgerRole,
+      timeout: Duration.seconds(30),
+      deadLetterQueue: ledgerDlq,
+    });
+    TaggingUtils.applyTagsToResource(ledgerFunction, this.tags);
+
+    new events.Rule(this, "ChannelLedgerRule", {
+      ruleName: Aws.STACK_NAME + "-ChannelLedgerRule",
+      eventPattern: {
+        source: ["aws.medialive"],
+        detailType: ["MediaLive Channel State Change"],
+      },
+      targets: [new targets.LambdaFunction(ledgerFunction)],
+    });
+
+    return ledgerTable;
+  }
+
   // This function creates an SNS topic and subscribes to it using the email address specified in userEmail
   createSnsTopicWithSubscription(userEmail: string): sns.Topic {
     // Use the default AWS-provided SNS KMS key
@@ -13,6 +13,7 @@
 
 export interface IFoundationConfig {
   cloudFront: ICloudFrontConfig;
+  dailyNotification?: IDailyNotificationConfig;
 }
 
 export interface ICloudFrontConfig {
@@ -23,3 +24,43 @@ export interface ICloudFrontConfig {
   allowedMediaPackageManifestQueryStrings: string[];
   allowedMediaTailorManifestQueryStrings: "ALL" | string[];
 }
+
+export interface IDailyNotificationConfig {
+  // Regions scanned for running channels (default: the region of the foundation stack)
+  reportRegions?: string[];
+  // Roles in other accounts assumed to scan their channels. Each role needs
+  // medialive:ListChannels, medialive:DescribeChannel and cloudwatch:GetMetricData (read by the
+  // idle channel checks) and must trust this account.
+  crossAccountRoleArns?: string[];
+  // "hourly" checks every hour and only notifies about changes, with the full report sent at
+  // midnight UTC (default: "daily")
+  schedule?: "daily" | "hourly";
+  // "ledger" records running intervals from MediaLive channel state change events and reports
+  // exact running times instead of scanning the channels at each run (default: "scan").
+  // The ledger only covers the account and region of the foundation stack, so it cannot be
+  // combined with reportRegions or crossAccountRoleArns.
+  source?: "scan" | "ledger";
+  // "json" publishes the report as JSON documents for automated subscribers (default: "text")
+  format?: "text" | "json";
+  // Store the full report as JSON and HTML in an S3 bucket and only send a summary with a link
+  reportArchive?: IReportArchiveConfig;
+  idlePolicy?: IIdlePolicyConfig;
+}
+
+export interface IReportArchiveConfig {
+  // Number of days full reports are kept in the bucket (default: 90)
+  retentionDays?: number;
+}
+
+export interface IIdlePolicyConfig {
+  // Check running channels for missing input or egress (default: true)
+  enabled?: boolean;
+  // Only report what the policy would do (default: true). Set to false to allow channels to be stopped.
+  dryRun?: boolean;
+  // Policy of idle channels without a 'LefIdlePolicy' tag (default: "warn")
+  defaultPolicy?: "ignore" | "warn" | "schedule-stop" | "stop";
+  // Period over which NetworkIn and NetworkOut must be zero for a channel to be idle (default: 60)
+  lookbackMinutes?: number;
+  // Delay before a channel with the "schedule-stop" policy is stopped (default: 120)
+  stopDelayMinutes?: number;
+}
@@ -60,6 +60,7 @@ export class LefFoundationStack extends LefBaseStack {
     const cloudfront = new Foundation(this, "CloudFrontFoundation", {
       userEmail: userEmail,
       config: config.cloudFront,
+      dailyNotification: config.dailyNotification,
       tags: this.resourceTags,
     });
 
@@ -0,0 +1,161 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import importlib.util
+import os
+import threading
+import unittest
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+# Loaded under its own name, as every Lambda function module is called index
+spec = importlib.util.spec_from_file_location(
+    'check_stack_dependencies_index',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'lambda', 'check_stack_dependencies',
+                 'index.py'))
+index = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(index)
+
+
+class FakePaginator:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def paginate(self, **kwargs):
+        return iter(self.pages(**kwargs))
+
+
+class FakeCloudFormation:
+    """
+    CloudFormation client serving ListExports and ListImports from tables.
+
+    Imports are given per export name as a list of pages, so they can span several NextToken pages.
+    """
+
+    def __init__(self, exports, imports):
+        self.exports = exports
+        self.imports = imports
+        self.list_imports_calls = []
+        self.lock = threading.Lock()
+
+    def get_paginator(self, operation):
+        if operation == 'list_exports':
+            return FakePaginator(self.list_exports_pages)
+        return FakePaginator(self.list_imports_pages)
+
+    def list_exports_pages(self):
+        exports = [{'ExportingStackId': f"arn:aws:cloudformation:us-east-1:111111111111:stack/{stack}/uuid",
+                    'Name': name} for stack, names in self.exports.items() for name in names]
+        return [{'Exports': exports[:1]}, {'Exports': exports[1:]}]
+
+    def list_imports_pages(self, ExportName):
+        with self.lock:
+            self.list_imports_calls.append(ExportName)
+        if ExportName not in self.imports:
+            raise ClientError({'Error': {'Code': 'ValidationError',
+                                         'Message': f"Export '{ExportName}' is not imported by any stack."}},
+                              'ListImports')
+        return [{'Imports': page} for page in self.imports[ExportName]]
+
+
+class DependencyWalkerTest(unittest.TestCase):
+
+    def walk(self, exports, imports, stack_name='foundation'):
+        self.cfn = FakeCloudFormation(exports, imports)
+        with mock.patch.object(index, 'cfn', self.cfn):
+            return index.DependencyWalker(index.list_exports_by_stack()).walk(stack_name)
+
+    def test_no_dependents(self):
+        graph = self.walk({'foundation': ['foundation-bucket']}, {})
+        self.assertEqual(graph, {'foundation': {}})
+        self.assertEqual(index.get_deletion_order(graph, 'foundation'), [])
+
+    def test_follows_paginated_list_imports(self):
+        graph = self.walk({'foundation': ['foundation-bucket', 'foundation-role']},
+                          {'foundation-bucket': [['group-1', 'group-2'], ['group-3']],
+                           'foundation-role': [['group-3']]})
+        self.assertEqual(graph['foundation'], {
+            'group-1': ['foundation-bucket'],
+            'group-2': ['foundation-bucket'],
+            'group-3': ['foundation-bucket', 'foundation-role'],
+        })
+
+    def test_transitive_chain(self):
+        graph = self.walk({'foundation': ['foundation-out'], 'group': ['group-out'], 'event': ['event-out']},
+                          {'foundation-out': [['group', 'monitor']], 'group-out': [['event']],
+                           'event-out': [['monitor']]})
+        self.assertEqual(graph['group'], {'event': ['group-out']})
+        self.assertEqual(graph['event'], {'monitor': ['event-out']})
+        # Each stack is deleted before the stacks it imports from
+        self.assertEqual(index.get_deletion_order(graph, 'foundation'), ['monitor', 'event', 'group'])
+        # Each export is listed once
+        self.assertEqual(sorted(self.cfn.list_imports_calls), ['event-out', 'foundation-out', 'group-out'])
+
+    def test_other_list_imports_errors_are_raised(self):
+        cfn = FakeCloudFormation({}, {})
+        cfn.list_imports_pages = mock.Mock(side_effect=ClientError(
+            {'Error': {'Code': 'AccessDenied', 'Message': 'not authorized'}}, 'ListImports'))
+        with mock.patch.object(index, 'cfn', cfn), self.assertRaises(ClientError):
+            index.list_imports('foundation-out')
+
+
+class DescribeDependenciesTest(unittest.TestCase):
+
+    def test_lists_dependents_and_deletion_order(self):
+        graph = {'foundation': {'group': ['foundation-out']}, 'group': {'event': ['group-out']}, 'event': {}}
+        reason = index.describe_dependencies('foundation', graph)
+        self.assertEqual(reason, "Cannot delete stack foundation. 2 dependent stack(s): "
+                                 "group (imports foundation-out), event (imports group-out via group). "
+                                 "Delete them first, in this order: event, group")
+
+    def test_truncates_long_reason(self):
+        graph = {'foundation': {f"event-group-stack-with-a-long-name-{number:03d}": ['foundation-out']
+                                for number in range(200)}}
+        reason = index.describe_dependencies('foundation', graph)
+        self.assertLessEqual(len(reason), index.MAX_REASON_LENGTH)
+        self.assertIn('200 dependent stack(s)', reason)
+        self.assertRegex(reason, r'and \d+ more\. See the function log for the deletion order$')
+
+
+class LambdaHandlerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.event = {'RequestType': 'Delete', 'StackId': 'stack-id', 'RequestId': 'request-id',
+                      'LogicalResourceId': 'DependencyCheck', 'ResponseURL': 'https://example.com'}
+        patcher = mock.patch.dict(os.environ, {'STACK_NAME': 'foundation'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def handle(self, exports, imports):
+        with mock.patch.object(index, 'cfn', FakeCloudFormation(exports, imports)), \
+                mock.patch.object(index, 'send_response') as send_response:
+            index.lambda_handler(self.event, mock.Mock())
+        return send_response.call_args
+
+    def test_fails_delete_with_dependents(self):
+        args, kwargs = self.handle({'foundation': ['foundation-out']}, {'foundation-out': [['group']]})
+        self.assertEqual(args[2], 'FAILED')
+        self.assertIn('group (imports foundation-out)', args[3])
+        self.assertEqual(args[4], 'foundation-dependency-check')
+
+    def test_allows_delete_without_dependents(self):
+        args, kwargs = self.handle({'foundation': ['foundation-out']}, {})
+        self.assertEqual(args[2], 'SUCCESS')
+        self.assertEqual(kwargs['physical_id'], 'foundation-dependency-check')
+
+
+if __name__ == '__main__':
+    unittest.main()
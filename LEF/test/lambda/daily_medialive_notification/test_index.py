@@ -0,0 +1,123 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import os
+import sys
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'lambda',
+                                'daily_medialive_notification'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+import index  # noqa: E402
+
+NOW = datetime(2025, 1, 8, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeMediaLive:
+    """MediaLive client answering ListTagsForResource from a table of tags per channel ARN"""
+
+    def __init__(self, tags):
+        self.tags = tags
+        self.calls = []
+
+    def list_tags_for_resource(self, ResourceArn):
+        self.calls.append(ResourceArn)
+        tags = self.tags[ResourceArn]
+        if isinstance(tags, Exception):
+            raise tags
+        return {'Tags': tags}
+
+    def list_channels(self, **kwargs):
+        raise AssertionError('the ledger path must not list channels')
+
+
+class FakeSession:
+    def __init__(self, client):
+        self.medialive_client = client
+
+    def client(self, service, **kwargs):
+        return self.medialive_client
+
+
+def channel(channel_id, tags=None):
+    return {
+        'ChannelId': channel_id,
+        'Key': f"111111111111:us-east-1:{channel_id}",
+        'Arn': f"arn:aws:medialive:us-east-1:111111111111:channel:{channel_id}",
+        'AccountId': '111111111111',
+        'Region': 'us-east-1',
+        'Tags': tags or {},
+        'EventGroup': index.NO_EVENT_GROUP,
+        'Foundation': None,
+        'Running': True,
+        'IdleAction': None,
+    }
+
+
+class RefreshLedgerChannelsTest(unittest.TestCase):
+
+    def test_reads_tags_of_each_running_channel(self):
+        channels = [channel('1'), channel('2')]
+        client = FakeMediaLive({
+            channels[0]['Arn']: {index.EVENT_GROUP_TAG: 'group-a', 'LefIdlePolicy': 'stop'},
+            channels[1]['Arn']: {index.FOUNDATION_TAG: 'foundation'},
+        })
+        with mock.patch.object(index, 'check_idle_channels') as check:
+            index.refresh_ledger_channels(FakeSession(client), '111111111111', 'us-east-1', channels)
+        self.assertEqual(client.calls, [channels[0]['Arn'], channels[1]['Arn']])
+        self.assertEqual(channels[0]['EventGroup'], 'group-a')
+        self.assertEqual(channels[0]['Tags']['LefIdlePolicy'], 'stop')
+        self.assertEqual(channels[1]['Foundation'], 'foundation')
+        self.assertEqual(check.call_args[0][3], channels)
+
+    def test_skips_policies_of_channel_whose_tags_cannot_be_read(self):
+        channels = [channel('1'), channel('2')]
+        client = FakeMediaLive({
+            channels[0]['Arn']: RuntimeError('AccessDenied'),
+            channels[1]['Arn']: {},
+        })
+        with mock.patch.object(index, 'check_idle_channels') as check:
+            index.refresh_ledger_channels(FakeSession(client), '111111111111', 'us-east-1', channels)
+        self.assertEqual(channels[0]['IdleAction'], 'idle check failed: AccessDenied')
+        self.assertEqual(check.call_args[0][3], [channels[1]])
+
+
+class FakeLedger:
+    def __init__(self, items):
+        self.items = items
+
+    def is_seeded(self):
+        return True
+
+    def load_channels(self):
+        return self.items
+
+
+class CollectLedgerChannelsTest(unittest.TestCase):
+
+    def test_records_failed_refresh_as_error(self):
+        running = channel('1')
+        targets = [{'AccountId': '111111111111', 'Region': 'us-east-1', 'Session': FakeSession(None)}]
+        with mock.patch.object(index, 'get_ledger_channel_cost', side_effect=lambda item, *args: item), \
+                mock.patch.object(index, 'refresh_ledger_channels', side_effect=RuntimeError('boom')):
+            channels, errors = index.collect_ledger_channels(FakeLedger([running]), targets, {},
+                                                             {'UpdatedAt': None}, NOW)
+        self.assertEqual(channels, [running])
+        self.assertEqual(errors, [{'AccountId': '111111111111', 'Region': 'us-east-1', 'Error': 'boom'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
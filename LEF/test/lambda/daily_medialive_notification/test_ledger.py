@@ -0,0 +1,101 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'lambda',
+                                'daily_medialive_notification'))
+
+import ledger  # noqa: E402
+
+NOW = datetime(2025, 1, 8, 12, 0, tzinfo=timezone.utc)
+
+
+def at(hours):
+    """Normalised time the given number of hours after NOW (negative for before)"""
+    return (NOW + timedelta(hours=hours)).isoformat(timespec='seconds')
+
+
+class NormalizeTimeTest(unittest.TestCase):
+
+    def test_times_are_converted_to_utc_seconds(self):
+        self.assertEqual(ledger.normalize_time('2025-01-08T14:00:00.123+02:00'), '2025-01-08T12:00:00+00:00')
+        self.assertEqual(ledger.normalize_time('2025-01-08T12:00:00Z'), '2025-01-08T12:00:00+00:00')
+
+
+class ApplyStateChangeTest(unittest.TestCase):
+
+    def apply(self, item, state, hours):
+        return ledger.apply_state_change(item, state, at(hours), now=NOW)
+
+    def test_start_and_stop_record_an_interval(self):
+        item = self.apply({}, 'RUNNING', -3)
+        self.assertEqual(item['RunningSince'], at(-3))
+
+        item = self.apply(item, 'STOPPED', -1)
+        self.assertNotIn('RunningSince', item)
+        self.assertEqual(item['Intervals'], [[at(-3), at(-1)]])
+        self.assertEqual(item['LastState'], 'STOPPED')
+        self.assertEqual(item['ExpiresAt'], int((NOW + timedelta(days=ledger.LEDGER_RETENTION_DAYS)).timestamp()))
+
+    def test_restart_clears_expiry(self):
+        item = self.apply(self.apply(self.apply({}, 'RUNNING', -3), 'STOPPED', -2), 'RUNNING', -1)
+        self.assertEqual(item['RunningSince'], at(-1))
+        self.assertNotIn('ExpiresAt', item)
+
+    def test_duplicate_and_late_events_are_ignored(self):
+        item = self.apply(self.apply({}, 'RUNNING', -3), 'STOPPED', -1)
+        self.assertIsNone(self.apply(item, 'STOPPED', -1))
+        self.assertIsNone(self.apply(item, 'RUNNING', -2))
+
+    def test_repeated_running_keeps_the_first_start(self):
+        item = self.apply(self.apply({}, 'RUNNING', -3), 'RUNNING', -2)
+        self.assertEqual(item['RunningSince'], at(-3))
+        self.assertEqual(item['LastEventTime'], at(-2))
+
+    def test_stop_of_a_stopped_channel_adds_no_interval(self):
+        item = self.apply({}, 'STOPPED', -1)
+        self.assertEqual(item.get('Intervals', []), [])
+        self.assertEqual(item['LastState'], 'STOPPED')
+
+    def test_transitional_states_are_ignored(self):
+        self.assertIsNone(self.apply({}, 'STARTING', -1))
+        self.assertIsNone(self.apply({}, 'RECOVERING', -1))
+
+    def test_intervals_older_than_the_retention_are_dropped(self):
+        old = [at(-24 * (ledger.LEDGER_RETENTION_DAYS + 1) - 1), at(-24 * (ledger.LEDGER_RETENTION_DAYS + 1))]
+        recent = [at(-5), at(-4)]
+        item = self.apply({'Intervals': [old, recent]}, 'RUNNING', -2)
+        self.assertEqual(item['Intervals'], [recent])
+
+
+class GetRunningSecondsTest(unittest.TestCase):
+
+    def test_intervals_are_clipped_to_the_period(self):
+        item = {'Intervals': [[at(-30), at(-20)], [at(-5), at(-4)]]}
+        self.assertEqual(ledger.get_running_seconds(item, NOW - timedelta(hours=24), NOW), 5 * 3600)
+
+    def test_running_channel_counts_until_the_end_of_the_period(self):
+        item = {'Intervals': [[at(-10), at(-9)]], 'RunningSince': at(-2)}
+        self.assertEqual(ledger.get_running_seconds(item, NOW - timedelta(hours=24), NOW), 3 * 3600)
+
+    def test_intervals_outside_the_period_count_nothing(self):
+        item = {'Intervals': [[at(-48), at(-30)]]}
+        self.assertEqual(ledger.get_running_seconds(item, NOW - timedelta(hours=24), NOW), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
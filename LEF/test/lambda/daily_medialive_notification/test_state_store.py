@@ -0,0 +1,120 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import os
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'lambda',
+                                'daily_medialive_notification'))
+
+import state_store  # noqa: E402
+
+
+class FakeBatchWriter:
+    def __init__(self, table):
+        self.table = table
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def put_item(self, Item):
+        self.table.put_item(Item=Item)
+
+
+class FakeTable:
+    name = 'state'
+
+    def __init__(self):
+        self.items = {}
+
+    def get_item(self, Key, ConsistentRead):
+        item = self.items.get(Key['Id'])
+        return {'Item': item} if item else {}
+
+    def put_item(self, Item):
+        self.items[Item['Id']] = Item
+
+    def batch_writer(self):
+        return FakeBatchWriter(self)
+
+
+class FakeDynamoDB:
+    """DynamoDB resource returning at most two keys of each BatchGetItem request, the rest as unprocessed"""
+
+    def __init__(self):
+        self.table = FakeTable()
+
+    def Table(self, name):
+        return self.table
+
+    def batch_get_item(self, RequestItems):
+        request = RequestItems[self.table.name]
+        keys = request['Keys']
+        response = {'Responses': {self.table.name: [self.table.items[key['Id']] for key in keys[:2]
+                                                    if key['Id'] in self.table.items]}}
+        if keys[2:]:
+            response['UnprocessedKeys'] = {self.table.name: dict(request, Keys=keys[2:])}
+        return response
+
+
+def state(updated_at, count):
+    channels = {f"111111111111:us-east-1:{index}": {'ChannelId': str(index), 'Name': f"channel-{index}"}
+                for index in range(count)}
+    return {'Version': state_store.STATE_VERSION, 'UpdatedAt': updated_at, 'Channels': channels}
+
+
+class DynamoDBStateStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dynamodb = FakeDynamoDB()
+        with mock.patch.object(state_store.boto3, 'resource', return_value=self.dynamodb):
+            self.store = state_store.DynamoDBStateStore('state')
+
+    def test_round_trip_with_one_item_per_channel(self):
+        self.store.save(state('2025-01-08T12:00:00+00:00', 5))
+        self.assertEqual(self.store.load(), state('2025-01-08T12:00:00+00:00', 5))
+        snapshot = self.dynamodb.table.items[state_store.SNAPSHOT_ID]
+        self.assertEqual(snapshot['ChannelCount'], 5)
+        self.assertNotIn('State', snapshot)
+        self.assertEqual(len(self.dynamodb.table.items), 6)
+
+    def test_load_reads_latest_run_only(self):
+        self.store.save(state('2025-01-08T12:00:00+00:00', 5))
+        self.store.save(state('2025-01-08T13:00:00+00:00', 2))
+        self.assertEqual(self.store.load(), state('2025-01-08T13:00:00+00:00', 2))
+
+    def test_load_empty_table(self):
+        self.assertEqual(self.store.load(), state_store.empty_state())
+
+    def test_load_single_item_snapshot(self):
+        previous = state('2025-01-08T12:00:00+00:00', 1)
+        self.dynamodb.table.put_item(Item={'Id': state_store.SNAPSHOT_ID, 'UpdatedAt': previous['UpdatedAt'],
+                                           'State': json.dumps(previous)})
+        self.assertEqual(self.store.load(), previous)
+
+    def test_load_ignores_snapshot_with_missing_channels(self):
+        self.store.save(state('2025-01-08T12:00:00+00:00', 3))
+        missing = next(key for key, item in self.dynamodb.table.items.items() if 'ChannelKey' in item)
+        del self.dynamodb.table.items[missing]
+        self.assertEqual(self.store.load(), state_store.empty_state())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+"""
+Local stand-in for the MediaTailor transcodeProfile API.
+
+Serves GET and PUT on /transcodeProfile/{name} from memory so the profile loader can be integration
+and load tested without AWS. GET /playbackConfigurations (ListPlaybackConfigurations) pages through
+the playback configurations loaded with --playback-configurations. Requests must carry a SigV4
+Authorization header (the signature itself is not verified). Behaviour of the real API that the
+loader depends on is reproduced:
+
+- Missing profiles return 404, or 403 with --missing-status 403 (as seen with SigV4 on some accounts)
+- Accounts without custom transcode profiles enabled (--disabled) return 403 for every request
+- Uploaded profiles only become readable after --propagation-ms
+
+A latency and throttling profile (--latency-ms, --jitter-ms, --rps, --burst, --error-rate) makes
+it possible to measure batch upload throughput. Point the loader at the server with --endpoint-url:
+
+    python3 fake_mediatailor_server.py --port 8080 --latency-ms 40 --rps 20
+    AWS_ACCESS_KEY_ID=test AWS_SECRET_ACCESS_KEY=test load_custom_transcode_profiles.py \\
+        --endpoint-url http://localhost:8080 --region us-east-1 --profile-path encoding-profiles --yes
+"""
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PROFILE_PATH_PREFIX = "/transcodeProfile/"
+PLAYBACK_CONFIGURATIONS_PATH = "/playbackConfigurations"
+MAX_PLAYBACK_CONFIGURATION_RESULTS = 100
+
+
+@dataclass
+class ServiceProfile:
+    """Latency, throttling and behaviour settings of the stand-in service."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    requests_per_second: Optional[float] = None
+    burst: int = 10
+    error_rate: float = 0.0
+    propagation_ms: float = 0.0
+    missing_status: int = 404
+    enabled: bool = True
+    playback_configurations: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class ProfileStore:
+    """Thread safe in-memory profiles with a token bucket shared by all requests."""
+
+    def __init__(self, profile: ServiceProfile):
+        self.profile = profile
+        self.profiles: Dict[str, Tuple[bytes, float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.tokens = float(profile.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def take_token(self) -> bool:
+        if self.profile.requests_per_second is None:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.profile.burst, self.tokens + (now - self.updated) * self.profile.requests_per_second)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def get(self, name: str) -> Optional[bytes]:
+        with self.lock:
+            entry = self.profiles.get(name)
+        if entry is None or entry[1] > time.monotonic():
+            return None
+        return entry[0]
+
+    def put(self, name: str, content: bytes) -> None:
+        with self.lock:
+            self.profiles[name] = (content, time.monotonic() + self.profile.propagation_ms / 1000)
+
+
+class TranscodeProfileHandler(BaseHTTPRequestHandler):
+    """Request handler for /transcodeProfile/{name}."""
+    protocol_version = 'HTTP/1.1'
+    store: ProfileStore = None
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send(self, status: int, body: bytes = b'') -> None:
+        self.store.count(str(status))
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str) -> None:
+        self._send(status, json.dumps({'message': message}).encode('utf-8'))
+
+    def _prepare(self) -> Optional[str]:
+        """Apply the service profile. Returns the profile name, or None when a response was already sent."""
+        profile = self.store.profile
+        length = int(self.headers.get('Content-Length') or 0)
+        self.body = self.rfile.read(length) if length else b''
+        self.store.count(self.command)
+
+        delay = profile.latency_ms + random.uniform(-profile.jitter_ms, profile.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if not self.headers.get('Authorization', '').startswith('AWS4-HMAC-SHA256'):
+            self._send_error(403, "Missing Authentication Token")
+            return None
+        if not self.store.take_token():
+            self._send_error(429, "Rate exceeded")
+            return None
+        if random.random() < profile.error_rate:
+            self._send_error(503, "Service unavailable")
+            return None
+        path = urlsplit(self.path).path
+        if path == PLAYBACK_CONFIGURATIONS_PATH and self.command == 'GET':
+            self._list_playback_configurations()
+            return None
+        if not profile.enabled:
+            self._send_error(403, "User is not authorized to access this resource")
+            return None
+        if not path.startswith(PROFILE_PATH_PREFIX) or len(path) == len(PROFILE_PATH_PREFIX):
+            self._send_error(404, "Not found")
+            return None
+        return path[len(PROFILE_PATH_PREFIX):]
+
+    def _list_playback_configurations(self) -> None:
+        query = parse_qs(urlsplit(self.path).query)
+        start = int(query.get('NextToken', ['0'])[0])
+        page_size = min(int(query.get('MaxResults', [MAX_PLAYBACK_CONFIGURATION_RESULTS])[0]),
+                        MAX_PLAYBACK_CONFIGURATION_RESULTS)
+        configurations = self.store.profile.playback_configurations
+        page = {'Items': configurations[start:start + page_size]}
+        if start + page_size < len(configurations):
+            page['NextToken'] = str(start + page_size)
+        self._send(200, json.dumps(page).encode('utf-8'))
+
+    def do_GET(self):
+        name = self._prepare()
+        if name is None:
+            return
+        content = self.store.get(name)
+        if content is None:
+            self._send_error(self.store.profile.missing_status, f"Transcode profile {name} not found")
+        else:
+            self._send(200, content)
+
+    def do_PUT(self):
+        name = self._prepare()
+        if name is None:
+            return
+        try:
+            json.loads(self.body.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            self._send_error(400, "Transcode profile must be valid JSON")
+            return
+        self.store.put(name, self.body)
+        self._send(200, self.body)
+
+
+def start_server(profile: ServiceProfile, host: str = '127.0.0.1', port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start the stand-in service on a background thread.
+
+    Returns:
+        The server (call shutdown() to stop it) and its endpoint URL
+    """
+    handler = type('BoundTranscodeProfileHandler', (TranscodeProfileHandler,), {'store': ProfileStore(profile)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Local stand-in for the MediaTailor transcodeProfile API')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (default: 8080)')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Added latency per request in milliseconds')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Random +/- variation of the latency')
+    parser.add_argument('--rps', type=float, help='Sustained requests per second before returning 429')
+    parser.add_argument('--burst', type=int, default=10, help='Requests allowed in a burst when --rps is set')
+    parser.add_argument('--error-rate', type=float, default=0, help='Fraction of requests failing with 503')
+    parser.add_argument('--propagation-ms', type=float, default=0,
+                        help='Delay before an uploaded profile becomes readable')
+    parser.add_argument('--missing-status', type=int, choices=(403, 404), default=404,
+                        help='Status returned for profiles that do not exist')
+    parser.add_argument('--disabled', action='store_true',
+                        help='Behave like an account without custom transcode profiles enabled')
+    parser.add_argument('--playback-configurations',
+                        help='JSON file with a list of playback configurations returned by ListPlaybackConfigurations')
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the stand-in service until interrupted."""
+    args = parse_args()
+    playback_configurations = []
+    if args.playback_configurations:
+        with open(args.playback_configurations, 'r') as f:
+            playback_configurations = json.load(f)
+    profile = ServiceProfile(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        requests_per_second=args.rps,
+        burst=args.burst,
+        error_rate=args.error_rate,
+        propagation_ms=args.propagation_ms,
+        missing_status=args.missing_status,
+        enabled=not args.disabled,
+        playback_configurations=playback_configurations
+    )
+    server, url = start_server(profile, args.host, args.port)
+    logger.info(f"MediaTailor transcodeProfile stand-in listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        logger.info(f"Requests: {json.dumps(server.RequestHandlerClass.store.counters, sort_keys=True)}")
+
+
+if __name__ == "__main__":
+    main()
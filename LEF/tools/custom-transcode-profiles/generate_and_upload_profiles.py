@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+"""
+Generate custom transcode profiles from encoding profile configurations and upload them in one step.
+
+Each profile is built in memory by the encoding profile generator and handed straight to an upload
+worker, so no intermediate files are written and generation of the next profile overlaps with the
+upload of the previous ones. Profiles are named like the files the generator writes would be named
+by load_custom_transcode_profiles.py: '{config_name}-{output_type}-v{version}'.
+
+The generator keeps the trickmode settings of the profile being built in a module global, so
+profiles are generated one at a time on the main thread and only the uploads run in parallel.
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import signal
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+import yaml
+
+from load_custom_transcode_profiles import (DEFAULT_MAX_WORKERS, DEFAULT_READINESS_TIMEOUT, ENDPOINT_URL_ENV,
+                                            FAILURE_STATUSES, ON_CONFLICT_FAIL, ON_CONFLICT_OVERWRITE,
+                                            ON_CONFLICT_SKIP, STATUS_FAILED, STATUS_UNCHANGED, STATUS_UPLOADED,
+                                            AWSConfig, MediaTailorAPI, UploadResult, add_usage_arguments,
+                                            analyze_profile_usage, log_request_metrics, log_results_table,
+                                            process_profile_data, write_json_output)
+from profile_inventory import DEFAULT_INVENTORY_PATH, ProfileInventory, profile_hash
+
+# The encoding profile generator is a script in a sibling directory rather than a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'encoding-profile-generator'))
+import generate_encoding_profile_set as generator  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+CTP_OUTPUT_TYPES = ['mediatailor-hls-cmaf', 'mediatailor-dash-cmaf']
+
+
+def get_profile_name(config_path: str, output_type: str, version: str) -> str:
+    """Name of a generated profile, matching the name the loader derives for the generated file."""
+    return f"{generator.get_filename_without_ext(config_path)}-{output_type}-v{version}"
+
+
+def generate_profile(output_type: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build one custom transcode profile.
+
+    Not thread safe: the generator caches trickmode settings in a module global that is reset here
+    after every profile.
+    """
+    try:
+        # The generator reports skipped tracks with print(), keep stdout free for --output-json -
+        with contextlib.redirect_stdout(sys.stderr):
+            return json.loads(generator.createCustomTranscodeProfile(output_type, config))
+    finally:
+        generator.ctp_trickmode_settings = None
+
+
+def generate_profiles(configs: Dict[str, Dict[str, Any]], output_types: List[str],
+                      version: str) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Generate profiles one at a time.
+
+    Yields:
+        (profile name, configuration path, profile data or the exception raised while generating it)
+    """
+    for config_path, config in configs.items():
+        for output_type in output_types:
+            profile_name = get_profile_name(config_path, output_type, version)
+            logger.info(f"Generating '{profile_name}'")
+            try:
+                yield profile_name, config_path, generate_profile(output_type, config)
+            except Exception as e:
+                logger.error(f"Failed to generate profile '{profile_name}': {str(e)}")
+                yield profile_name, config_path, e
+
+
+def generate_and_upload(api: MediaTailorAPI, configs: Dict[str, Dict[str, Any]], output_types: List[str],
+                        version: str, max_workers: int = DEFAULT_MAX_WORKERS,
+                        inventory: ProfileInventory = None) -> List[UploadResult]:
+    """
+    Generate profiles and submit each one for upload as soon as it is built.
+
+    With an inventory, profiles whose content hash matches the inventory are reported as unchanged
+    without a request, and uploaded or unchanged profiles are recorded in it.
+
+    Returns:
+        Results in generation order
+    """
+    results: List[Any] = []
+    hashes: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for profile_name, config_path, profile_data in generate_profiles(configs, output_types, version):
+            if isinstance(profile_data, Exception):
+                results.append(UploadResult(profile_name, STATUS_FAILED, path=config_path,
+                                            message=f"generation failed: {profile_data}"))
+                continue
+            hashes[profile_name] = profile_hash(profile_data)
+            if inventory is not None and inventory.get_hash(profile_name) == hashes[profile_name]:
+                results.append(UploadResult(profile_name, STATUS_UNCHANGED, path=config_path,
+                                            message="matches inventory"))
+                continue
+            results.append(executor.submit(process_profile_data, api, profile_name, profile_data, config_path))
+        results = [result.result() if isinstance(result, Future) else result for result in results]
+
+    if inventory is not None:
+        for result in results:
+            if result.status in (STATUS_UPLOADED, STATUS_UNCHANGED):
+                inventory.record(result.profile_name, hashes[result.profile_name], source=result.path)
+        inventory.save()
+    return results
+
+
+def load_configs(config_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Load encoding profile configuration files.
+
+    Raises:
+        ValueError: If a file cannot be read or two configurations would produce the same profile names
+    """
+    configs: Dict[str, Dict[str, Any]] = {}
+    set_names: Dict[str, str] = {}
+    for config_path in config_paths:
+        set_name = generator.get_filename_without_ext(config_path)
+        if set_name in set_names:
+            raise ValueError(f"Configurations '{set_names[set_name]}' and '{config_path}' have the same name")
+        try:
+            with open(config_path, 'r') as config_file:
+                configs[config_path] = yaml.safe_load(config_file)
+        except (OSError, yaml.YAMLError) as e:
+            raise ValueError(f"Unable to read configuration '{config_path}': {e}") from e
+        set_names[set_name] = config_path
+    return configs
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse and validate command line arguments."""
+    parser = argparse.ArgumentParser(
+        description='Generate custom transcode profiles and upload them to AWS MediaTailor without intermediate files'
+    )
+    parser.add_argument(
+        '--config',
+        required=True,
+        action='append',
+        help='Path to an encoding profile configuration file (can be repeated)',
+        type=str
+    )
+    parser.add_argument(
+        '--version',
+        required=True,
+        help='Version number to append to profile names',
+        type=str
+    )
+    parser.add_argument(
+        '--output-type',
+        action='append',
+        choices=CTP_OUTPUT_TYPES,
+        help='Custom transcode profile type to generate (can be repeated, default: all)'
+    )
+    parser.add_argument(
+        '--max-workers',
+        help=f'Number of profiles uploaded in parallel (default: {DEFAULT_MAX_WORKERS})',
+        type=int,
+        default=DEFAULT_MAX_WORKERS
+    )
+    parser.add_argument(
+        '--readiness-timeout',
+        help=f'Seconds to wait for an uploaded profile to be readable (default: {DEFAULT_READINESS_TIMEOUT:g})',
+        type=float,
+        default=DEFAULT_READINESS_TIMEOUT
+    )
+    parser.add_argument(
+        '--sync',
+        help='Only upload profiles whose content differs from the cached inventory of the account, '
+             'and never overwrite versioned profile names',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--inventory',
+        help=f'Inventory file used by --sync (default: {DEFAULT_INVENTORY_PATH})',
+        type=str
+    )
+    parser.add_argument(
+        '--yes', '-y',
+        help='Do not ask for confirmation before uploading (for unattended runs)',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--on-conflict',
+        help='What to do when a profile exists with different content: skip it, fail it or overwrite it '
+             '(default: ask, or fail with --yes)',
+        choices=(ON_CONFLICT_SKIP, ON_CONFLICT_FAIL, ON_CONFLICT_OVERWRITE)
+    )
+    parser.add_argument(
+        '--output-json',
+        help="Write machine readable results to this file ('-' for standard output, logs stay on standard error)",
+        type=str
+    )
+    parser.add_argument(
+        '--endpoint-url',
+        help=f'Override the MediaTailor API endpoint, e.g. a local fake_mediatailor_server.py '
+             f'(default: ${ENDPOINT_URL_ENV} or the regional endpoint)',
+        type=str,
+        default=os.environ.get(ENDPOINT_URL_ENV)
+    )
+    parser.add_argument(
+        '--profile',
+        help='AWS profile name',
+        type=str
+    )
+    parser.add_argument(
+        '--region',
+        help='AWS region name',
+        type=str
+    )
+    add_usage_arguments(parser)
+    args = parser.parse_args()
+    if args.yes and args.on_conflict is None:
+        args.on_conflict = ON_CONFLICT_FAIL
+    return args
+
+
+def main() -> None:
+    """Main entry point for the script."""
+    args = parse_args()
+    output_types = args.output_type or CTP_OUTPUT_TYPES
+
+    try:
+        try:
+            configs = load_configs(args.config)
+        except ValueError as e:
+            logger.error(str(e))
+            sys.exit(1)
+
+        config = AWSConfig.create_from_args(args.profile, args.region, resolve_account=not args.endpoint_url)
+
+        # Log execution environment
+        logger.info("Operating environment:")
+        logger.info(f"AWS Account ID: {config.account_id}")
+        logger.info(f"AWS Region: {config.region}")
+        if args.endpoint_url:
+            logger.info(f"MediaTailor endpoint: {args.endpoint_url}")
+        profile_names = [
+            get_profile_name(config_path, output_type, args.version)
+            for config_path in configs for output_type in output_types
+        ]
+        for profile_name in profile_names:
+            logger.info(f"Profile to generate and upload: {profile_name}")
+        usage_index = analyze_profile_usage(args, config, profile_names)
+
+        # Confirm operation
+        if not args.yes and input(f"Proceed with upload of {len(profile_names)} profile(s)? (y/N): ").lower() != 'y':
+            logger.info("Operation cancelled")
+            return
+
+        # Check account enablement
+        api = MediaTailorAPI(config, readiness_timeout=args.readiness_timeout, max_connections=args.max_workers,
+                             refuse_versioned_overwrite=args.sync, endpoint_url=args.endpoint_url,
+                             on_conflict=args.on_conflict, usage_index=usage_index)
+        if not api.check_account_enabled():
+            logger.error(
+                "MediaTailor custom transcode profiles are not enabled for this account.\n"
+                "Please contact AWS support to enable this feature."
+            )
+            if args.output_json:
+                write_json_output(args.output_json, [], config, api.http_client.metrics,
+                                  error="custom transcode profiles are not enabled for this account")
+            sys.exit(1)
+
+        inventory = None
+        if args.sync:
+            inventory_path = args.inventory or DEFAULT_INVENTORY_PATH.format(account_id=config.account_id,
+                                                                             region=config.region)
+            inventory = ProfileInventory.load(inventory_path, config.account_id, config.region)
+
+        results = generate_and_upload(api, configs, output_types, args.version, max_workers=args.max_workers,
+                                      inventory=inventory)
+        log_results_table(results)
+        log_request_metrics(api.http_client.metrics)
+        if args.output_json:
+            write_json_output(args.output_json, results, config, api.http_client.metrics)
+
+        if any(result.status in FAILURE_STATUSES for result in results):
+            logger.error("Failed to generate or upload one or more profiles")
+            sys.exit(1)
+        sys.exit(0)
+
+    except Exception as e:
+        logger.error(f"Script execution failed: {str(e)}")
+        sys.exit(1)
+
+
+def signal_handler(sig, frame):
+    """Handle interrupt signal."""
+    logger.info("\nOperation cancelled by user")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    signal.signal(signal.SIGINT, signal_handler)
+    main()
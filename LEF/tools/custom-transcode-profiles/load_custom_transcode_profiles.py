@@ -13,23 +13,27 @@
 #  and limitations under the License.
 #######################################################################################################################
 
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, Dict, Iterable, List
+import fnmatch
+import glob
+import threading
 import time
 import boto3
-from botocore.auth import SigV4Auth
-from botocore.awsrequest import AWSRequest
-from botocore.endpoint import URLLib3Session
-from botocore.exceptions import ClientError, ProfileNotFound
-import urllib3
+from botocore.exceptions import BotoCoreError, ClientError, ConnectTimeoutError, ProfileNotFound, ReadTimeoutError
 import os
 import sys
 import json
 import argparse
 import signal
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 import logging
 from pathlib import Path
 
+from profile_inventory import DEFAULT_INVENTORY_PATH, ProfileInventory, is_versioned_name, profile_hash
+from profile_usage import DEFAULT_USAGE_CACHE_PATH, DEFAULT_USAGE_CACHE_TTL, ProfileUsageIndex, load_usage_index
+from signed_http_client import HTTPResponse, RequestMetrics, SignedHTTPClient
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -46,8 +50,33 @@ logging.getLogger('urllib3').setLevel(logging.WARNING)
 # Constants
 # amazonq-ignore-next-line
 DEFAULT_PROFILE_PATH = "../config/encoding-profiles"
+# Transcode profiles in a generated profile set. The other files of a set are MediaLive encoder settings.
+PROFILE_FILE_PATTERN = "mediatailor-*.json"
 MEDIATAILOR_API_BASE = "api.mediatailor.{region}.amazonaws.com"
 SERVICE_NAME = "mediatailor"
+# Environment variable overriding the MediaTailor endpoint, e.g. http://localhost:8080 for fake_mediatailor_server.py
+ENDPOINT_URL_ENV = "MEDIATAILOR_ENDPOINT_URL"
+LOCAL_ACCOUNT_ID = "000000000000"
+DEFAULT_MAX_WORKERS = 4
+# Readiness polling after an upload: exponential backoff between GETs until the deadline
+DEFAULT_READINESS_TIMEOUT = 30.0
+READINESS_INITIAL_DELAY = 0.1
+READINESS_MAX_DELAY = 2.0
+
+# Outcomes of processing a profile
+STATUS_UPLOADED = "uploaded"
+STATUS_UNCHANGED = "unchanged"
+STATUS_SKIPPED = "skipped"
+STATUS_FAILED = "failed"
+# Uploaded, but the account did not return the uploaded content before the readiness timeout
+STATUS_NOT_READY = "not_ready"
+# Outcomes that fail the run
+FAILURE_STATUSES = (STATUS_FAILED, STATUS_NOT_READY)
+
+# Handling of existing profiles with different content when running non-interactively
+ON_CONFLICT_SKIP = "skip"
+ON_CONFLICT_FAIL = "fail"
+ON_CONFLICT_OVERWRITE = "overwrite"
 
 @dataclass
 class AWSConfig:
@@ -57,13 +86,15 @@ class AWSConfig:
     account_id: str
 
     @classmethod
-    def create_from_args(cls, profile: Optional[str], region: Optional[str]) -> 'AWSConfig':
+    def create_from_args(cls, profile: Optional[str], region: Optional[str],
+                         resolve_account: bool = True) -> 'AWSConfig':
         """
         Create an AWSConfig instance from provided arguments.
         
         Args:
             profile: Optional AWS profile name
             region: Optional AWS region name
+            resolve_account: Look up the account ID with STS (disabled when testing against a local endpoint)
             
         Returns:
             AWSConfig instance
@@ -74,7 +105,10 @@ class AWSConfig:
         """
         try:
             session = cls._create_session(profile, region)
-            account_id = session.client('sts').get_caller_identity()['Account']
+            if resolve_account:
+                account_id = session.client('sts').get_caller_identity()['Account']
+            else:
+                account_id = LOCAL_ACCOUNT_ID
             return cls(session=session, region=session.region_name, account_id=account_id)
         except ValueError as e:
             raise ValueError(f"Failed to create AWS configuration: {str(e)}") from e
@@ -117,50 +151,63 @@ class AWSConfig:
                 logger.error("AWS security token has expired")
             raise
 
+@dataclass
+class UploadResult:
+    """Outcome of processing a single profile."""
+    profile_name: str
+    status: str
+    path: Optional[str] = None
+    message: str = ""
+    duration: float = 0.0
+    # Playback configurations using the profile, when the usage check ran
+    used_by: List[str] = field(default_factory=list)
+
 class MediaTailorAPI:
     """Handler for MediaTailor API operations."""
     
-    def __init__(self, config: AWSConfig):
+    def __init__(self, config: AWSConfig, readiness_timeout: float = DEFAULT_READINESS_TIMEOUT,
+                 max_connections: int = DEFAULT_MAX_WORKERS, refuse_versioned_overwrite: bool = False,
+                 endpoint_url: Optional[str] = None, on_conflict: Optional[str] = None,
+                 usage_index: Optional[ProfileUsageIndex] = None):
         self.config = config
-        self.http_session = URLLib3Session()
+        self.readiness_timeout = readiness_timeout
+        self.refuse_versioned_overwrite = refuse_versioned_overwrite
+        # None prompts for every conflicting profile
+        self.on_conflict = on_conflict
+        self.usage_index = usage_index
+        self.http_client = SignedHTTPClient(
+            config.session,
+            config.region,
+            SERVICE_NAME,
+            endpoint_url or f"https://{MEDIATAILOR_API_BASE.format(region=config.region)}",
+            max_pool_connections=max_connections
+        )
+        # Serialises overwrite prompts when profiles are processed concurrently
+        self._prompt_lock = threading.Lock()
 
-    def _make_request(self, method: str, endpoint: str, data: Optional[str] = None) -> urllib3.HTTPResponse:
+    def _make_request(self, method: str, endpoint: str, data: Optional[str] = None) -> HTTPResponse:
         """Make authenticated request to MediaTailor API."""
-        mediaTailorEndpointHostname=f"{MEDIATAILOR_API_BASE.format(region=self.config.region)}"
-        url = f"https://{mediaTailorEndpointHostname}/{endpoint}"
-        logger.debug(f"Making {method} request to {url}")
+        logger.debug(f"Making {method} request to {self.http_client.endpoint}/{endpoint}")
         logger.debug(f"Request data: {data if data else 'empty'}")
         
         headers = {
             'Content-Type': 'application/json',
-            'Accept': 'application/json',
-            'Host': f"{mediaTailorEndpointHostname}"
+            'Accept': 'application/json'
         }
-        request = AWSRequest(
-            method=method,
-            url=url,
-            headers=headers,
-            data=data.encode('utf-8') if data else b''
-        )
-        
-        auth = SigV4Auth(self.config.session.get_credentials(), SERVICE_NAME, self.config.region)
-        auth.add_auth(request)
         
         try:
-            prepared_request = request.prepare()
-            response = self.http_session.send(prepared_request)
+            response = self.http_client.request(method, endpoint, data=data, headers=headers)
             if logger.isEnabledFor(logging.DEBUG):
-                logger.debug(f"Request headers: {dict(prepared_request.headers)}")
                 logger.debug(f"Response status: {response.status_code}")
-                logger.debug(f"Response headers: {dict(response.headers)}")
+                logger.debug(f"Response headers: {response.headers}")
                 logger.debug(f"Response content: {response.content.decode('utf-8') if response.content else 'empty'}")
             return response
-        except urllib3.exceptions.RequestError as e:
-            logger.error(f"Network error during API request: {str(e)}", exc_info=True)
-            raise
-        except urllib3.exceptions.TimeoutError as e:
+        except (ConnectTimeoutError, ReadTimeoutError) as e:
             logger.error(f"Timeout error during API request: {str(e)}", exc_info=True)
             raise
+        except BotoCoreError as e:
+            logger.error(f"Network error during API request: {str(e)}", exc_info=True)
+            raise
         except Exception as e:
             logger.error(f"Unexpected error during API request: {str(e)}", exc_info=True)
             raise
@@ -179,12 +226,12 @@ class MediaTailorAPI:
                 return None
             if logger.isEnabledFor(logging.DEBUG):
                 logger.debug(f"Check profile exists response: status={response.status_code}, content={response.content.decode('utf-8')}")
-        except urllib3.exceptions.RequestError as e:
-            logger.error(f"Network error when checking if profile exists: {e}", exc_info=True)
-            return None
-        except urllib3.exceptions.TimeoutError as e:
+        except (ConnectTimeoutError, ReadTimeoutError) as e:
             logger.error(f"Timeout error when checking if profile exists: {e}", exc_info=True)
             return None
+        except BotoCoreError as e:
+            logger.error(f"Network error when checking if profile exists: {e}", exc_info=True)
+            return None
         # amazonq-ignore-next-line
         except Exception as e:
             logger.error(f"Unexpected error when checking if profile exists: {e}", exc_info=True)
@@ -213,12 +260,12 @@ class MediaTailorAPI:
         try:
             response = self._make_request('GET', "transcodeProfile/nonExistentProfile")
             return response.status_code == 404
-        except urllib3.exceptions.RequestError as e:
-            logger.error(f"Network error when checking account enablement: {e}")
-            return False
-        except urllib3.exceptions.TimeoutError as e:
+        except (ConnectTimeoutError, ReadTimeoutError) as e:
             logger.error(f"Timeout error when checking account enablement: {e}")
             return False
+        except BotoCoreError as e:
+            logger.error(f"Network error when checking account enablement: {e}")
+            return False
         except Exception as e:
             logger.error(f"Unexpected error when checking account enablement: {e}")
             return False
@@ -230,38 +277,81 @@ class MediaTailorAPI:
         Returns:
             True if successful, False otherwise
         """
-        if not self._check_and_confirm_profile_upload(profile_name, profile_data):
-            return False
+        return self.process_profile(profile_name, profile_data).status == STATUS_UPLOADED
 
-        return self._perform_profile_upload(profile_name, profile_data)
+    def process_profile(self, profile_name: str, profile_data: Dict[str, Any]) -> UploadResult:
+        """
+        Check a profile against the account and upload it if it is new, or changed and the overwrite is confirmed.
+        
+        Returns:
+            UploadResult describing what happened to the profile
+        """
+        started = time.monotonic()
+        result = self._process_profile(profile_name, profile_data)
+        result.duration = time.monotonic() - started
+        result.used_by = self.describe_usage(profile_name)
+        return result
 
-    def _check_and_confirm_profile_upload(self, profile_name: str, profile_data: Dict[str, Any]) -> bool:
+    def describe_usage(self, profile_name: str) -> List[str]:
+        """Playback configurations using a profile, empty when usage is unknown."""
+        if self.usage_index is None:
+            return []
+        return [usage.describe() for usage in self.usage_index.get_usages(profile_name)]
+
+    def _process_profile(self, profile_name: str, profile_data: Dict[str, Any]) -> UploadResult:
         logger.info(f"Checking if profile '{profile_name}' exists...")
         existing_profile = self.check_profile_exists(profile_name)
-        logger.info(f"Profile existence check result: {existing_profile is not None}")
-        
+        logger.info(f"Profile existence check result for '{profile_name}': {existing_profile is not None}")
+
         if existing_profile:
-            return self._handle_existing_profile(profile_name, profile_data, existing_profile)
-        return True
+            if self._is_profile_unchanged(profile_name, profile_data, existing_profile):
+                return UploadResult(profile_name, STATUS_UNCHANGED, message="same as the profile in the account")
+            used_by = self.describe_usage(profile_name)
+            if used_by:
+                logger.warning(f"Overwriting '{profile_name}' affects {len(used_by)} playback configuration(s): "
+                               f"{', '.join(used_by)}")
+            if self.refuse_versioned_overwrite and is_versioned_name(profile_name):
+                logger.error(f"Refusing to overwrite versioned profile '{profile_name}'. Increment the version instead.")
+                return UploadResult(profile_name, STATUS_FAILED,
+                                    message="versioned profile exists with different content")
+            if self.on_conflict == ON_CONFLICT_SKIP:
+                return UploadResult(profile_name, STATUS_SKIPPED, message="exists with different content")
+            if self.on_conflict == ON_CONFLICT_FAIL:
+                logger.error(f"Profile '{profile_name}' exists with different content")
+                return UploadResult(profile_name, STATUS_FAILED, message="exists with different content")
+            if self.on_conflict is None and not self._confirm_overwrite(profile_name):
+                return UploadResult(profile_name, STATUS_SKIPPED, message="overwrite not confirmed")
+
+        if not self._perform_profile_upload(profile_name, profile_data):
+            return UploadResult(profile_name, STATUS_FAILED, message="upload request failed")
 
-    def _handle_existing_profile(self, profile_name: str, profile_data: Dict[str, Any], existing_profile: str) -> bool:
+        started = time.monotonic()
+        if self.wait_for_profile(profile_name, profile_data):
+            return UploadResult(profile_name, STATUS_UPLOADED,
+                                message=f"readable after {time.monotonic() - started:.2f}s")
+        return UploadResult(profile_name, STATUS_NOT_READY,
+                            message=f"not readable with the uploaded content after {self.readiness_timeout:g}s")
+
+    def _is_profile_unchanged(self, profile_name: str, profile_data: Dict[str, Any], existing_profile: str) -> bool:
         existing_profile_dict = json.loads(existing_profile)
         logger.debug(f"Comparing profiles:\nExisting: {json.dumps(existing_profile_dict, sort_keys=True)}\nNew: {json.dumps(profile_data, sort_keys=True)}")
         if json.dumps(profile_data, sort_keys=True) == json.dumps(existing_profile_dict, sort_keys=True):
             logger.info(f"Profile '{profile_name}' is up to date")
             logger.info(f"Profile has not been loaded as it is the same as the version currently available in the account.")
-            return False
+            return True
         
         logger.warning(
             f"Profile '{profile_name}' exists with different content.\n"
             "WARNING: Updating existing profiles is not recommended as it won't retranscode existing ads.\n"
             "RECOMMENDATION: Use versioned profile names for changes."
         )
-        
-        return self._confirm_overwrite(profile_name)
+        return False
 
     def _confirm_overwrite(self, profile_name: str) -> bool:
-        response = input(f"Profile '{profile_name}' already exists. Do you want to overwrite it? (y/N): ")
+        with self._prompt_lock:
+            used_by = self.describe_usage(profile_name)
+            in_use = f" and is used by {len(used_by)} playback configuration(s)" if used_by else ""
+            response = input(f"Profile '{profile_name}' already exists{in_use}. Do you want to overwrite it? (y/N): ")
         if response.lower() != 'y':
             logger.info("Upload cancelled")
             return False
@@ -276,7 +366,6 @@ class MediaTailorAPI:
         
         if response.status_code == 200:
             logger.info(f"Successfully uploaded profile '{profile_name}'")
-            time.sleep(2)
             return True
         elif response.status_code == 409:
             logger.error(f"Profile '{profile_name}' already exists")
@@ -285,6 +374,280 @@ class MediaTailorAPI:
         logger.error(f"Failed to upload profile '{profile_name}': {response.content.decode('utf-8')}")
         return False
 
+    def wait_for_profile(self, profile_name: str, profile_data: Dict[str, Any]) -> bool:
+        """
+        Poll the profile until the account returns the uploaded content, backing off exponentially
+        between requests until the readiness timeout.
+        
+        Returns:
+            True if the profile was readable with the uploaded content before the deadline
+        """
+        expected = json.dumps(profile_data, sort_keys=True)
+        deadline = time.monotonic() + self.readiness_timeout
+        delay = READINESS_INITIAL_DELAY
+        while True:
+            try:
+                response = self._make_request('GET', f"transcodeProfile/{profile_name}")
+                if response.status_code == 200 and response.content:
+                    if json.dumps(json.loads(response.content.decode('utf-8')), sort_keys=True) == expected:
+                        logger.info(f"Profile '{profile_name}' is readable")
+                        return True
+            except (BotoCoreError, json.JSONDecodeError) as e:
+                logger.debug(f"Readiness check for '{profile_name}' failed: {e}")
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Profile '{profile_name}' was not readable with the uploaded content "
+                               f"after {self.readiness_timeout:g}s")
+                return False
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, READINESS_MAX_DELAY)
+
+def derive_profile_name(profile_path: str) -> str:
+    """Derive a profile name from its path as '{directory}-{filename_no_ext}'."""
+    path = Path(profile_path)
+    filename_no_ext = path.name[:-5] if path.name.endswith('.json') else path.name
+    directory = path.parent.name
+    return f"{directory}-{filename_no_ext}" if directory else filename_no_ext
+
+def resolve_profile_paths(profile_paths: List[str], exclude_paths: Iterable[Optional[str]] = ()) -> List[str]:
+    """
+    Expand profile paths into a sorted list of JSON files.
+    
+    Each path may be a JSON file, a directory or a glob pattern. A directory includes every
+    transcode profile below it (PROFILE_FILE_PATTERN), so a directory containing several generated
+    profile sets loads all of them; the MediaLive encoder settings generated next to the profiles
+    are skipped. Directories and patterns skip hidden files and directories and the files in
+    exclude_paths, so the state and report files written by this tool are never uploaded as profiles.
+    
+    Args:
+        profile_paths: Files, directories or glob patterns
+        exclude_paths: Files never included from a directory or pattern (None entries are ignored)
+    
+    Raises:
+        ValueError: If a path matches no JSON files
+    """
+    excluded = {os.path.realpath(path) for path in exclude_paths if path}
+
+    def is_candidate(path: str, base: str) -> bool:
+        hidden = any(part.startswith('.') for part in Path(os.path.relpath(path, base)).parts)
+        return not hidden and os.path.realpath(path) not in excluded
+
+    resolved = set()
+    for profile_path in profile_paths:
+        if os.path.isdir(profile_path):
+            candidates = [str(path) for path in Path(profile_path).rglob('*.json')
+                          if is_candidate(str(path), profile_path)]
+            matches = [path for path in candidates if fnmatch.fnmatch(os.path.basename(path), PROFILE_FILE_PATTERN)]
+            for path in sorted(set(candidates) - set(matches)):
+                logger.info(f"Skipping {path}: not a transcode profile ({PROFILE_FILE_PATTERN})")
+        elif glob.has_magic(profile_path):
+            # glob already skips hidden names unless the pattern spells them out
+            matches = [path for path in glob.glob(profile_path, recursive=True)
+                       if path.endswith('.json') and os.path.realpath(path) not in excluded]
+        elif profile_path.endswith('.json'):
+            matches = [profile_path]
+        else:
+            raise ValueError(f"Profile path must point to a JSON file, a directory or a glob pattern: {profile_path}")
+        if not matches:
+            raise ValueError(f"No JSON profiles found for '{profile_path}'")
+        resolved.update(matches)
+    return sorted(resolved)
+
+def load_and_process_profile(api: MediaTailorAPI, profile_path: str, profile_name: str) -> UploadResult:
+    """Load a profile file and upload it, capturing any error in the result."""
+    try:
+        with open(profile_path, 'r') as f:
+            profile_data = json.load(f)
+    except FileNotFoundError:
+        return UploadResult(profile_name, STATUS_FAILED, path=profile_path, message="profile file not found")
+    except json.JSONDecodeError:
+        return UploadResult(profile_name, STATUS_FAILED, path=profile_path, message="invalid JSON in profile file")
+
+    return process_profile_data(api, profile_name, profile_data, profile_path)
+
+def process_profile_data(api: MediaTailorAPI, profile_name: str, profile_data: Dict[str, Any],
+                         profile_path: Optional[str] = None) -> UploadResult:
+    """Upload a profile that is already in memory, capturing any error in the result."""
+    try:
+        result = api.process_profile(profile_name, profile_data)
+    except Exception as e:
+        logger.error(f"Failed to process profile '{profile_name}': {str(e)}")
+        result = UploadResult(profile_name, STATUS_FAILED, message=str(e))
+    result.path = profile_path
+    return result
+
+def upload_profiles(api: MediaTailorAPI, profiles: Dict[str, str],
+                    max_workers: int = DEFAULT_MAX_WORKERS) -> List[UploadResult]:
+    """
+    Upload profiles concurrently with at most max_workers requests in flight.
+    
+    Args:
+        api: MediaTailor API handler
+        profiles: Profile names mapped to the paths of their JSON files
+        max_workers: Number of profiles processed in parallel
+    
+    Returns:
+        Results in the same order as profiles
+    """
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [
+            executor.submit(load_and_process_profile, api, profile_path, profile_name)
+            for profile_name, profile_path in profiles.items()
+        ]
+        return [future.result() for future in futures]
+
+def refresh_inventory(api: MediaTailorAPI, inventory: ProfileInventory, profile_names: List[str],
+                      max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+    """Replace the inventory entries of the given profiles with the content currently in the account."""
+    def refresh(profile_name: str) -> None:
+        existing_profile = api.check_profile_exists(profile_name)
+        if existing_profile is None:
+            inventory.forget(profile_name)
+        else:
+            inventory.record(profile_name, profile_hash(json.loads(existing_profile)), source='account')
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        list(executor.map(refresh, profile_names))
+
+def sync_profiles(api: MediaTailorAPI, profiles: Dict[str, str], inventory: ProfileInventory,
+                  max_workers: int = DEFAULT_MAX_WORKERS) -> List[UploadResult]:
+    """
+    Upload only the profiles whose content hash differs from the inventory and record the outcome.
+    Profiles that match the inventory are reported as unchanged without any request to MediaTailor.
+    """
+    results: Dict[str, UploadResult] = {}
+    pending: Dict[str, str] = {}
+    hashes: Dict[str, str] = {}
+    for profile_name, profile_path in profiles.items():
+        try:
+            with open(profile_path, 'r') as f:
+                hashes[profile_name] = profile_hash(json.load(f))
+        except (OSError, json.JSONDecodeError) as e:
+            results[profile_name] = UploadResult(profile_name, STATUS_FAILED, path=profile_path,
+                                                 message=f"unable to read profile: {e}")
+            continue
+        if inventory.get_hash(profile_name) == hashes[profile_name]:
+            results[profile_name] = UploadResult(profile_name, STATUS_UNCHANGED, path=profile_path,
+                                                 message="matches inventory")
+        else:
+            pending[profile_name] = profile_path
+
+    logger.info(f"{len(profiles) - len(pending)} profile(s) match the inventory, {len(pending)} to check")
+    for result in upload_profiles(api, pending, max_workers=max_workers):
+        results[result.profile_name] = result
+        if result.status in (STATUS_UPLOADED, STATUS_UNCHANGED):
+            inventory.record(result.profile_name, hashes[result.profile_name], source=result.path)
+    inventory.save()
+    return [results[profile_name] for profile_name in profiles]
+
+def log_results_table(results: List[UploadResult]) -> None:
+    """Log a table with the outcome of every profile."""
+    name_width = max([len("Profile")] + [len(result.profile_name) for result in results])
+    logger.info(f"{'Profile':<{name_width}}  {'Status':<9}  {'Time':>7}  Details")
+    for result in results:
+        logger.info(f"{result.profile_name:<{name_width}}  {result.status:<9}  {result.duration:>6.2f}s  {result.message}")
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    logger.info("Summary: " + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+
+def log_request_metrics(metrics: RequestMetrics) -> None:
+    """Log request counts and latencies of the MediaTailor API client."""
+    summary = metrics.summary()
+    if not summary['requests']:
+        return
+    logger.info(
+        f"API requests: {summary['requests']} ({summary['retries']} retries, {summary['throttled']} throttled, "
+        f"{summary['errors']} errors), latency p50 {summary['p50_seconds']:.3f}s, "
+        f"p95 {summary['p95_seconds']:.3f}s, max {summary['max_seconds']:.3f}s"
+    )
+
+def write_json_output(output_path: str, results: List[UploadResult], config: Optional[AWSConfig] = None,
+                      metrics: Optional[RequestMetrics] = None, error: Optional[str] = None) -> None:
+    """Write the results as JSON to a file, or to standard output when output_path is '-'."""
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    document = {
+        'accountId': config.account_id if config else None,
+        'region': config.region if config else None,
+        'success': error is None and not any(counts.get(status) for status in FAILURE_STATUSES),
+        'error': error,
+        'summary': counts,
+        'results': [
+            {
+                'profileName': result.profile_name,
+                'path': result.path,
+                'status': result.status,
+                'message': result.message,
+                'durationSeconds': round(result.duration, 3),
+                'usedBy': result.used_by
+            }
+            for result in results
+        ],
+        'requests': metrics.summary() if metrics else None
+    }
+    if output_path == '-':
+        json.dump(document, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(output_path, 'w') as f:
+            json.dump(document, f, indent=2)
+
+def analyze_profile_usage(args: argparse.Namespace, config: AWSConfig,
+                          profile_names: List[str]) -> Optional[ProfileUsageIndex]:
+    """
+    Index the playback configurations using each profile and log the ones affected by this run.
+
+    Returns:
+        The usage index, or None when the check is disabled or the playback configurations cannot be listed
+    """
+    if args.skip_usage_check:
+        return None
+    cache_path = args.usage_cache or DEFAULT_USAGE_CACHE_PATH.format(account_id=config.account_id,
+                                                                     region=config.region)
+    try:
+        usage_index = load_usage_index(config.session, config.account_id, config.region, cache_path,
+                                       ttl=args.usage_cache_ttl, refresh=args.refresh_usage,
+                                       endpoint_url=args.endpoint_url)
+    except Exception as e:
+        logger.warning(f"Unable to list playback configurations, profile usage is unknown: {str(e)}")
+        return None
+
+    in_use = {profile_name: usage_index.get_usages(profile_name) for profile_name in profile_names}
+    in_use = {profile_name: usages for profile_name, usages in in_use.items() if usages}
+    if not in_use:
+        logger.info("None of the profiles are used by a playback configuration")
+    for profile_name, usages in in_use.items():
+        logger.info(f"Profile '{profile_name}' is used by {len(usages)} playback configuration(s): "
+                    f"{', '.join(usage.describe() for usage in usages)}")
+    return usage_index
+
+def add_usage_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of the playback configuration usage check."""
+    parser.add_argument(
+        '--skip-usage-check',
+        help='Do not look up which playback configurations use the profiles',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--usage-cache',
+        help=f'Cache file of the playback configuration usage index (default: {DEFAULT_USAGE_CACHE_PATH})',
+        type=str
+    )
+    parser.add_argument(
+        '--usage-cache-ttl',
+        help=f'Seconds a cached usage index is reused (default: {DEFAULT_USAGE_CACHE_TTL})',
+        type=float,
+        default=DEFAULT_USAGE_CACHE_TTL
+    )
+    parser.add_argument(
+        '--refresh-usage',
+        help='Rebuild the usage index even when the cache is fresh',
+        action='store_true'
+    )
+
 def parse_args() -> argparse.Namespace:
     """Parse and validate command line arguments."""
     parser = argparse.ArgumentParser(
@@ -293,14 +656,67 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         '--profile-path',
         required=True,
-        help='Path to the JSON profile file to upload',
+        action='append',
+        help='Path to a JSON profile file, a directory of profile sets or a glob pattern (can be repeated)',
         type=str
     )
     parser.add_argument(
         '--profile-name',
-        help='Name to use when loading the profile into AWS (default: derived from file path)',
+        help='Name to use when loading the profile into AWS (default: derived from file path). '
+             'Only valid when a single profile is uploaded',
+        type=str
+    )
+    parser.add_argument(
+        '--max-workers',
+        help=f'Number of profiles uploaded in parallel (default: {DEFAULT_MAX_WORKERS})',
+        type=int,
+        default=DEFAULT_MAX_WORKERS
+    )
+    parser.add_argument(
+        '--readiness-timeout',
+        help=f'Seconds to wait for an uploaded profile to be readable (default: {DEFAULT_READINESS_TIMEOUT:g})',
+        type=float,
+        default=DEFAULT_READINESS_TIMEOUT
+    )
+    parser.add_argument(
+        '--sync',
+        help='Only upload profiles whose content differs from the cached inventory of the account, '
+             'and never overwrite versioned profile names (e.g. -v2)',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--inventory',
+        help=f'Inventory file used by --sync (default: {DEFAULT_INVENTORY_PATH})',
         type=str
     )
+    parser.add_argument(
+        '--refresh-inventory',
+        help='Re-read the profiles from the account before syncing instead of trusting the cached inventory',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--yes', '-y',
+        help='Do not ask for confirmation before uploading (for unattended runs)',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--on-conflict',
+        help='What to do when a profile exists with different content: skip it, fail it or overwrite it '
+             '(default: ask, or fail with --yes)',
+        choices=(ON_CONFLICT_SKIP, ON_CONFLICT_FAIL, ON_CONFLICT_OVERWRITE)
+    )
+    parser.add_argument(
+        '--output-json',
+        help="Write machine readable results to this file ('-' for standard output, logs stay on standard error)",
+        type=str
+    )
+    parser.add_argument(
+        '--endpoint-url',
+        help=f'Override the MediaTailor API endpoint, e.g. a local fake_mediatailor_server.py '
+             f'(default: ${ENDPOINT_URL_ENV} or the regional endpoint)',
+        type=str,
+        default=os.environ.get(ENDPOINT_URL_ENV)
+    )
     parser.add_argument(
         '--profile',
         help='AWS profile name',
@@ -310,66 +726,90 @@ def parse_args() -> argparse.Namespace:
         '--region',
         help='AWS region'
     )
-    return parser.parse_args()
+    add_usage_arguments(parser)
+    args = parser.parse_args()
+    if args.yes and args.on_conflict is None:
+        args.on_conflict = ON_CONFLICT_FAIL
+    return args
 
 def main() -> None:
     """Main entry point for the script."""
     args = parse_args()
     
     try:
-        # Validate profile path
-        if not args.profile_path.endswith('.json'):
-            logger.error(f"Profile path must point to a JSON file")
+        # Resolve the profile files to upload
+        try:
+            profile_paths = resolve_profile_paths(args.profile_path,
+                                                  exclude_paths=[args.inventory, args.usage_cache, args.output_json])
+        except ValueError as e:
+            logger.error(str(e))
+            sys.exit(1)
+
+        if args.profile_name and len(profile_paths) > 1:
+            logger.error("--profile-name can only be used when uploading a single profile")
             sys.exit(1)
 
-        # Determine profile name
-        profile_name = args.profile_name
-        if not profile_name:
-            # Extract directory and filename
-            path_parts = args.profile_path.split('/')
-            directory = path_parts[-2] if len(path_parts) > 1 else ''
-            filename = path_parts[-1]
-            # Remove .json extension and construct name
-            filename_no_ext = filename[:-5] if filename.endswith('.json') else filename
-            profile_name = f"{directory}-{filename_no_ext}" if directory else filename_no_ext
-
-        config = AWSConfig.create_from_args(args.profile, args.region)
+        # Determine profile names
+        profiles: Dict[str, str] = {}
+        for profile_path in profile_paths:
+            profile_name = args.profile_name or derive_profile_name(profile_path)
+            if profile_name in profiles:
+                logger.error(f"Profiles '{profiles[profile_name]}' and '{profile_path}' would both be named '{profile_name}'")
+                sys.exit(1)
+            profiles[profile_name] = profile_path
+
+        config = AWSConfig.create_from_args(args.profile, args.region, resolve_account=not args.endpoint_url)
         
         # Log execution environment
         logger.info("Operating environment:")
         logger.info(f"AWS Account ID: {config.account_id}")
         logger.info(f"AWS Region: {config.region}")
-        logger.info(f"Profile to upload: {profile_name}")
-        logger.info(f"Profile path: {args.profile_path}")
+        if args.endpoint_url:
+            logger.info(f"MediaTailor endpoint: {args.endpoint_url}")
+        for profile_name, profile_path in profiles.items():
+            logger.info(f"Profile to upload: {profile_name} ({profile_path})")
+        usage_index = analyze_profile_usage(args, config, list(profiles))
         
         # Confirm operation
-        if input("Proceed with profile upload? (y/N): ").lower() != 'y':
+        if not args.yes and input(f"Proceed with upload of {len(profiles)} profile(s)? (y/N): ").lower() != 'y':
             logger.info("Operation cancelled")
             return
             
         # Check account enablement
-        api = MediaTailorAPI(config)
+        api = MediaTailorAPI(config, readiness_timeout=args.readiness_timeout, max_connections=args.max_workers,
+                             refuse_versioned_overwrite=args.sync, endpoint_url=args.endpoint_url,
+                             on_conflict=args.on_conflict, usage_index=usage_index)
         if not api.check_account_enabled():
             logger.error(
                 "MediaTailor custom transcode profiles are not enabled for this account.\n"
                 "Please contact AWS support to enable this feature."
             )
+            if args.output_json:
+                write_json_output(args.output_json, [], config, api.http_client.metrics,
+                                  error="custom transcode profiles are not enabled for this account")
             sys.exit(1)
             
-        # Process profile
-        try:
-            with open(args.profile_path, 'r') as f:
-                profile_data = json.load(f)
-        except FileNotFoundError:
-            logger.error(f"Profile file not found: {args.profile_path}")
-            sys.exit(1)
-        except json.JSONDecodeError:
-            logger.error(f"Invalid JSON in profile file: {args.profile_path}")
+        # Upload profiles
+        if args.sync:
+            inventory_path = args.inventory or DEFAULT_INVENTORY_PATH.format(account_id=config.account_id,
+                                                                             region=config.region)
+            inventory = ProfileInventory.load(inventory_path, config.account_id, config.region)
+            if args.refresh_inventory:
+                refresh_inventory(api, inventory, list(profiles), max_workers=args.max_workers)
+            results = sync_profiles(api, profiles, inventory, max_workers=args.max_workers)
+        else:
+            results = upload_profiles(api, profiles, max_workers=args.max_workers)
+        log_results_table(results)
+        log_request_metrics(api.http_client.metrics)
+        if args.output_json:
+            write_json_output(args.output_json, results, config, api.http_client.metrics)
+
+        if any(result.status in FAILURE_STATUSES for result in results):
+            logger.error("Failed to upload one or more profiles")
             sys.exit(1)
-            
-        # Upload profile
-        if not api.upload_profile(profile_name, profile_data):
-            logger.error(f"Failed to upload profile {profile_name}")
+        interactive = not (args.sync or args.yes or args.on_conflict)
+        if interactive and len(results) == 1 and results[0].status != STATUS_UPLOADED:
+            logger.error(f"Failed to upload profile {results[0].profile_name}")
             sys.exit(1)
             
         sys.exit(0)
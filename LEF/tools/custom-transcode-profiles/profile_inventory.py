@@ -0,0 +1,120 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+"""
+Content hash inventory of the custom transcode profiles in an account.
+
+The transcodeProfile API has no documented listing operation, so the inventory of remote profiles
+is cached in a local JSON manifest per account and region, under ~/.cache/lef by default. Each entry
+holds the SHA-256 of the canonical JSON of the profile last verified in (or uploaded to) the account.
+A sync compares the hashes of the local profiles with the inventory and only contacts MediaTailor for
+profiles that are new or changed, so an idempotent re-run makes no requests at all. The inventory can
+be refreshed from the account with one GET per profile.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# State kept between runs lives outside the working directory, so it is never loaded as a profile
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'lef')
+DEFAULT_INVENTORY_PATH = os.path.join(DEFAULT_CACHE_DIR, "transcode-profile-inventory-{account_id}-{region}.json")
+INVENTORY_VERSION = 1
+# Profile names ending in a version suffix (e.g. -v3) must never be overwritten with different content
+VERSIONED_NAME_PATTERN = re.compile(r'-v\d+$')
+
+
+def profile_hash(profile_data: Dict[str, Any]) -> str:
+    """SHA-256 of the canonical JSON form of a profile (sorted keys, no insignificant whitespace)."""
+    canonical = json.dumps(profile_data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def is_versioned_name(profile_name: str) -> bool:
+    return VERSIONED_NAME_PATTERN.search(profile_name) is not None
+
+
+class ProfileInventory:
+    """Cached hashes of the profiles known to be in an account."""
+
+    def __init__(self, path: str, account_id: str, region: str):
+        self.path = path
+        self.account_id = account_id
+        self.region = region
+        self.profiles: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, account_id: str, region: str) -> 'ProfileInventory':
+        """
+        Load an inventory file. A missing file, or a file written for another account or region,
+        gives an empty inventory.
+        """
+        inventory = cls(path, account_id, region)
+        try:
+            with open(path, 'r') as f:
+                document = json.load(f)
+        except FileNotFoundError:
+            return inventory
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable profile inventory '{path}': {e}")
+            return inventory
+
+        if (document.get('version') != INVENTORY_VERSION or document.get('accountId') != account_id
+                or document.get('region') != region):
+            logger.warning(f"Ignoring profile inventory '{path}' written for another account, region or version")
+            return inventory
+        inventory.profiles = document.get('profiles', {})
+        return inventory
+
+    def save(self) -> None:
+        """Write the inventory atomically."""
+        with self._lock:
+            document = {
+                'version': INVENTORY_VERSION,
+                'accountId': self.account_id,
+                'region': self.region,
+                'profiles': dict(sorted(self.profiles.items()))
+            }
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w') as f:
+            json.dump(document, f, indent=2)
+        os.replace(temporary_path, self.path)
+
+    def get_hash(self, profile_name: str) -> Optional[str]:
+        with self._lock:
+            entry = self.profiles.get(profile_name)
+        return entry['hash'] if entry else None
+
+    def record(self, profile_name: str, content_hash: str, source: Optional[str] = None) -> None:
+        with self._lock:
+            self.profiles[profile_name] = {
+                'hash': content_hash,
+                'verifiedAt': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'source': source
+            }
+
+    def forget(self, profile_name: str) -> None:
+        with self._lock:
+            self.profiles.pop(profile_name, None)
+
+    def is_in_sync(self, profile_name: str, profile_data: Dict[str, Any]) -> bool:
+        return self.get_hash(profile_name) == profile_hash(profile_data)
@@ -0,0 +1,161 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+"""
+Index of the MediaTailor playback configurations that use each custom transcode profile.
+
+A playback configuration uses a profile through its TranscodeProfileName, or through the values of
+the 'player_params.transcode_profile' configuration alias when TranscodeProfileName is the dynamic
+variable '[player_params.transcode_profile]'. The index is built from a single paginated pass over
+ListPlaybackConfigurations, which returns both fields, and is cached in a local JSON file per
+account and region (under ~/.cache/lef by default) so repeated runs against accounts with hundreds
+of playback configurations do not page through all of them again.
+"""
+
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from botocore.config import Config
+
+from profile_inventory import DEFAULT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USAGE_CACHE_PATH = os.path.join(DEFAULT_CACHE_DIR, "transcode-profile-usage-{account_id}-{region}.json")
+DEFAULT_USAGE_CACHE_TTL = 300
+USAGE_CACHE_VERSION = 1
+TRANSCODE_PROFILE_ALIAS = "player_params.transcode_profile"
+PAGE_SIZE = 100
+
+
+@dataclass
+class ProfileUsage:
+    """A playback configuration using a profile, directly or through a configuration alias."""
+    configuration_name: str
+    alias: Optional[str] = None
+
+    def describe(self) -> str:
+        if self.alias is None:
+            return self.configuration_name
+        return f"{self.configuration_name} (alias '{self.alias}')"
+
+
+class ProfileUsageIndex:
+    """Profile names mapped to the playback configurations that use them."""
+
+    def __init__(self, account_id: str, region: str, built_at: float = 0.0, configuration_count: int = 0,
+                 usages: Optional[Dict[str, List[ProfileUsage]]] = None):
+        self.account_id = account_id
+        self.region = region
+        self.built_at = built_at
+        self.configuration_count = configuration_count
+        self.usages = usages or {}
+
+    def get_usages(self, profile_name: str) -> List[ProfileUsage]:
+        return self.usages.get(profile_name, [])
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.built_at < ttl
+
+    @classmethod
+    def build(cls, client, account_id: str, region: str) -> 'ProfileUsageIndex':
+        """Page through every playback configuration once and index the profiles they use."""
+        index = cls(account_id, region, built_at=time.time())
+        paginator = client.get_paginator('list_playback_configurations')
+        for page in paginator.paginate(PaginationConfig={'PageSize': PAGE_SIZE}):
+            for configuration in page.get('Items', []):
+                index.configuration_count += 1
+                index.add_configuration(configuration)
+        return index
+
+    def add_configuration(self, configuration: Dict) -> None:
+        name = configuration['Name']
+        transcode_profile_name = configuration.get('TranscodeProfileName')
+        # A dynamic variable is resolved per session from the aliases below
+        if transcode_profile_name and not transcode_profile_name.startswith('['):
+            self.usages.setdefault(transcode_profile_name, []).append(ProfileUsage(name))
+        aliases = configuration.get('ConfigurationAliases', {}).get(TRANSCODE_PROFILE_ALIAS, {})
+        for alias, profile_name in sorted(aliases.items()):
+            self.usages.setdefault(profile_name, []).append(ProfileUsage(name, alias))
+
+    @classmethod
+    def load(cls, path: str, account_id: str, region: str) -> Optional['ProfileUsageIndex']:
+        """Load a cached index, or return None when there is no usable cache for the account and region."""
+        try:
+            with open(path, 'r') as f:
+                document = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable profile usage cache '{path}': {e}")
+            return None
+        if (document.get('version') != USAGE_CACHE_VERSION or document.get('accountId') != account_id
+                or document.get('region') != region):
+            return None
+        usages = {
+            profile_name: [ProfileUsage(**usage) for usage in profile_usages]
+            for profile_name, profile_usages in document.get('profiles', {}).items()
+        }
+        return cls(account_id, region, document.get('builtAt', 0.0), document.get('configurationCount', 0), usages)
+
+    def save(self, path: str) -> None:
+        """Write the index atomically."""
+        document = {
+            'version': USAGE_CACHE_VERSION,
+            'accountId': self.account_id,
+            'region': self.region,
+            'builtAt': self.built_at,
+            'configurationCount': self.configuration_count,
+            'profiles': {
+                profile_name: [asdict(usage) for usage in usages]
+                for profile_name, usages in sorted(self.usages.items())
+            }
+        }
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, 'w') as f:
+            json.dump(document, f, indent=2)
+        os.replace(temporary_path, path)
+
+
+def load_usage_index(session, account_id: str, region: str, cache_path: str,
+                     ttl: float = DEFAULT_USAGE_CACHE_TTL, refresh: bool = False,
+                     endpoint_url: Optional[str] = None) -> ProfileUsageIndex:
+    """
+    Return the cached index when it is younger than ttl seconds, otherwise rebuild and cache it.
+
+    Raises:
+        botocore.exceptions.ClientError: If the playback configurations cannot be listed
+    """
+    if not refresh:
+        index = ProfileUsageIndex.load(cache_path, account_id, region)
+        if index is not None and index.is_fresh(ttl):
+            logger.info(f"Using cached profile usage of {index.configuration_count} playback configuration(s) "
+                        f"from {time.time() - index.built_at:.0f}s ago")
+            return index
+
+    client = session.client('mediatailor', region_name=region, endpoint_url=endpoint_url,
+                            config=Config(retries={'max_attempts': 10, 'mode': 'adaptive'}))
+    started = time.monotonic()
+    index = ProfileUsageIndex.build(client, account_id, region)
+    logger.info(f"Indexed profile usage of {index.configuration_count} playback configuration(s) "
+                f"in {time.monotonic() - started:.2f}s")
+    try:
+        index.save(cache_path)
+    except OSError as e:
+        logger.warning(f"Unable to write profile usage cache '{cache_path}': {e}")
+    return index
@@ -0,0 +1,209 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+"""
+Reusable SigV4 signed HTTP client for AWS APIs without a boto3 client (e.g. MediaTailor transcodeProfile).
+
+The client keeps a keep-alive connection pool shared by all threads, resolves credentials once and
+reuses frozen credentials until they are close to expiry, and retries throttling (429), 5xx responses
+and connection errors with exponential backoff and full jitter. Timing of every request is collected
+in RequestMetrics. Requests go through botocore's HTTP session, so proxies (HTTPS_PROXY, NO_PROXY) and
+CA bundles (ca_bundle, AWS_CA_BUNDLE) are honoured as they are by boto3 clients.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+from urllib.parse import urlsplit
+
+import boto3
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.credentials import ReadOnlyCredentials, RefreshableCredentials
+from botocore.exceptions import BotoCoreError
+from botocore.httpsession import URLLib3Session
+from botocore.utils import get_environ_proxies
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_POOL_CONNECTIONS = 10
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BASE_DELAY = 0.2
+DEFAULT_MAX_DELAY = 5.0
+# Frozen credentials are refreshed when they expire within this many seconds
+CREDENTIAL_REFRESH_SECONDS = 300
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+@dataclass
+class HTTPResponse:
+    """Response of a signed request"""
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+
+
+@dataclass
+class RequestMetrics:
+    """Thread safe timing and outcome counters for the requests made by a client"""
+    requests: int = 0
+    attempts: int = 0
+    retries: int = 0
+    throttled: int = 0
+    errors: int = 0
+    latencies: List[float] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, latency: float, attempts: int, throttled: int, failed: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.attempts += attempts
+            self.retries += attempts - 1
+            self.throttled += throttled
+            self.errors += 1 if failed else 0
+            self.latencies.append(latency)
+
+    def summary(self) -> Dict[str, float]:
+        """Request counts and latency percentiles in seconds"""
+        with self._lock:
+            latencies = sorted(self.latencies)
+            summary = {
+                'requests': self.requests,
+                'attempts': self.attempts,
+                'retries': self.retries,
+                'throttled': self.throttled,
+                'errors': self.errors,
+            }
+        if latencies:
+            summary.update({
+                'total_seconds': sum(latencies),
+                'p50_seconds': latencies[len(latencies) // 2],
+                'p95_seconds': latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+                'max_seconds': latencies[-1],
+            })
+        return summary
+
+
+def get_verify_value(session: boto3.Session) -> Union[bool, str]:
+    """CA bundle of the session (ca_bundle or AWS_CA_BUNDLE), else REQUESTS_CA_BUNDLE, as boto3 clients resolve it"""
+    return session._session.get_config_variable('ca_bundle') or os.environ.get('REQUESTS_CA_BUNDLE', True)
+
+
+class SignedHTTPClient:
+    """
+    SigV4 signing HTTP client with a shared keep-alive pool, credential caching and jittered retries.
+
+    Args:
+        session: boto3 session used to resolve credentials
+        region: Region requests are signed for
+        service: Signing name of the service
+        endpoint: Base URL of the API, e.g. https://api.mediatailor.us-east-1.amazonaws.com
+        max_pool_connections: Connections kept alive per host (should be at least the number of worker threads)
+        max_attempts: Attempts per request including the first one
+        verify: CA bundle path or False to skip certificate verification (default: as boto3 clients)
+    """
+
+    def __init__(self, session: boto3.Session, region: str, service: str, endpoint: str,
+                 max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT, read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS, base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY, verify: Optional[Union[bool, str]] = None):
+        self.session = session
+        self.region = region
+        self.service = service
+        self.endpoint = endpoint.rstrip('/')
+        self.host = urlsplit(self.endpoint).netloc
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.metrics = RequestMetrics()
+        self.http_session = URLLib3Session(
+            verify=get_verify_value(session) if verify is None else verify,
+            proxies=get_environ_proxies(self.endpoint),
+            timeout=(connect_timeout, read_timeout),
+            max_pool_connections=max_pool_connections
+        )
+        self._credentials = None
+        self._frozen_credentials: Optional[ReadOnlyCredentials] = None
+        self._credentials_lock = threading.Lock()
+
+    def get_credentials(self) -> ReadOnlyCredentials:
+        """Return cached frozen credentials, refreshing them when they are close to expiry"""
+        with self._credentials_lock:
+            if self._credentials is None:
+                self._credentials = self.session.get_credentials()
+                if self._credentials is None:
+                    raise ValueError("Unable to locate AWS credentials")
+            refresh = (isinstance(self._credentials, RefreshableCredentials)
+                       and self._credentials.refresh_needed(CREDENTIAL_REFRESH_SECONDS))
+            if self._frozen_credentials is None or refresh:
+                self._frozen_credentials = self._credentials.get_frozen_credentials()
+            return self._frozen_credentials
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter exponential backoff"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def request(self, method: str, path: str, data: Optional[str] = None,
+                headers: Optional[Dict[str, str]] = None) -> HTTPResponse:
+        """
+        Send a signed request, retrying throttling, server errors and connection errors.
+
+        Returns:
+            The last response received. Non retryable error responses are returned, not raised.
+
+        Raises:
+            botocore.exceptions.BotoCoreError: If the last attempt failed without a response
+        """
+        url = f"{self.endpoint}/{path.lstrip('/')}"
+        body = data.encode('utf-8') if data else b''
+        started = time.monotonic()
+        throttled = 0
+        attempt = 0
+        response = None
+        raised = False
+        try:
+            while True:
+                attempt += 1
+                # Each attempt is signed again so the signature time stays valid across backoff
+                request = AWSRequest(method=method, url=url, headers=dict(headers or {}, Host=self.host), data=body)
+                SigV4Auth(self.get_credentials(), self.service, self.region).add_auth(request)
+                try:
+                    raw = self.http_session.send(request.prepare())
+                    response = HTTPResponse(raw.status_code, dict(raw.headers), raw.content)
+                except BotoCoreError as e:
+                    if attempt >= self.max_attempts:
+                        raise
+                    logger.debug(f"{method} {url} failed ({e}), retrying")
+                    time.sleep(self._backoff(attempt))
+                    continue
+
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_attempts:
+                    return response
+                if response.status_code == 429:
+                    throttled += 1
+                logger.debug(f"{method} {url} returned {response.status_code}, retrying")
+                time.sleep(self._backoff(attempt))
+        except Exception:
+            # An earlier response, such as a 429, does not make a request that ended in an exception succeed
+            raised = True
+            raise
+        finally:
+            failed = raised or response.status_code >= 500
+            self.metrics.record(time.monotonic() - started, attempt, throttled, failed)
@@ -0,0 +1,125 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import boto3
+
+TOOL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, TOOL_DIR)
+
+from fake_mediatailor_server import ServiceProfile, start_server  # noqa: E402
+from load_custom_transcode_profiles import (STATUS_NOT_READY, STATUS_UPLOADED, AWSConfig,  # noqa: E402
+                                            MediaTailorAPI, upload_profiles)
+
+PROFILE = {'Outputs': [{'Name': 'video', 'Bitrate': 5000000}]}
+
+
+class FakeServiceTest(unittest.TestCase):
+    """Runs the loader against the local stand-in for the transcodeProfile API"""
+
+    def start(self, **settings):
+        server, self.endpoint = start_server(ServiceProfile(**settings))
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.counters = server.RequestHandlerClass.store.counters
+
+    def create_api(self, readiness_timeout=5.0):
+        session = boto3.Session(aws_access_key_id='test', aws_secret_access_key='test', region_name='us-east-1')
+        return MediaTailorAPI(AWSConfig(session, 'us-east-1', '000000000000'), readiness_timeout=readiness_timeout,
+                              endpoint_url=self.endpoint)
+
+    def write_profiles(self, count):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        profiles = {}
+        for index in range(count):
+            path = os.path.join(directory.name, f"mediatailor-{index}-v1.json")
+            with open(path, 'w') as f:
+                json.dump(PROFILE, f)
+            profiles[f"profile-{index}-v1"] = path
+        return directory.name, profiles
+
+    def run_loader(self, *args):
+        home = tempfile.TemporaryDirectory()
+        self.addCleanup(home.cleanup)
+        environment = dict(os.environ, HOME=home.name, AWS_ACCESS_KEY_ID='test', AWS_SECRET_ACCESS_KEY='test')
+        return subprocess.run([sys.executable, os.path.join(TOOL_DIR, 'load_custom_transcode_profiles.py'),
+                               '--endpoint-url', self.endpoint, '--region', 'us-east-1', '--yes',
+                               '--output-json', '-', *args],
+                              capture_output=True, text=True, env=environment, timeout=60)
+
+    def test_missing_profile_with_403_is_absent(self):
+        self.start(missing_status=403)
+        api = self.create_api()
+        self.assertIsNone(api.check_profile_exists('profile-v1'))
+        self.assertEqual(api.process_profile('profile-v1', PROFILE).status, STATUS_UPLOADED)
+        self.assertEqual(json.loads(api.check_profile_exists('profile-v1')), PROFILE)
+
+    def test_disabled_account_fails_the_probe(self):
+        self.start(enabled=False)
+        self.assertFalse(self.create_api().check_account_enabled())
+        directory, _ = self.write_profiles(1)
+        process = self.run_loader('--profile-path', directory)
+        self.assertEqual(process.returncode, 1)
+        document = json.loads(process.stdout)
+        self.assertFalse(document['success'])
+        self.assertIn('not enabled', document['error'])
+        self.assertEqual(document['results'], [])
+        self.assertNotIn('PUT', self.counters)
+
+    def test_polls_until_propagated(self):
+        self.start(propagation_ms=300)
+        result = self.create_api().process_profile('profile-v1', PROFILE)
+        self.assertEqual(result.status, STATUS_UPLOADED)
+        self.assertGreaterEqual(result.duration, 0.3)
+        # The existence check and at least two readiness polls
+        self.assertGreaterEqual(self.counters['GET'], 3)
+
+    def test_not_ready_after_readiness_timeout(self):
+        self.start(propagation_ms=5000)
+        result = self.create_api(readiness_timeout=0.3).process_profile('profile-v1', PROFILE)
+        self.assertEqual(result.status, STATUS_NOT_READY)
+
+    def test_retries_throttled_requests(self):
+        self.start(requests_per_second=20, burst=1)
+        api = self.create_api()
+        api.http_client.max_attempts = 10
+        _, profiles = self.write_profiles(6)
+        results = upload_profiles(api, profiles, max_workers=4)
+        self.assertEqual([result.status for result in results], [STATUS_UPLOADED] * 6)
+        self.assertGreater(self.counters['429'], 0)
+        summary = api.http_client.metrics.summary()
+        self.assertGreater(summary['throttled'], 0)
+        self.assertEqual(summary['errors'], 0)
+
+    def test_loader_run(self):
+        self.start()
+        directory, profiles = self.write_profiles(2)
+        process = self.run_loader('--profile-path', directory, '--max-workers', '2')
+        self.assertEqual(process.returncode, 0, process.stderr)
+        document = json.loads(process.stdout)
+        self.assertTrue(document['success'])
+        self.assertEqual(document['summary'], {STATUS_UPLOADED: 2})
+        self.assertEqual(sorted(result['profileName'] for result in document['results']),
+                         sorted(f"{os.path.basename(directory)}-{os.path.basename(path)[:-5]}"
+                                for path in profiles.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
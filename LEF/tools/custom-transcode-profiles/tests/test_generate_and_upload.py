@@ -0,0 +1,69 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import boto3
+
+TOOL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, TOOL_DIR)
+
+from fake_mediatailor_server import ServiceProfile, start_server  # noqa: E402
+from generate_and_upload_profiles import (CTP_OUTPUT_TYPES, generate_and_upload, generate_profile,  # noqa: E402
+                                          load_configs)
+from load_custom_transcode_profiles import STATUS_UNCHANGED, STATUS_UPLOADED, AWSConfig, MediaTailorAPI  # noqa: E402
+from profile_inventory import ProfileInventory  # noqa: E402
+
+SAMPLE_CONFIG = os.path.join(TOOL_DIR, '..', 'encoding-profile-generator', 'sample-configs',
+                             'hd-avc-50fps-sample.yaml')
+
+
+class GenerateAndUploadTest(unittest.TestCase):
+    """Generates the profiles of a sample configuration and uploads them to the fake service"""
+
+    def setUp(self):
+        server, endpoint = start_server(ServiceProfile())
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.store = server.RequestHandlerClass.store
+        session = boto3.Session(aws_access_key_id='test', aws_secret_access_key='test', region_name='us-east-1')
+        self.api = MediaTailorAPI(AWSConfig(session, 'us-east-1', '000000000000'), endpoint_url=endpoint)
+        self.configs = load_configs([SAMPLE_CONFIG])
+
+    def test_uploads_generated_profiles(self):
+        results = generate_and_upload(self.api, self.configs, CTP_OUTPUT_TYPES, '1', max_workers=2)
+        self.assertEqual([(result.profile_name, result.status) for result in results],
+                         [(f"hd-avc-50fps-sample-{output_type}-v1", STATUS_UPLOADED)
+                          for output_type in CTP_OUTPUT_TYPES])
+        config = next(iter(self.configs.values()))
+        for output_type in CTP_OUTPUT_TYPES:
+            self.assertEqual(json.loads(self.store.get(f"hd-avc-50fps-sample-{output_type}-v1")),
+                             generate_profile(output_type, config))
+
+    def test_unchanged_profiles_with_inventory(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        inventory = ProfileInventory(os.path.join(directory.name, 'inventory.json'), '000000000000', 'us-east-1')
+        generate_and_upload(self.api, self.configs, CTP_OUTPUT_TYPES, '1', inventory=inventory)
+        self.store.counters.clear()
+        results = generate_and_upload(self.api, self.configs, CTP_OUTPUT_TYPES, '1', inventory=inventory)
+        self.assertEqual([result.status for result in results], [STATUS_UNCHANGED] * len(CTP_OUTPUT_TYPES))
+        self.assertEqual(self.store.counters, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
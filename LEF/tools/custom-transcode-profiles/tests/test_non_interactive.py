@@ -0,0 +1,86 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+TOOL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, TOOL_DIR)
+
+from fake_mediatailor_server import ServiceProfile, start_server  # noqa: E402
+
+PROFILE_NAME = 'profile'
+
+
+class NonInteractiveTest(unittest.TestCase):
+    """Runs the loader CLI with --yes and --on-conflict against the fake service"""
+
+    def setUp(self):
+        server, self.endpoint = start_server(ServiceProfile())
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.store = server.RequestHandlerClass.store
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.profile_path = os.path.join(self.directory, 'mediatailor-profile.json')
+        with open(self.profile_path, 'w') as f:
+            json.dump({'a': 2}, f)
+        self.store.put(PROFILE_NAME, json.dumps({'a': 1}).encode('utf-8'))
+
+    def run_loader(self, *args):
+        environment = dict(os.environ, HOME=self.directory, AWS_ACCESS_KEY_ID='test', AWS_SECRET_ACCESS_KEY='test')
+        process = subprocess.run([sys.executable, os.path.join(TOOL_DIR, 'load_custom_transcode_profiles.py'),
+                                  '--endpoint-url', self.endpoint, '--region', 'us-east-1',
+                                  '--profile-path', self.profile_path, '--profile-name', PROFILE_NAME,
+                                  '--output-json', '-', *args],
+                                 capture_output=True, text=True, env=environment, stdin=subprocess.DEVNULL,
+                                 timeout=60)
+        return process.returncode, json.loads(process.stdout)
+
+    def stored_profile(self):
+        return json.loads(self.store.get(PROFILE_NAME))
+
+    def test_yes_fails_on_conflict_by_default(self):
+        returncode, document = self.run_loader('--yes')
+        self.assertEqual(returncode, 1)
+        self.assertFalse(document['success'])
+        self.assertEqual(document['results'][0]['status'], 'failed')
+        self.assertEqual(self.stored_profile(), {'a': 1})
+
+    def test_skip_conflict(self):
+        returncode, document = self.run_loader('--yes', '--on-conflict', 'skip')
+        self.assertEqual(returncode, 0)
+        self.assertTrue(document['success'])
+        self.assertEqual(document['summary'], {'skipped': 1})
+        self.assertEqual(self.stored_profile(), {'a': 1})
+
+    def test_overwrite_conflict(self):
+        returncode, document = self.run_loader('--yes', '--on-conflict', 'overwrite')
+        self.assertEqual(returncode, 0)
+        self.assertEqual(document['summary'], {'uploaded': 1})
+        self.assertEqual(self.stored_profile(), {'a': 2})
+
+    def test_unchanged_profile(self):
+        self.store.put(PROFILE_NAME, json.dumps({'a': 2}).encode('utf-8'))
+        returncode, document = self.run_loader('--yes')
+        self.assertEqual(returncode, 0)
+        self.assertEqual(document['summary'], {'unchanged': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fake_mediatailor_server import ServiceProfile, start_server  # noqa: E402
+from load_custom_transcode_profiles import (STATUS_FAILED, STATUS_UNCHANGED, STATUS_UPLOADED,  # noqa: E402
+                                            AWSConfig, MediaTailorAPI, refresh_inventory, sync_profiles)
+from profile_inventory import ProfileInventory, is_versioned_name, profile_hash  # noqa: E402
+
+
+class ProfileInventoryTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.path = os.path.join(self.directory, 'inventory.json')
+
+    def test_hash_ignores_key_order_and_whitespace(self):
+        self.assertEqual(profile_hash({'a': 1, 'b': [1, 2]}), profile_hash({'b': [1, 2], 'a': 1}))
+        self.assertNotEqual(profile_hash({'a': 1}), profile_hash({'a': 2}))
+
+    def test_versioned_names(self):
+        self.assertTrue(is_versioned_name('hd-avc-hls-v3'))
+        self.assertFalse(is_versioned_name('hd-avc-hls'))
+        self.assertFalse(is_versioned_name('hd-avc-v3-hls'))
+
+    def test_round_trip(self):
+        inventory = ProfileInventory(self.path, '111122223333', 'us-east-1')
+        inventory.record('profile-v1', profile_hash({'a': 1}), source='profile.json')
+        inventory.save()
+        loaded = ProfileInventory.load(self.path, '111122223333', 'us-east-1')
+        self.assertTrue(loaded.is_in_sync('profile-v1', {'a': 1}))
+        self.assertFalse(loaded.is_in_sync('profile-v1', {'a': 2}))
+
+    def test_ignores_inventory_of_other_account_or_region(self):
+        inventory = ProfileInventory(self.path, '111122223333', 'us-east-1')
+        inventory.record('profile-v1', profile_hash({'a': 1}))
+        inventory.save()
+        self.assertEqual(ProfileInventory.load(self.path, '444455556666', 'us-east-1').profiles, {})
+        self.assertEqual(ProfileInventory.load(self.path, '111122223333', 'eu-west-1').profiles, {})
+
+    def test_ignores_unreadable_inventory(self):
+        with open(self.path, 'w') as f:
+            f.write('{')
+        self.assertEqual(ProfileInventory.load(self.path, '111122223333', 'us-east-1').profiles, {})
+
+
+class SyncProfilesTest(unittest.TestCase):
+
+    def setUp(self):
+        server, endpoint = start_server(ServiceProfile())
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.counters = server.RequestHandlerClass.store.counters
+        session = boto3.Session(aws_access_key_id='test', aws_secret_access_key='test', region_name='us-east-1')
+        self.api = MediaTailorAPI(AWSConfig(session, 'us-east-1', '000000000000'), refuse_versioned_overwrite=True,
+                                  endpoint_url=endpoint)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.inventory = ProfileInventory(os.path.join(self.directory, 'inventory.json'), '000000000000',
+                                          'us-east-1')
+
+    def write_profile(self, name, profile):
+        path = os.path.join(self.directory, f"{name}.json")
+        with open(path, 'w') as f:
+            json.dump(profile, f)
+        return path
+
+    def requests(self):
+        return self.counters.get('GET', 0) + self.counters.get('PUT', 0)
+
+    def test_second_sync_makes_no_requests(self):
+        profiles = {'profile-v1': self.write_profile('profile-v1', {'a': 1})}
+        self.assertEqual([result.status for result in sync_profiles(self.api, profiles, self.inventory)],
+                         [STATUS_UPLOADED])
+        requests = self.requests()
+        reloaded = ProfileInventory.load(self.inventory.path, '000000000000', 'us-east-1')
+        self.assertEqual([result.status for result in sync_profiles(self.api, profiles, reloaded)],
+                         [STATUS_UNCHANGED])
+        self.assertEqual(self.requests(), requests)
+
+    def test_refuses_to_overwrite_versioned_profile(self):
+        profiles = {'profile-v1': self.write_profile('profile-v1', {'a': 1})}
+        sync_profiles(self.api, profiles, self.inventory)
+        self.write_profile('profile-v1', {'a': 2})
+        results = sync_profiles(self.api, profiles, self.inventory)
+        self.assertEqual(results[0].status, STATUS_FAILED)
+        self.assertEqual(self.inventory.get_hash('profile-v1'), profile_hash({'a': 1}))
+
+    def test_refresh_inventory_from_account(self):
+        profiles = {'profile-v1': self.write_profile('profile-v1', {'a': 1})}
+        sync_profiles(self.api, profiles, self.inventory)
+        self.inventory.record('profile-v1', 'stale')
+        self.inventory.record('deleted-v1', 'stale')
+        refresh_inventory(self.api, self.inventory, ['profile-v1', 'deleted-v1'])
+        self.assertEqual(self.inventory.get_hash('profile-v1'), profile_hash({'a': 1}))
+        self.assertIsNone(self.inventory.get_hash('deleted-v1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
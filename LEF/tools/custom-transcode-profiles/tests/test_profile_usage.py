@@ -0,0 +1,98 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fake_mediatailor_server import ServiceProfile, start_server  # noqa: E402
+from profile_usage import TRANSCODE_PROFILE_ALIAS, ProfileUsageIndex, load_usage_index  # noqa: E402
+
+
+def configuration(name, transcode_profile_name=None, aliases=None):
+    configuration = {'Name': name}
+    if transcode_profile_name:
+        configuration['TranscodeProfileName'] = transcode_profile_name
+    if aliases:
+        configuration['ConfigurationAliases'] = {TRANSCODE_PROFILE_ALIAS: aliases}
+    return configuration
+
+
+class ProfileUsageIndexTest(unittest.TestCase):
+
+    def test_direct_and_alias_usage(self):
+        index = ProfileUsageIndex('111122223333', 'us-east-1')
+        index.add_configuration(configuration('direct', 'profile-a'))
+        index.add_configuration(configuration('dynamic', '[player_params.transcode_profile]',
+                                              {'hd': 'profile-a', 'sd': 'profile-b'}))
+        self.assertEqual([usage.describe() for usage in index.get_usages('profile-a')],
+                         ['direct', "dynamic (alias 'hd')"])
+        self.assertEqual([usage.describe() for usage in index.get_usages('profile-b')], ["dynamic (alias 'sd')"])
+        self.assertEqual(index.get_usages('[player_params.transcode_profile]'), [])
+        self.assertEqual(index.get_usages('unused'), [])
+
+    def test_cache_round_trip(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'usage.json')
+        index = ProfileUsageIndex('111122223333', 'us-east-1', built_at=time.time(), configuration_count=1)
+        index.add_configuration(configuration('dynamic', aliases={'hd': 'profile-a'}))
+        index.save(path)
+        loaded = ProfileUsageIndex.load(path, '111122223333', 'us-east-1')
+        self.assertEqual(loaded.get_usages('profile-a'), index.get_usages('profile-a'))
+        self.assertTrue(loaded.is_fresh(300))
+        self.assertIsNone(ProfileUsageIndex.load(path, '444455556666', 'us-east-1'))
+
+
+class LoadUsageIndexTest(unittest.TestCase):
+    """Pages through ListPlaybackConfigurations of the fake service"""
+
+    def setUp(self):
+        configurations = [configuration(f"configuration-{index}", f"profile-{index % 3}") for index in range(250)]
+        server, self.endpoint = start_server(ServiceProfile(playback_configurations=configurations))
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.counters = server.RequestHandlerClass.store.counters
+        self.session = boto3.Session(aws_access_key_id='test', aws_secret_access_key='test', region_name='us-east-1')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_path = os.path.join(directory.name, 'usage.json')
+
+    def load(self, **kwargs):
+        return load_usage_index(self.session, '000000000000', 'us-east-1', self.cache_path,
+                                endpoint_url=self.endpoint, **kwargs)
+
+    def test_builds_index_from_all_pages(self):
+        index = self.load()
+        self.assertEqual(index.configuration_count, 250)
+        self.assertEqual(len(index.get_usages('profile-0')), 84)
+        self.assertEqual(self.counters['GET'], 3)
+
+    def test_uses_fresh_cache(self):
+        self.load()
+        self.load()
+        self.assertEqual(self.counters['GET'], 3)
+        self.load(refresh=True)
+        self.assertEqual(self.counters['GET'], 6)
+        self.load(ttl=0)
+        self.assertEqual(self.counters['GET'], 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
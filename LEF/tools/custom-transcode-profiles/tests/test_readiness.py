@@ -0,0 +1,72 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import io
+import json
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from load_custom_transcode_profiles import (STATUS_NOT_READY, STATUS_UPLOADED, AWSConfig,  # noqa: E402
+                                            MediaTailorAPI, UploadResult, write_json_output)
+
+
+class ReadinessTest(unittest.TestCase):
+
+    def setUp(self):
+        session = boto3.Session(aws_access_key_id='test', aws_secret_access_key='test', region_name='us-east-1')
+        self.api = MediaTailorAPI(AWSConfig(session, 'us-east-1', '111122223333'), readiness_timeout=0.5,
+                                  endpoint_url='http://127.0.0.1:1')
+        for name, value in (('check_profile_exists', None), ('_perform_profile_upload', True)):
+            patcher = mock.patch.object(self.api, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_readable_profile_is_uploaded(self):
+        with mock.patch.object(self.api, 'wait_for_profile', return_value=True):
+            result = self.api.process_profile('profile-v1', {})
+        self.assertEqual(result.status, STATUS_UPLOADED)
+
+    def test_readiness_timeout_is_not_ready(self):
+        with mock.patch.object(self.api, 'wait_for_profile', return_value=False):
+            result = self.api.process_profile('profile-v1', {})
+            uploaded = self.api.upload_profile('profile-v1', {})
+        self.assertEqual(result.status, STATUS_NOT_READY)
+        self.assertFalse(uploaded)
+
+
+class WriteJsonOutputTest(unittest.TestCase):
+
+    def write(self, *statuses):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            write_json_output('-', [UploadResult(f"profile-{index}", status) for index, status in enumerate(statuses)])
+        return json.loads(output.getvalue())
+
+    def test_success_when_all_uploaded(self):
+        self.assertTrue(self.write(STATUS_UPLOADED, STATUS_UPLOADED)['success'])
+
+    def test_not_ready_is_not_success(self):
+        document = self.write(STATUS_UPLOADED, STATUS_NOT_READY)
+        self.assertFalse(document['success'])
+        self.assertEqual(document['summary'], {STATUS_UPLOADED: 1, STATUS_NOT_READY: 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from load_custom_transcode_profiles import resolve_profile_paths  # noqa: E402
+
+
+class ResolveProfilePathsTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        for name in ('set/mediatailor-hls-cmaf-v1.json', 'set/mediatailor-dash-v1.json',
+                     'set/medialive-hls-ts-v1.json', 'set/.mediatailor-hidden.json',
+                     '.git/mediatailor-x.json', 'mediatailor-report.json', 'notes.txt'):
+            path = self.path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write('{}')
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def test_directory_only_loads_transcode_profiles(self):
+        self.assertEqual(resolve_profile_paths([self.root], exclude_paths=[self.path('mediatailor-report.json'), None]),
+                         [self.path('set/mediatailor-dash-v1.json'), self.path('set/mediatailor-hls-cmaf-v1.json')])
+
+    def test_glob_and_file_paths_are_taken_as_given(self):
+        self.assertEqual(resolve_profile_paths([os.path.join(self.root, 'set', '*-v1.json')]),
+                         [self.path('set/medialive-hls-ts-v1.json'), self.path('set/mediatailor-dash-v1.json'),
+                          self.path('set/mediatailor-hls-cmaf-v1.json')])
+        self.assertEqual(resolve_profile_paths([self.path('set/medialive-hls-ts-v1.json')]),
+                         [self.path('set/medialive-hls-ts-v1.json')])
+
+    def test_paths_without_profiles_are_rejected(self):
+        os.makedirs(self.path('empty'))
+        for profile_path in (self.path('empty'), self.path('notes.txt'), self.path('missing/*.json')):
+            with self.subTest(profile_path=profile_path), self.assertRaises(ValueError):
+                resolve_profile_paths([profile_path])
+
+
+if __name__ == '__main__':
+    unittest.main()
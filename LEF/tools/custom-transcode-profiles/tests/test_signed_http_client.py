@@ -0,0 +1,75 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+import boto3
+from botocore.exceptions import EndpointConnectionError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from signed_http_client import SignedHTTPClient  # noqa: E402
+
+
+class FakeHTTPSession:
+    """Returns responses with the given status codes in turn, raising the exceptions in the sequence"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+
+    def send(self, request):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(status_code=outcome, headers={}, content=b'{}')
+
+
+class SignedHTTPClientTest(unittest.TestCase):
+
+    def create_client(self, *outcomes):
+        session = boto3.Session(aws_access_key_id='test', aws_secret_access_key='test', region_name='us-east-1')
+        client = SignedHTTPClient(session, 'us-east-1', 'mediatailor', 'http://127.0.0.1:1', max_attempts=3,
+                                  base_delay=0)
+        client.http_session = FakeHTTPSession(outcomes)
+        return client
+
+    def test_retries_throttling_and_server_errors(self):
+        client = self.create_client(429, 503, 200)
+        self.assertEqual(client.request('GET', 'transcodeProfile/x').status_code, 200)
+        summary = client.metrics.summary()
+        self.assertEqual((summary['attempts'], summary['retries'], summary['throttled'], summary['errors']),
+                         (3, 2, 1, 0))
+
+    def test_returns_non_retryable_error_response(self):
+        client = self.create_client(404)
+        self.assertEqual(client.request('GET', 'transcodeProfile/x').status_code, 404)
+        self.assertEqual(client.metrics.summary()['errors'], 0)
+
+    def test_exception_after_throttling_counts_as_error(self):
+        client = self.create_client(429, 429, EndpointConnectionError(endpoint_url='http://127.0.0.1:1'))
+        with self.assertRaises(EndpointConnectionError):
+            client.request('GET', 'transcodeProfile/x')
+        summary = client.metrics.summary()
+        self.assertEqual((summary['requests'], summary['throttled'], summary['errors']), (1, 2, 1))
+
+    def test_last_server_error_counts_as_error(self):
+        client = self.create_client(503, 503, 503)
+        self.assertEqual(client.request('GET', 'transcodeProfile/x').status_code, 503)
+        self.assertEqual(client.metrics.summary()['errors'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+"""Terminal output helpers shared by the MediaLive scheduled actions tools"""
+
+import json
+
+# ANSI color codes for terminal output
+class Colors:
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    ENDC = '\033[0m'
+    BOLD = '\033[1m'
+    UNDERLINE = '\033[4m'
+
+def print_header(message):
+    print(f"{Colors.HEADER}{Colors.BOLD}=== {message} ==={Colors.ENDC}")
+
+def print_info(message):
+    print(f"{Colors.BLUE}INFO: {message}{Colors.ENDC}")
+
+def print_success(message):
+    print(f"{Colors.GREEN}SUCCESS: {message}{Colors.ENDC}")
+
+def print_warning(message):
+    print(f"{Colors.YELLOW}WARNING: {message}{Colors.ENDC}")
+
+def print_error(message):
+    print(f"{Colors.RED}ERROR: {message}{Colors.ENDC}")
+
+def print_json(title, data):
+    print(f"{Colors.CYAN}{title}:{Colors.ENDC}")
+    formatted_json = json.dumps(data, indent=2)
+    print(formatted_json)
@@ -0,0 +1,445 @@
+#!/usr/bin/env python
+
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+"""
+In-process stand-in for the MediaLive schedule API.
+
+FakeMediaLiveClient implements the subset of the boto3 MediaLive client used by the scheduled
+actions tool (list_channels, describe_channel, describe_schedule, batch_update_schedule and their
+paginators). Requests are validated the way MediaLive validates them and rejected with botocore
+ClientErrors using the MediaLive error codes, and a token bucket per API reproduces throttling.
+Input switches are 'executed' as their start time passes, so describe_channel reports the active
+input of each pipeline like a running channel.
+
+Running this module directly load tests a rundown against a number of fake channels:
+
+    python3 fake_medialive.py --actions 1000 --channels 10
+"""
+
+import argparse
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+import scte35_builder
+from live_console import get_action_start_time
+
+DEFAULT_PAGE_SIZE = 100
+# Default sustained request rate and burst per API operation
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+DEFAULT_BURST = 20
+MAX_OVERLAY_LAYER = 7
+
+
+def _client_error(code: str, message: str, operation: str) -> ClientError:
+    return ClientError({'Error': {'Code': code, 'Message': message}}, operation)
+
+
+class TokenBucket:
+    """Token bucket used to throttle a single API operation"""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+
+    def take(self) -> bool:
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class FakePaginator:
+    """Paginator following NextToken over a fake client operation"""
+
+    def __init__(self, operation: Callable[..., Dict[str, Any]], result_key: str):
+        self.operation = operation
+        self.result_key = result_key
+
+    def paginate(self, PaginationConfig: Optional[Dict[str, Any]] = None, **kwargs):
+        config = PaginationConfig or {}
+        if config.get('PageSize'):
+            kwargs['MaxResults'] = config['PageSize']
+        max_items = config.get('MaxItems')
+        returned = 0
+        next_token = config.get('StartingToken')
+        while True:
+            if next_token:
+                kwargs['NextToken'] = next_token
+            page = self.operation(**kwargs)
+            if max_items is not None:
+                page[self.result_key] = page[self.result_key][:max_items - returned]
+            returned += len(page[self.result_key])
+            yield page
+            next_token = page.get('NextToken')
+            if not next_token or (max_items is not None and returned >= max_items):
+                return
+
+
+class FakeMediaLiveClient:
+    """
+    Fake MediaLive client holding channels and schedules in memory.
+
+    Args:
+        requests_per_second: Sustained request rate allowed per API operation (None disables throttling)
+        burst: Number of requests per API operation allowed in a burst
+        min_lead_seconds: Minimum time between submission and the start of a fixed mode action
+        clock: Callable returning the current UTC datetime, used to execute scheduled actions
+    """
+
+    def __init__(self, requests_per_second: Optional[float] = DEFAULT_REQUESTS_PER_SECOND,
+                 burst: int = DEFAULT_BURST, min_lead_seconds: float = 0,
+                 clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.min_lead_seconds = min_lead_seconds
+        self.clock = clock
+        self.channels: Dict[str, Dict[str, Any]] = {}
+        self.schedules: Dict[str, List[Dict[str, Any]]] = {}
+        self.received: Dict[str, Dict[str, datetime]] = {}
+        self.call_counts: Dict[str, int] = {}
+        self.throttled_counts: Dict[str, int] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._next_channel_id = 1000000
+
+    def add_channel(self, name: str, inputs: Optional[List[str]] = None, state: str = 'RUNNING',
+                    tags: Optional[Dict[str, str]] = None, channel_class: str = 'SINGLE_PIPELINE',
+                    input_prepare: bool = True, static_image_overlay: bool = True) -> str:
+        """Add a channel and return its ID. The first input is active before any switch."""
+        with self._lock:
+            self._next_channel_id += 1
+            channel_id = str(self._next_channel_id)
+        inputs = inputs or ['primary', 'backup', 'slate']
+        pipelines = 2 if channel_class == 'STANDARD' else 1
+        self.channels[channel_id] = {
+            'Arn': f"arn:aws:medialive:us-east-1:111122223333:channel:{channel_id}",
+            'Id': channel_id,
+            'Name': name,
+            'State': state,
+            'Tags': dict(tags or {}),
+            'ChannelClass': channel_class,
+            'PipelinesRunningCount': pipelines if state == 'RUNNING' else 0,
+            'InputSpecification': {'Codec': 'AVC', 'MaximumBitrate': 'MAX_20_MBPS', 'Resolution': 'HD'},
+            'InputAttachments': [
+                {'InputAttachmentName': input_name, 'InputId': str(9000000 + index), 'InputSettings': {}}
+                for index, input_name in enumerate(inputs)
+            ],
+            'EncoderSettings': {
+                'FeatureActivations': {
+                    'InputPrepareScheduleActions': 'ENABLED' if input_prepare else 'DISABLED',
+                    'OutputStaticImageOverlayScheduleActions': 'ENABLED' if static_image_overlay else 'DISABLED'
+                },
+                'BlackoutSlate': {'State': 'ENABLED'}
+            },
+            '_pipelines': [str(pipeline) for pipeline in range(pipelines)]
+        }
+        self.schedules[channel_id] = []
+        self.received[channel_id] = {}
+        return channel_id
+
+    def get_paginator(self, operation_name: str) -> FakePaginator:
+        if operation_name == 'list_channels':
+            return FakePaginator(self.list_channels, 'Channels')
+        if operation_name == 'describe_schedule':
+            return FakePaginator(self.describe_schedule, 'ScheduleActions')
+        raise NotImplementedError(f"Paginator '{operation_name}' is not implemented by the fake client")
+
+    def _call(self, operation: str) -> None:
+        """Count the call and apply throttling for the operation"""
+        with self._lock:
+            self.call_counts[operation] = self.call_counts.get(operation, 0) + 1
+            if self.requests_per_second is None:
+                return
+            bucket = self._buckets.setdefault(operation, TokenBucket(self.requests_per_second, self.burst))
+            if not bucket.take():
+                self.throttled_counts[operation] = self.throttled_counts.get(operation, 0) + 1
+                raise _client_error('TooManyRequestsException', 'Too many requests', operation)
+
+    def _get_channel(self, channel_id: str, operation: str) -> Dict[str, Any]:
+        channel = self.channels.get(channel_id)
+        if channel is None or channel['State'] == 'DELETED':
+            raise _client_error('NotFoundException', f"Channel {channel_id} not found", operation)
+        return channel
+
+    @staticmethod
+    def _page(items: List[Any], max_results: Optional[int], next_token: Optional[str], operation: str):
+        try:
+            start = int(next_token) if next_token else 0
+        except ValueError:
+            raise _client_error('BadRequestException', 'Invalid NextToken', operation)
+        size = max_results or DEFAULT_PAGE_SIZE
+        if not 1 <= size <= 1000:
+            raise _client_error('BadRequestException', 'MaxResults must be between 1 and 1000', operation)
+        page = items[start:start + size]
+        token = str(start + size) if start + size < len(items) else None
+        return page, token
+
+    def list_channels(self, MaxResults: Optional[int] = None, NextToken: Optional[str] = None) -> Dict[str, Any]:
+        self._call('ListChannels')
+        summaries = [
+            {key: copy.deepcopy(value) for key, value in channel.items()
+             if not key.startswith('_') and key != 'EncoderSettings'}
+            for channel in self.channels.values() if channel['State'] != 'DELETED'
+        ]
+        page, token = self._page(summaries, MaxResults, NextToken, 'ListChannels')
+        response = {'Channels': page}
+        if token:
+            response['NextToken'] = token
+        return response
+
+    def describe_channel(self, ChannelId: str) -> Dict[str, Any]:
+        self._call('DescribeChannel')
+        channel = self._get_channel(ChannelId, 'DescribeChannel')
+        response = {key: copy.deepcopy(value) for key, value in channel.items() if not key.startswith('_')}
+        if channel['State'] == 'RUNNING':
+            active = self._get_active_input_switch(ChannelId)
+            default_input = channel['InputAttachments'][0]['InputAttachmentName']
+            response['PipelineDetails'] = [
+                {
+                    'PipelineId': pipeline,
+                    'ActiveInputAttachmentName': active[1] if active else default_input,
+                    'ActiveInputSwitchActionName': active[0] if active else None
+                }
+                for pipeline in channel['_pipelines']
+            ]
+        return response
+
+    def describe_schedule(self, ChannelId: str, MaxResults: Optional[int] = None,
+                          NextToken: Optional[str] = None) -> Dict[str, Any]:
+        self._call('DescribeSchedule')
+        self._get_channel(ChannelId, 'DescribeSchedule')
+        page, token = self._page(self.schedules[ChannelId], MaxResults, NextToken, 'DescribeSchedule')
+        response = {'ScheduleActions': copy.deepcopy(page)}
+        if token:
+            response['NextToken'] = token
+        return response
+
+    def batch_update_schedule(self, ChannelId: str, Creates: Optional[Dict[str, Any]] = None,
+                              Deletes: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        self._call('BatchUpdateSchedule')
+        channel = self._get_channel(ChannelId, 'BatchUpdateSchedule')
+        creates = (Creates or {}).get('ScheduleActions', [])
+        deletes = (Deletes or {}).get('ActionNames', [])
+
+        with self._lock:
+            schedule = self.schedules[ChannelId]
+            existing = {action['ActionName']: action for action in schedule}
+            errors = []
+            for name in deletes:
+                if name not in existing:
+                    errors.append(f"Action '{name}' does not exist")
+            remaining = {name: action for name, action in existing.items() if name not in deletes}
+            referenced = {
+                action['ScheduleActionStartSettings']['FollowModeScheduleActionStartSettings']['ReferenceActionName']
+                for action in list(remaining.values()) + creates
+                if 'FollowModeScheduleActionStartSettings' in action.get('ScheduleActionStartSettings', {})
+            }
+            for name in deletes:
+                if name in referenced:
+                    errors.append(f"Action '{name}' is referenced by a follow mode action")
+
+            now = self.clock()
+            for action in creates:
+                errors.extend(self._validate_action(channel, action, remaining, now))
+                remaining[action.get('ActionName')] = action
+            if errors:
+                raise _client_error('UnprocessableEntityException',
+                                    'Invalid schedule: ' + '; '.join(errors), 'BatchUpdateSchedule')
+
+            self.schedules[ChannelId] = [action for action in schedule if action['ActionName'] not in deletes]
+            self.schedules[ChannelId].extend(copy.deepcopy(creates))
+            for action in creates:
+                self.received[ChannelId][action['ActionName']] = now
+            for name in deletes:
+                self.received[ChannelId].pop(name, None)
+
+        return {
+            'Creates': {'ScheduleActions': copy.deepcopy(creates)},
+            'Deletes': {'ScheduleActions': [existing[name] for name in deletes]}
+        }
+
+    def _validate_action(self, channel: Dict[str, Any], action: Dict[str, Any],
+                         schedule: Dict[str, Dict[str, Any]], now: datetime) -> List[str]:
+        name = action.get('ActionName')
+        if not name:
+            return ["ActionName is required"]
+        errors = []
+        if name in schedule:
+            errors.append(f"Action name '{name}' already exists")
+
+        start = action.get('ScheduleActionStartSettings', {})
+        if len(start) != 1:
+            errors.append(f"{name}: exactly one start mode is required")
+        start_time = get_action_start_time(action)
+        if 'FixedModeScheduleActionStartSettings' in start:
+            if start_time is None:
+                errors.append(f"{name}: fixed mode actions require a Time")
+            elif start_time < now + timedelta(seconds=self.min_lead_seconds):
+                errors.append(f"{name}: start time {start['FixedModeScheduleActionStartSettings']['Time']} "
+                              "is too close to or in the past")
+        follow = start.get('FollowModeScheduleActionStartSettings')
+        if follow is not None:
+            reference = schedule.get(follow.get('ReferenceActionName'))
+            if reference is None or 'InputSwitchSettings' not in reference.get('ScheduleActionSettings', {}):
+                errors.append(f"{name}: follow mode reference '{follow.get('ReferenceActionName')}' "
+                              "is not an input switch in the schedule")
+
+        settings = action.get('ScheduleActionSettings', {})
+        if len(settings) != 1:
+            errors.append(f"{name}: exactly one action type is required")
+        inputs = [attachment['InputAttachmentName'] for attachment in channel['InputAttachments']]
+        features = channel['EncoderSettings']['FeatureActivations']
+        for key in ('InputSwitchSettings', 'InputPrepareSettings'):
+            if key in settings and settings[key].get('InputAttachmentNameReference') not in inputs:
+                errors.append(f"{name}: input attachment "
+                              f"'{settings[key].get('InputAttachmentNameReference')}' is not attached")
+        if 'InputPrepareSettings' in settings and features['InputPrepareScheduleActions'] != 'ENABLED':
+            errors.append(f"{name}: InputPrepareScheduleActions is not enabled on the channel")
+        for key in ('StaticImageActivateSettings', 'StaticImageDeactivateSettings'):
+            if key not in settings:
+                continue
+            if features['OutputStaticImageOverlayScheduleActions'] != 'ENABLED':
+                errors.append(f"{name}: OutputStaticImageOverlayScheduleActions is not enabled on the channel")
+            if not 0 <= settings[key].get('Layer', 0) <= MAX_OVERLAY_LAYER:
+                errors.append(f"{name}: layer must be between 0 and {MAX_OVERLAY_LAYER}")
+        if 'Scte35TimeSignalSettings' in settings:
+            for descriptor in settings['Scte35TimeSignalSettings'].get('Scte35Descriptors', []):
+                segmentation = descriptor.get('Scte35DescriptorSettings', {}).get(
+                    'SegmentationDescriptorScte35DescriptorSettings', {})
+                if not 0 <= segmentation.get('SegmentationEventId', -1) <= scte35_builder.MAX_SEGMENTATION_EVENT_ID:
+                    errors.append(f"{name}: SegmentationEventId is missing or out of range")
+        return errors
+
+    def _get_active_input_switch(self, channel_id: str):
+        """Return (action name, input) of the most recent input switch that has executed, if any"""
+        now = self.clock()
+        executed = []
+        for action in self.schedules[channel_id]:
+            settings = action.get('ScheduleActionSettings', {}).get('InputSwitchSettings')
+            if settings is None:
+                continue
+            executed_at = self.get_execution_time(channel_id, action)
+            if executed_at is not None and executed_at <= now:
+                executed.append((executed_at, action['ActionName'], settings['InputAttachmentNameReference']))
+        if not executed:
+            return None
+        _, action_name, input_name = max(executed)
+        return action_name, input_name
+
+    def get_execution_time(self, channel_id: str, action: Dict[str, Any]) -> Optional[datetime]:
+        """
+        Time an action executes on the fake channel: its fixed start time, or the time it was received
+        for immediate mode actions. Follow mode actions are not executed by the fake.
+        """
+        start_time = get_action_start_time(action)
+        if start_time is not None:
+            return start_time
+        if 'ImmediateModeScheduleActionStartSettings' in action.get('ScheduleActionStartSettings', {}):
+            return self.received[channel_id].get(action['ActionName'])
+        return None
+
+
+def create_fake_client(channel_count: int = 3, **kwargs) -> FakeMediaLiveClient:
+    """Create a fake client with LEF style sample channels"""
+    client = FakeMediaLiveClient(**kwargs)
+    for index in range(1, channel_count + 1):
+        client.add_channel(
+            f"LefGroup1-Event{index}",
+            state='RUNNING' if index % 2 else 'IDLE',
+            tags={'LiveEventFrameworkVersion': '1.0.0', 'EventGroupStackName': 'LefGroup1'}
+        )
+    return client
+
+
+def load_test(action_count: int, channel_count: int, batch_size: int = scte35_builder.DEFAULT_BATCH_SIZE,
+              workers: Optional[int] = None, **client_args) -> Dict[str, Any]:
+    """
+    Send a rundown of 'action_count' SCTE-35 actions to each of 'channel_count' fake channels
+    concurrently, retrying throttled batches with exponential backoff.
+    """
+    client = create_fake_client(channel_count, **client_args)
+    channel_ids = list(client.channels)
+    base_time = datetime.now(timezone.utc) + timedelta(minutes=5)
+    events = [
+        scte35_builder.placement_opportunity(f"Load_{index}", index + 1, 30,
+                                             start=scte35_builder.fixed_start(base_time + timedelta(minutes=index)))
+        for index in range(action_count)
+    ]
+    batches = scte35_builder.chunk_schedule_actions(scte35_builder.compile_splice_plan(events), batch_size)
+
+    def send(channel_id):
+        retries = 0
+        for creates in batches:
+            delay = 0.05
+            while True:
+                try:
+                    client.batch_update_schedule(ChannelId=channel_id, Creates=creates)
+                    break
+                except ClientError as e:
+                    if e.response['Error']['Code'] != 'TooManyRequestsException':
+                        raise
+                    retries += 1
+                    time.sleep(delay)
+                    delay = min(delay * 2, 2)
+        return retries
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers or channel_count) as executor:
+        retries = sum(executor.map(send, channel_ids))
+    elapsed = time.perf_counter() - start
+
+    total = action_count * channel_count
+    return {
+        'actions': total,
+        'requests': client.call_counts.get('BatchUpdateSchedule', 0),
+        'throttled': client.throttled_counts.get('BatchUpdateSchedule', 0),
+        'retries': retries,
+        'seconds': elapsed,
+        'actions_per_second': total / elapsed if elapsed else float('inf')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test a rundown against fake MediaLive channels.')
+    parser.add_argument('--actions', type=int, default=1000, help='Number of actions sent to each channel')
+    parser.add_argument('--channels', type=int, default=1, help='Number of channels to fan out to')
+    parser.add_argument('--batch-size', type=int, default=scte35_builder.DEFAULT_BATCH_SIZE,
+                        help='Actions per batch_update_schedule request')
+    parser.add_argument('--requests-per-second', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help='Throttling rate per API operation')
+    parser.add_argument('--burst', type=int, default=DEFAULT_BURST, help='Throttling burst per API operation')
+    args = parser.parse_args()
+
+    results = load_test(args.actions, args.channels, batch_size=args.batch_size,
+                        requests_per_second=args.requests_per_second, burst=args.burst)
+    print(f"Scheduled {results['actions']} actions in {results['requests']} requests "
+          f"({results['throttled']} throttled) in {results['seconds']:.2f}s")
+    print(f"Throughput: {results['actions_per_second']:.0f} actions/s")
+
+
+if __name__ == "__main__":
+    main()
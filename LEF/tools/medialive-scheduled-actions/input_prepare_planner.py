@@ -0,0 +1,222 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+"""
+Planner that pre-warms inputs ahead of scheduled input switches.
+
+Given a rundown of upcoming input switches the planner schedules an input prepare action for
+each switch with the requested lead time. MediaLive only keeps one prepared input at a time, so a
+prepare is never placed before the previous switch in the rundown has executed (preparing the
+next input earlier would discard the input prepared for that switch). Switches to the input that
+is already active at that point in the rundown do not need a prepare, and neither do switches
+that already have a prepare of their input in the schedule after the previous switch.
+
+A rundown is a JSON file containing a list of switches, each with an 'input' attachment name and
+either an absolute 'time' (e.g. 2024-01-01T20:00:00.000Z) or an 'offset' in seconds from now:
+
+    [
+        {"input": "backup-feed", "offset": 120},
+        {"input": "main-feed", "time": "2024-01-01T20:00:00.000Z", "name": "BackToMain"}
+    ]
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import scte35_builder
+from live_console import get_action_start_time, parse_schedule_time
+
+DEFAULT_LEAD_SECONDS = 30
+# Prepares closer than this to their switch are flagged as unlikely to finish in time
+DEFAULT_MIN_PREPARE_SECONDS = 10
+# Gap kept between a switch and the prepare of the next input
+PREPARE_GAP_SECONDS = 1
+# Fixed mode actions must be scheduled a little ahead of the time they are submitted
+MIN_SCHEDULING_LEAD_SECONDS = 5
+
+
+class RundownError(ValueError):
+    """Raised when a rundown file cannot be parsed"""
+    pass
+
+
+@dataclass
+class RundownSwitch:
+    """An input switch in a rundown"""
+    action_name: str
+    input_name: str
+    time: datetime
+
+
+@dataclass
+class PlannedPrepare:
+    """An input prepare action planned for a rundown switch"""
+    action_name: str
+    input_name: str
+    time: datetime
+    switch: RundownSwitch
+    warning: Optional[str] = None
+
+    @property
+    def lead_seconds(self) -> float:
+        return (self.switch.time - self.time).total_seconds()
+
+
+def load_rundown(path: str, now: Optional[datetime] = None) -> List[RundownSwitch]:
+    """Load a rundown file and return its switches ordered by time"""
+    now = now or datetime.now(timezone.utc)
+    try:
+        with open(path, 'r') as f:
+            entries = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise RundownError(f"Unable to read rundown '{path}': {str(e)}") from e
+
+    if not isinstance(entries, list):
+        raise RundownError("A rundown must be a JSON list of switches")
+
+    switches = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict) or 'input' not in entry:
+            raise RundownError(f"Rundown entry {index} has no 'input'")
+        if 'time' not in entry and 'offset' not in entry:
+            raise RundownError(f"Rundown entry {index} needs a 'time' or an 'offset'")
+        try:
+            if 'time' in entry:
+                switch_time = parse_schedule_time(entry['time'])
+            else:
+                switch_time = now + timedelta(seconds=float(entry['offset']))
+        except (TypeError, ValueError) as e:
+            raise RundownError(f"Rundown entry {index} has an invalid 'time' or 'offset': {str(e)}") from e
+        name = entry.get('name') or f"InputSwitch_{int(switch_time.timestamp())}_{index}"
+        switches.append(RundownSwitch(action_name=name, input_name=entry['input'], time=switch_time))
+
+    return sorted(switches, key=lambda switch: switch.time)
+
+
+def get_scheduled_switches(schedule_actions: List[Dict[str, Any]],
+                           now: Optional[datetime] = None) -> List[RundownSwitch]:
+    """Build a rundown from the upcoming fixed mode input switches already in a channel schedule"""
+    now = now or datetime.now(timezone.utc)
+    switches = []
+    for action in schedule_actions:
+        settings = action.get('ScheduleActionSettings', {}).get('InputSwitchSettings')
+        start_time = get_action_start_time(action)
+        if settings is None or start_time is None or start_time <= now:
+            continue
+        switches.append(RundownSwitch(action_name=action['ActionName'],
+                                      input_name=settings.get('InputAttachmentNameReference'),
+                                      time=start_time))
+    return sorted(switches, key=lambda switch: switch.time)
+
+
+def get_scheduled_prepares(schedule_actions: List[Dict[str, Any]]) -> List[Tuple[datetime, str]]:
+    """Return the start time and input of the fixed mode input prepares already in a channel schedule"""
+    prepares = []
+    for action in schedule_actions:
+        settings = action.get('ScheduleActionSettings', {}).get('InputPrepareSettings')
+        start_time = get_action_start_time(action)
+        if settings is not None and start_time is not None:
+            prepares.append((start_time, settings.get('InputAttachmentNameReference')))
+    return prepares
+
+
+def plan_input_prepares(switches: List[RundownSwitch], active_input: Optional[str] = None,
+                        lead_seconds: float = DEFAULT_LEAD_SECONDS,
+                        min_prepare_seconds: float = DEFAULT_MIN_PREPARE_SECONDS,
+                        now: Optional[datetime] = None,
+                        scheduled_prepares: Optional[List[Tuple[datetime, str]]] = None) -> List[PlannedPrepare]:
+    """
+    Plan one input prepare per switch that changes input and is not prepared yet.
+
+    Args:
+        switches: Upcoming input switches ordered by time
+        active_input: Input attachment active before the first switch
+        lead_seconds: Requested time between a prepare and its switch
+        min_prepare_seconds: Prepares with less lead time than this carry a warning
+        now: Reference time (default: current UTC time)
+        scheduled_prepares: Input prepares already in the schedule (see get_scheduled_prepares)
+
+    Returns:
+        Planned prepares ordered by time
+    """
+    now = now or datetime.now(timezone.utc)
+    earliest = now + timedelta(seconds=MIN_SCHEDULING_LEAD_SECONDS)
+    current_input = active_input
+    previous_switch_time = None
+    plan = []
+
+    for switch in switches:
+        if switch.input_name == current_input:
+            previous_switch_time = switch.time
+            continue
+
+        already_prepared = any(
+            input_name == switch.input_name and prepare_time < switch.time
+            and (previous_switch_time is None or prepare_time > previous_switch_time)
+            for prepare_time, input_name in scheduled_prepares or []
+        )
+        if already_prepared:
+            current_input = switch.input_name
+            previous_switch_time = switch.time
+            continue
+
+        prepare_time = switch.time - timedelta(seconds=lead_seconds)
+        if previous_switch_time is not None:
+            prepare_time = max(prepare_time, previous_switch_time + timedelta(seconds=PREPARE_GAP_SECONDS))
+        prepare_time = max(prepare_time, earliest)
+
+        planned = PlannedPrepare(action_name=f"{switch.action_name}_Prepare", input_name=switch.input_name,
+                                 time=prepare_time, switch=switch)
+        if prepare_time >= switch.time:
+            planned.warning = "switch is too close to be prepared"
+        elif planned.lead_seconds < min_prepare_seconds:
+            planned.warning = f"only {planned.lead_seconds:.1f}s to prepare the input"
+        plan.append(planned)
+
+        current_input = switch.input_name
+        previous_switch_time = switch.time
+
+    return plan
+
+
+def to_schedule_actions(plan: List[PlannedPrepare], switches: Optional[List[RundownSwitch]] = None,
+                        existing_action_names=()) -> List[Dict[str, Any]]:
+    """
+    Convert a plan into ScheduleActions. Prepares that cannot happen before their switch and prepares
+    already in the schedule are skipped. When 'switches' is given the input switches are included too.
+    """
+    existing = set(existing_action_names)
+    actions = []
+    for planned in plan:
+        if planned.time >= planned.switch.time or planned.action_name in existing:
+            continue
+        actions.append({
+            "ActionName": planned.action_name,
+            "ScheduleActionStartSettings": scte35_builder.fixed_start(planned.time),
+            "ScheduleActionSettings": {
+                "InputPrepareSettings": {"InputAttachmentNameReference": planned.input_name}
+            }
+        })
+    for switch in switches or []:
+        if switch.action_name in existing:
+            continue
+        actions.append({
+            "ActionName": switch.action_name,
+            "ScheduleActionStartSettings": scte35_builder.fixed_start(switch.time),
+            "ScheduleActionSettings": {
+                "InputSwitchSettings": {"InputAttachmentNameReference": switch.input_name}
+            }
+        })
+    return sorted(actions, key=get_action_start_time)
@@ -0,0 +1,427 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+"""
+Asyncio based live operations console for MediaLive channel schedules.
+
+Each watched channel is polled in the background for its state, the active input on each pipeline
+and the upcoming schedule while operator commands are read without blocking. Input switches sent
+from the console are tracked until a pipeline reports the switch action as active so the operator
+gets confirmation the switch executed.
+"""
+
+import asyncio
+import shlex
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+import scte35_builder
+from console_output import Colors, print_header, print_info, print_success, print_warning, print_error
+
+# DescribeChannel is throttled per account, so each watched channel polls at most every 2 seconds
+# and backs off up to MAX_POLL_INTERVAL while MediaLive throttles the requests
+DEFAULT_POLL_INTERVAL = 2.0
+MAX_POLL_INTERVAL = 30.0
+THROTTLING_ERROR_CODES = ('TooManyRequestsException', 'ThrottlingException')
+DEFAULT_SCHEDULE_INTERVAL = 5.0
+DEFAULT_UPCOMING_COUNT = 5
+
+COMMAND_HELP = [
+    ("status", "Show state and active input of all watched channels"),
+    ("schedule", "Show the upcoming schedule of the current channel"),
+    ("inputs", "List the input attachments of the current channel"),
+    ("switch <input> [seconds]", "Switch the current channel to an input now or in N seconds"),
+    ("use <channel-id>", "Make a watched channel the current channel"),
+    ("watch <channel-id>", "Start watching another channel"),
+    ("unwatch <channel-id>", "Stop watching a channel"),
+    ("help", "Show this help"),
+    ("quit", "Exit the console"),
+]
+
+
+def parse_schedule_time(value: str) -> datetime:
+    """Parse a MediaLive schedule time (e.g. 2024-01-01T00:00:00.000Z) into an aware datetime"""
+    return datetime.strptime(value.replace('Z', '+0000'), "%Y-%m-%dT%H:%M:%S.%f%z")
+
+
+def get_action_start_time(action: Dict[str, Any]) -> Optional[datetime]:
+    """Return the fixed start time of a schedule action, or None for immediate and follow mode actions"""
+    fixed = action.get('ScheduleActionStartSettings', {}).get('FixedModeScheduleActionStartSettings')
+    if fixed and fixed.get('Time'):
+        return parse_schedule_time(fixed['Time'])
+    return None
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """Whether an API call failed because MediaLive throttled it"""
+    return isinstance(error, ClientError) and error.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
+
+
+def get_action_type(action: Dict[str, Any]) -> str:
+    """Return the settings key of a schedule action without the 'Settings' suffix (e.g. InputSwitch)"""
+    settings = action.get('ScheduleActionSettings', {})
+    for key in settings:
+        return key[:-len('Settings')] if key.endswith('Settings') else key
+    return 'Unknown'
+
+
+@dataclass
+class PendingSwitch:
+    """An input switch submitted from the console that has not been observed on a pipeline yet"""
+    channel_id: str
+    action_name: str
+    input_name: str
+    submitted_at: float
+    scheduled_time: Optional[datetime] = None
+
+
+@dataclass
+class ChannelWatcher:
+    """Last observed state of a watched channel"""
+    channel_id: str
+    name: str = ''
+    state: str = 'UNKNOWN'
+    input_attachments: List[str] = field(default_factory=list)
+    active_inputs: Dict[str, Dict[str, Optional[str]]] = field(default_factory=dict)
+    upcoming: List[Dict[str, Any]] = field(default_factory=list)
+    last_update: Optional[datetime] = None
+    # Seconds until the next describe_channel, raised while the requests are throttled
+    poll_delay: float = 0.0
+    tasks: List[asyncio.Task] = field(default_factory=list)
+
+
+class LiveOperationsConsole:
+    """Non-blocking operations console for one or more MediaLive channels"""
+
+    def __init__(self, client, channel_ids: List[str], poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 schedule_interval: float = DEFAULT_SCHEDULE_INTERVAL, upcoming_count: int = DEFAULT_UPCOMING_COUNT,
+                 audit_log=None):
+        self.client = client
+        self.audit_log = audit_log
+        self.initial_channel_ids = list(channel_ids)
+        self.poll_interval = poll_interval
+        self.schedule_interval = schedule_interval
+        self.upcoming_count = upcoming_count
+        self.watchers: Dict[str, ChannelWatcher] = {}
+        self.pending_switches: Dict[str, PendingSwitch] = {}
+        self.current_channel_id: Optional[str] = None
+        self.running = True
+
+    async def run(self) -> None:
+        """Start the background watchers and process operator commands until 'quit'"""
+        print_header("MediaLive Live Operations Console")
+        print_info("Type 'help' for a list of commands.")
+        for channel_id in self.initial_channel_ids:
+            self.watch(channel_id)
+
+        commands = self._start_command_reader()
+        try:
+            while self.running:
+                line = await commands.get()
+                if line is None:
+                    break
+                await self.handle_command(line.strip())
+        finally:
+            for channel_id in list(self.watchers):
+                self.unwatch(channel_id, quiet=True)
+
+    def _start_command_reader(self) -> asyncio.Queue:
+        """
+        Read stdin on a daemon thread so a pending read never blocks the event loop or process exit.
+        Lines are delivered through a queue, None signals end of input.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def reader():
+            while True:
+                line = sys.stdin.readline()
+                loop.call_soon_threadsafe(queue.put_nowait, line if line else None)
+                if not line:
+                    return
+
+        threading.Thread(target=reader, name='console-stdin', daemon=True).start()
+        return queue
+
+    def watch(self, channel_id: str) -> None:
+        if channel_id in self.watchers:
+            print_warning(f"Channel {channel_id} is already being watched.")
+            return
+        watcher = ChannelWatcher(channel_id=channel_id)
+        watcher.tasks = [
+            asyncio.create_task(self._poll_channel(watcher)),
+            asyncio.create_task(self._poll_schedule(watcher)),
+        ]
+        self.watchers[channel_id] = watcher
+        if self.current_channel_id is None:
+            self.current_channel_id = channel_id
+        print_info(f"Watching channel {channel_id}")
+
+    def unwatch(self, channel_id: str, quiet: bool = False) -> None:
+        watcher = self.watchers.pop(channel_id, None)
+        if watcher is None:
+            if not quiet:
+                print_warning(f"Channel {channel_id} is not being watched.")
+            return
+        for task in watcher.tasks:
+            task.cancel()
+        if self.current_channel_id == channel_id:
+            self.current_channel_id = next(iter(self.watchers), None)
+        if not quiet:
+            print_info(f"Stopped watching channel {channel_id}")
+
+    async def _poll_channel(self, watcher: ChannelWatcher) -> None:
+        """Poll describe_channel and report state, active input and executed switches"""
+        while True:
+            try:
+                detail = await asyncio.to_thread(self.client.describe_channel, ChannelId=watcher.channel_id)
+                self._apply_channel_detail(watcher, detail)
+                watcher.poll_delay = self.poll_interval
+                await asyncio.sleep(watcher.poll_delay)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if is_throttling_error(e):
+                    delay = self.get_throttled_delay(watcher.poll_delay)
+                    if delay != watcher.poll_delay:
+                        print_warning(f"[{watcher.channel_id}] Channel polls throttled, polling every {delay:g}s")
+                    watcher.poll_delay = delay
+                    await asyncio.sleep(delay)
+                else:
+                    print_warning(f"[{watcher.channel_id}] Failed to describe channel: {str(e)}")
+                    await asyncio.sleep(self.schedule_interval)
+
+    def get_throttled_delay(self, delay: float) -> float:
+        """Double the delay between channel polls after a throttled request, up to MAX_POLL_INTERVAL"""
+        return min(MAX_POLL_INTERVAL, max(delay, self.poll_interval) * 2)
+
+    async def _poll_schedule(self, watcher: ChannelWatcher) -> None:
+        """Refresh the upcoming schedule of a channel"""
+        paginator = self.client.get_paginator('describe_schedule')
+        while True:
+            try:
+                pages = await asyncio.to_thread(
+                    lambda: list(paginator.paginate(ChannelId=watcher.channel_id)))
+                actions = [action for page in pages for action in page.get('ScheduleActions', [])]
+                watcher.upcoming = self._get_upcoming_actions(actions)
+                await asyncio.sleep(self.schedule_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print_warning(f"[{watcher.channel_id}] Failed to describe schedule: {str(e)}")
+                await asyncio.sleep(self.schedule_interval)
+
+    def _get_upcoming_actions(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        timed = []
+        for action in actions:
+            start_time = get_action_start_time(action)
+            if start_time is None or start_time >= now:
+                timed.append((start_time or now, action))
+        timed.sort(key=lambda item: item[0])
+        return [action for _, action in timed[:self.upcoming_count]]
+
+    def _apply_channel_detail(self, watcher: ChannelWatcher, detail: Dict[str, Any]) -> None:
+        channel_id = watcher.channel_id
+        watcher.name = detail.get('Name', watcher.name)
+        watcher.input_attachments = [
+            attachment.get('InputAttachmentName') for attachment in detail.get('InputAttachments', [])
+        ]
+
+        state = detail.get('State', 'UNKNOWN')
+        if state != watcher.state:
+            if watcher.last_update is not None:
+                print_info(f"[{channel_id}] State changed {watcher.state} -> {state}")
+            watcher.state = state
+
+        for pipeline in detail.get('PipelineDetails', []):
+            pipeline_id = pipeline.get('PipelineId', '0')
+            active = {
+                'InputAttachmentName': pipeline.get('ActiveInputAttachmentName'),
+                'InputSwitchActionName': pipeline.get('ActiveInputSwitchActionName'),
+            }
+            previous = watcher.active_inputs.get(pipeline_id)
+            watcher.active_inputs[pipeline_id] = active
+            if previous is not None and previous != active:
+                print_info(f"[{channel_id}] Pipeline {pipeline_id} active input "
+                           f"{previous['InputAttachmentName']} -> {active['InputAttachmentName']}")
+                if self.audit_log is not None and active['InputSwitchActionName']:
+                    self.audit_log.record_execution(channel_id, active['InputSwitchActionName'],
+                                                    datetime.now(timezone.utc), 'pipeline', pipeline_id=pipeline_id)
+            self._check_pending_switch(channel_id, pipeline_id, active)
+
+        watcher.last_update = datetime.now(timezone.utc)
+
+    def _check_pending_switch(self, channel_id: str, pipeline_id: str, active: Dict[str, Optional[str]]) -> None:
+        pending = self.pending_switches.get(active.get('InputSwitchActionName'))
+        if pending is None or pending.channel_id != channel_id:
+            return
+        del self.pending_switches[pending.action_name]
+
+        elapsed = time.monotonic() - pending.submitted_at
+        message = (f"[{channel_id}] Switch '{pending.action_name}' to '{pending.input_name}' executed on "
+                   f"pipeline {pipeline_id} {elapsed:.2f}s after submission")
+        if pending.scheduled_time is not None:
+            drift = (datetime.now(timezone.utc) - pending.scheduled_time).total_seconds()
+            message += f" ({drift:+.2f}s from scheduled time)"
+        print_success(message)
+
+    async def handle_command(self, line: str) -> None:
+        if not line:
+            return
+        try:
+            words = shlex.split(line)
+        except ValueError as e:
+            print_error(f"Could not parse command: {str(e)}")
+            return
+        command, arguments = words[0].lower(), words[1:]
+
+        if command in ('quit', 'exit'):
+            self.running = False
+        elif command == 'help':
+            self.show_help()
+        elif command == 'status':
+            self.show_status()
+        elif command == 'schedule':
+            self.show_schedule()
+        elif command == 'inputs':
+            self.show_inputs()
+        elif command == 'use' and len(arguments) == 1:
+            if arguments[0] in self.watchers:
+                self.current_channel_id = arguments[0]
+                print_info(f"Current channel is {arguments[0]}")
+            else:
+                print_error(f"Channel {arguments[0]} is not being watched.")
+        elif command == 'watch' and len(arguments) == 1:
+            self.watch(arguments[0])
+        elif command == 'unwatch' and len(arguments) == 1:
+            self.unwatch(arguments[0])
+        elif command == 'switch' and len(arguments) in (1, 2):
+            await self.switch_input(arguments[0], arguments[1] if len(arguments) == 2 else None)
+        else:
+            print_error(f"Unknown command or wrong number of arguments: '{line}'. Type 'help' for commands.")
+
+    def show_help(self) -> None:
+        print_header("Commands")
+        for command, description in COMMAND_HELP:
+            print(f"{command:<28} {description}")
+
+    def show_status(self) -> None:
+        if not self.watchers:
+            print_warning("No channels are being watched.")
+            return
+        print_header("Watched Channels")
+        print(f"{'':<2}{'Channel ID':<15} {'Name':<30} {'State':<12} {'Active Input(s)':<30}")
+        print("-" * 92)
+        for channel_id, watcher in self.watchers.items():
+            marker = '*' if channel_id == self.current_channel_id else ''
+            active_inputs = ', '.join(sorted({
+                str(active.get('InputAttachmentName')) for active in watcher.active_inputs.values()
+            })) or '-'
+            print(f"{marker:<2}{channel_id:<15} {watcher.name:<30} {watcher.state:<12} {active_inputs:<30}")
+        if self.pending_switches:
+            print_info(f"{len(self.pending_switches)} switch(es) waiting for confirmation")
+
+    def show_schedule(self) -> None:
+        watcher = self._current_watcher()
+        if watcher is None:
+            return
+        print_header(f"Upcoming Schedule for {watcher.channel_id}")
+        if not watcher.upcoming:
+            print_info("No upcoming actions.")
+            return
+        for action in watcher.upcoming:
+            start_time = get_action_start_time(action)
+            when = scte35_builder.format_schedule_time(start_time) if start_time else 'follow/immediate'
+            print(f"{when:<26} {get_action_type(action):<28} {action.get('ActionName')}")
+
+    def show_inputs(self) -> None:
+        watcher = self._current_watcher()
+        if watcher is None:
+            return
+        active_inputs = {active.get('InputAttachmentName') for active in watcher.active_inputs.values()}
+        print_header(f"Inputs for {watcher.channel_id}")
+        for name in watcher.input_attachments:
+            status = f"{Colors.GREEN}ACTIVE{Colors.ENDC}" if name in active_inputs else ""
+            print(f"{name:<40} {status}")
+
+    async def switch_input(self, input_name: str, seconds: Optional[str]) -> None:
+        watcher = self._current_watcher()
+        if watcher is None:
+            return
+        if watcher.input_attachments and input_name not in watcher.input_attachments:
+            print_error(f"Input '{input_name}' is not attached to channel {watcher.channel_id}.")
+            return
+
+        now = datetime.now(timezone.utc)
+        scheduled_time = None
+        start_settings = scte35_builder.immediate_start()
+        if seconds is not None:
+            try:
+                delay = float(seconds)
+            except ValueError:
+                print_error("Seconds must be a number.")
+                return
+            scheduled_time = now + timedelta(seconds=delay)
+            start_settings = scte35_builder.fixed_start(scheduled_time)
+
+        action_name = f"InputSwitch_{int(now.timestamp() * 1000)}"
+        creates = {
+            "ScheduleActions": [
+                {
+                    "ActionName": action_name,
+                    "ScheduleActionStartSettings": start_settings,
+                    "ScheduleActionSettings": {
+                        "InputSwitchSettings": {"InputAttachmentNameReference": input_name}
+                    }
+                }
+            ]
+        }
+
+        submitted_at = time.monotonic()
+        try:
+            await asyncio.to_thread(self.client.batch_update_schedule,
+                                    ChannelId=watcher.channel_id, Creates=creates)
+        except Exception as e:
+            print_error(f"[{watcher.channel_id}] Failed to schedule input switch: {str(e)}")
+            return
+
+        self.pending_switches[action_name] = PendingSwitch(
+            channel_id=watcher.channel_id,
+            action_name=action_name,
+            input_name=input_name,
+            submitted_at=submitted_at,
+            scheduled_time=scheduled_time
+        )
+        latency = time.monotonic() - submitted_at
+        print_info(f"[{watcher.channel_id}] Submitted '{action_name}' in {latency:.2f}s, waiting for execution...")
+
+    def _current_watcher(self) -> Optional[ChannelWatcher]:
+        if self.current_channel_id is None:
+            print_warning("No channels are being watched. Use 'watch <channel-id>'.")
+            return None
+        return self.watchers[self.current_channel_id]
+
+
+def run_console(client, channel_ids: List[str], poll_interval: float = DEFAULT_POLL_INTERVAL,
+                schedule_interval: float = DEFAULT_SCHEDULE_INTERVAL, audit_log=None) -> None:
+    """Run the live operations console until the operator quits"""
+    console = LiveOperationsConsole(client, channel_ids, poll_interval=poll_interval,
+                                    schedule_interval=schedule_interval, audit_log=audit_log)
+    asyncio.run(console.run())
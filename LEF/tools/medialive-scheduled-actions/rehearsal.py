@@ -0,0 +1,218 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+"""
+Rehearsal replay of an exported channel schedule.
+
+A schedule exported from a previous event is re-based onto a new start time, optionally compressed
+in time (a compression of 10 plays a one hour rundown in six minutes), and sent to a test channel
+or the fake MediaLive service. Action names get a prefix so a rundown can be replayed repeatedly,
+follow mode references are renamed to match, and input attachments can be mapped to the names used
+on the test channel. While the rehearsal runs the channel pipelines are polled and the time each
+input switch becomes active is compared with its planned time to produce a drift report.
+"""
+
+import copy
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import scte35_builder
+from live_console import get_action_start_time, get_action_type
+from schedule_gc import describe_full_schedule
+
+DEFAULT_START_IN_SECONDS = 30
+DEFAULT_ACTION_PREFIX = 'Rehearsal'
+DEFAULT_POLL_INTERVAL = 0.5
+# Time to keep watching the channel after the last planned action
+DEFAULT_GRACE_SECONDS = 10
+
+
+class RehearsalError(ValueError):
+    """Raised when an exported schedule cannot be loaded or replayed"""
+    pass
+
+
+@dataclass
+class ReplayPlan:
+    """Schedule actions re-based for a rehearsal and the planned time of each action"""
+    schedule_actions: List[Dict[str, Any]] = field(default_factory=list)
+    planned_times: Dict[str, datetime] = field(default_factory=dict)
+    skipped: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def end_time(self) -> Optional[datetime]:
+        return max(self.planned_times.values()) if self.planned_times else None
+
+
+@dataclass
+class ActionDrift:
+    """Planned and observed execution of a replayed input switch"""
+    action_name: str
+    planned: datetime
+    observed: Optional[datetime] = None
+    pipeline_id: Optional[str] = None
+
+    @property
+    def drift_seconds(self) -> Optional[float]:
+        return (self.observed - self.planned).total_seconds() if self.observed else None
+
+
+def export_schedule(client, channel_id: str, path: str) -> int:
+    """Write the complete schedule of a channel to a JSON file and return the number of actions"""
+    actions = describe_full_schedule(client, channel_id)
+    document = {
+        'channelId': channel_id,
+        'exportedAt': scte35_builder.format_schedule_time(datetime.now(timezone.utc)),
+        'scheduleActions': actions
+    }
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+    return len(actions)
+
+
+def load_export(path: str) -> List[Dict[str, Any]]:
+    """Load the schedule actions from an exported schedule (or a plain list of actions)"""
+    try:
+        with open(path, 'r') as f:
+            document = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise RehearsalError(f"Unable to read exported schedule '{path}': {str(e)}") from e
+    actions = document.get('scheduleActions') if isinstance(document, dict) else document
+    if not isinstance(actions, list):
+        raise RehearsalError(f"'{path}' does not contain a list of schedule actions")
+    return actions
+
+
+def _scale_durations(settings: Dict[str, Any], compression: float) -> None:
+    """Compress the display and break durations carried by an action so the rundown keeps its shape"""
+    for key in ('StaticImageActivateSettings', 'StaticImageOutputActivateSettings'):
+        if settings.get(key, {}).get('Duration'):
+            settings[key]['Duration'] = max(1, int(settings[key]['Duration'] / compression))
+    splice_insert = settings.get('Scte35SpliceInsertSettings', {})
+    if splice_insert.get('Duration'):
+        splice_insert['Duration'] = max(1, int(splice_insert['Duration'] / compression))
+    for descriptor in settings.get('Scte35TimeSignalSettings', {}).get('Scte35Descriptors', []):
+        segmentation = descriptor.get('Scte35DescriptorSettings', {}).get(
+            'SegmentationDescriptorScte35DescriptorSettings', {})
+        if segmentation.get('SegmentationDuration'):
+            segmentation['SegmentationDuration'] = max(1, int(segmentation['SegmentationDuration'] / compression))
+
+
+def plan_replay(actions: List[Dict[str, Any]], start_time: datetime, compression: float = 1.0,
+                action_prefix: str = DEFAULT_ACTION_PREFIX,
+                input_map: Optional[Dict[str, str]] = None) -> ReplayPlan:
+    """
+    Re-base exported schedule actions onto start_time.
+
+    The earliest fixed mode action is moved to start_time and the offsets of the other fixed mode
+    actions are divided by 'compression'. Follow mode actions are kept when the action they follow
+    is replayed. Immediate mode actions have no recorded time and are skipped.
+
+    Raises:
+        RehearsalError: If the compression is not positive or no action can be replayed
+    """
+    if compression <= 0:
+        raise RehearsalError("Compression must be greater than zero")
+    input_map = input_map or {}
+
+    fixed = [(get_action_start_time(action), action) for action in actions]
+    anchor = min((start for start, _ in fixed if start is not None), default=None)
+    names = {action['ActionName']: f"{action_prefix}_{action['ActionName']}" for action in actions}
+
+    plan = ReplayPlan()
+    for original_time, action in sorted(fixed, key=lambda item: item[0] or datetime.max.replace(tzinfo=timezone.utc)):
+        name = action['ActionName']
+        replayed = copy.deepcopy(action)
+        replayed['ActionName'] = names[name]
+        start = replayed.get('ScheduleActionStartSettings', {})
+        follow = start.get('FollowModeScheduleActionStartSettings')
+
+        if original_time is not None:
+            planned = start_time + (original_time - anchor) / compression
+            replayed['ScheduleActionStartSettings'] = scte35_builder.fixed_start(planned)
+            plan.planned_times[replayed['ActionName']] = planned
+        elif follow is not None:
+            reference = follow.get('ReferenceActionName')
+            if reference not in names:
+                plan.skipped[name] = f"follows '{reference}' which is not in the export"
+                continue
+            follow['ReferenceActionName'] = names[reference]
+        else:
+            plan.skipped[name] = 'immediate mode actions have no recorded time'
+            continue
+
+        settings = replayed.get('ScheduleActionSettings', {})
+        for key in ('InputSwitchSettings', 'InputPrepareSettings'):
+            reference = settings.get(key, {}).get('InputAttachmentNameReference')
+            if reference in input_map:
+                settings[key]['InputAttachmentNameReference'] = input_map[reference]
+        _scale_durations(settings, compression)
+        plan.schedule_actions.append(replayed)
+
+    # Follow mode actions whose reference chain was skipped cannot be scheduled either
+    replayed_names = {action['ActionName'] for action in plan.schedule_actions}
+    changed = True
+    while changed:
+        changed = False
+        for action in list(plan.schedule_actions):
+            follow = action['ScheduleActionStartSettings'].get('FollowModeScheduleActionStartSettings')
+            if follow and follow['ReferenceActionName'] not in replayed_names:
+                plan.schedule_actions.remove(action)
+                replayed_names.discard(action['ActionName'])
+                plan.skipped[action['ActionName'][len(action_prefix) + 1:]] = 'follows a skipped action'
+                changed = True
+
+    if not plan.schedule_actions:
+        raise RehearsalError("The exported schedule has no actions that can be replayed")
+    return plan
+
+
+def get_planned_switches(plan: ReplayPlan) -> Dict[str, ActionDrift]:
+    """Fixed mode input switches of a plan, which are the actions whose execution can be observed"""
+    return {
+        action['ActionName']: ActionDrift(action['ActionName'], plan.planned_times[action['ActionName']])
+        for action in plan.schedule_actions
+        if get_action_type(action) == 'InputSwitch' and action['ActionName'] in plan.planned_times
+    }
+
+
+def send_plan(client, channel_id: str, plan: ReplayPlan,
+              batch_size: int = scte35_builder.DEFAULT_BATCH_SIZE) -> None:
+    """Send the replayed actions in batches, in start time order so follow references already exist"""
+    for creates in scte35_builder.chunk_schedule_actions(plan.schedule_actions, batch_size):
+        client.batch_update_schedule(ChannelId=channel_id, Creates=creates)
+
+
+def watch_execution(client, channel_id: str, switches: Dict[str, ActionDrift], until: datetime,
+                    poll_interval: float = DEFAULT_POLL_INTERVAL, on_observed=None) -> Dict[str, ActionDrift]:
+    """
+    Poll the channel pipelines until 'until' (or every switch was observed) and record the first time
+    each replayed input switch is reported as active.
+    """
+    pending = set(switches)
+    while pending and datetime.now(timezone.utc) < until:
+        detail = client.describe_channel(ChannelId=channel_id)
+        observed_at = datetime.now(timezone.utc)
+        for pipeline in detail.get('PipelineDetails', []):
+            action_name = pipeline.get('ActiveInputSwitchActionName')
+            if action_name in pending:
+                pending.discard(action_name)
+                switches[action_name].observed = observed_at
+                switches[action_name].pipeline_id = pipeline.get('PipelineId')
+                if on_observed is not None:
+                    on_observed(switches[action_name])
+        time.sleep(poll_interval)
+    return switches
@@ -0,0 +1,274 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+"""
+Append-only audit log of scheduled action submissions and their observed execution.
+
+Every batch_update_schedule request made through submit_schedule_update() (or a client wrapped in
+AuditedClient) appends one JSON line per action with its intended start time, the time it was
+submitted, the API latency and the outcome. Executions observed later (an input switch reported as
+active by a pipeline, or a fixed mode action still in the schedule after its start time) are
+appended as separate records, so the log is never rewritten. Executions inferred from the schedule
+carry no execution time, so they are left out of the execution delay statistics.
+
+build_lead_time_report() summarises the log after an event: how far ahead of their start time
+actions were accepted by MediaLive and which ones were submitted too late.
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from statistics import median
+from typing import Any, Dict, Iterator, List, Optional
+
+import scte35_builder
+from live_console import get_action_start_time, get_action_type, parse_schedule_time
+
+DEFAULT_AUDIT_LOG_PATH = 'medialive-schedule-audit.jsonl'
+# Actions accepted less than this many seconds before their start time are reported as late
+DEFAULT_LATE_THRESHOLD_SECONDS = 10
+
+
+def _format_time(value: datetime) -> str:
+    return scte35_builder.format_schedule_time(value)
+
+
+def _get_start_mode(action: Dict[str, Any]) -> str:
+    start = action.get('ScheduleActionStartSettings', {})
+    if 'FixedModeScheduleActionStartSettings' in start:
+        return 'fixed'
+    if 'FollowModeScheduleActionStartSettings' in start:
+        return 'follow'
+    return 'immediate'
+
+
+class AuditLog:
+    """Append-only JSON Lines file shared by every thread of the tool"""
+
+    def __init__(self, path: str = DEFAULT_AUDIT_LOG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        lines = ''.join(json.dumps(record, sort_keys=True) + '\n' for record in records)
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(lines)
+                f.flush()
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        """Yield the records in the log, skipping lines that cannot be parsed (e.g. a partial last line)"""
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            return
+
+    def record_execution(self, channel_id: str, action_name: str, observed_at: datetime, source: str,
+                         pipeline_id: Optional[str] = None, inferred: bool = False) -> None:
+        """
+        Record that an action was observed executing on a channel. Inferred executions were not seen
+        happening: observed_at is the time they were noticed, not the time they executed.
+        """
+        record = {
+            'event': 'execution',
+            'channel_id': channel_id,
+            'action_name': action_name,
+            'observed_at': _format_time(observed_at),
+            'source': source,
+        }
+        if pipeline_id is not None:
+            record['pipeline_id'] = pipeline_id
+        if inferred:
+            record['inferred'] = True
+        self.append([record])
+
+
+def submit_schedule_update(client, audit_log: Optional[AuditLog], ChannelId: str,
+                           Creates: Optional[Dict[str, Any]] = None,
+                           Deletes: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Call batch_update_schedule and record every created and deleted action in the audit log.
+    Failed requests are recorded with their error before the exception is re-raised.
+    """
+    kwargs: Dict[str, Any] = {'ChannelId': ChannelId}
+    if Creates is not None:
+        kwargs['Creates'] = Creates
+    if Deletes is not None:
+        kwargs['Deletes'] = Deletes
+
+    submitted_at = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    error = None
+    try:
+        response = client.batch_update_schedule(**kwargs)
+        return response
+    except Exception as e:
+        error = e
+        response = None
+        raise
+    finally:
+        if audit_log is not None:
+            latency_ms = round((time.perf_counter() - started) * 1000, 1)
+            common = {
+                'event': 'submit',
+                'channel_id': ChannelId,
+                'submitted_at': _format_time(submitted_at),
+                'latency_ms': latency_ms,
+                'status': 'error' if error else 'ok',
+            }
+            if error is not None:
+                common['error'] = str(error)
+            elif response:
+                common['request_id'] = response.get('ResponseMetadata', {}).get('RequestId')
+
+            records = []
+            for action in (Creates or {}).get('ScheduleActions', []):
+                intended = get_action_start_time(action)
+                record = dict(common, operation='create', action_name=action.get('ActionName'),
+                              action_type=get_action_type(action), start_mode=_get_start_mode(action),
+                              intended_time=_format_time(intended) if intended else None)
+                if intended is not None:
+                    record['lead_seconds'] = round((intended - submitted_at).total_seconds() - latency_ms / 1000, 3)
+                records.append(record)
+            for name in (Deletes or {}).get('ActionNames', []):
+                records.append(dict(common, operation='delete', action_name=name))
+            audit_log.append(records)
+
+
+def observe_schedule_executions(audit_log: AuditLog, channel_id: str, schedule_actions: List[Dict[str, Any]],
+                                now: Optional[datetime] = None) -> int:
+    """
+    Record fixed mode actions that are still in the schedule after their start time as inferred
+    executions observed now. Actions already recorded as executed are skipped. Returns the number
+    recorded.
+    """
+    now = now or datetime.now(timezone.utc)
+    observed = {(record.get('channel_id'), record.get('action_name'))
+                for record in audit_log.read() if record.get('event') == 'execution'}
+    count = 0
+    for action in schedule_actions:
+        start_time = get_action_start_time(action)
+        if start_time is None or start_time > now or (channel_id, action['ActionName']) in observed:
+            continue
+        audit_log.record_execution(channel_id, action['ActionName'], now, 'schedule', inferred=True)
+        count += 1
+    return count
+
+
+class AuditedClient:
+    """MediaLive client wrapper that sends schedule updates through submit_schedule_update()"""
+
+    def __init__(self, client, audit_log: AuditLog):
+        self._client = client
+        self.audit_log = audit_log
+
+    def batch_update_schedule(self, **kwargs) -> Dict[str, Any]:
+        return submit_schedule_update(self._client, self.audit_log, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+@dataclass
+class LateSubmission:
+    """An action accepted by MediaLive with less lead time than the threshold"""
+    channel_id: str
+    action_name: str
+    action_type: str
+    intended_time: str
+    lead_seconds: float
+
+
+@dataclass
+class LeadTimeReport:
+    """Summary of scheduling lead-time margins and observed executions"""
+    submitted: int = 0
+    failed: List[Dict[str, Any]] = field(default_factory=list)
+    lead_by_type: Dict[str, List[float]] = field(default_factory=dict)
+    late: List[LateSubmission] = field(default_factory=list)
+    execution_delays: Dict[str, float] = field(default_factory=dict)
+    inferred: int = 0
+    unobserved: int = 0
+
+    def lead_statistics(self) -> Dict[str, Dict[str, float]]:
+        """Minimum, median and 5th percentile lead time per action type"""
+        statistics = {}
+        for action_type, leads in self.lead_by_type.items():
+            ordered = sorted(leads)
+            statistics[action_type] = {
+                'count': len(ordered),
+                'min': ordered[0],
+                'p5': ordered[int(0.05 * (len(ordered) - 1))],
+                'median': median(ordered),
+            }
+        return statistics
+
+
+def build_lead_time_report(records: Iterator[Dict[str, Any]],
+                           late_threshold_seconds: float = DEFAULT_LATE_THRESHOLD_SECONDS,
+                           channel_ids: Optional[List[str]] = None) -> LeadTimeReport:
+    """
+    Summarise an audit log. Only the latest successful submission of each action is considered, so
+    actions that were deleted and re-created are reported once. Execution delays are only measured
+    for executions that were seen happening; inferred executions are counted separately.
+    """
+    submissions: Dict[tuple, Dict[str, Any]] = {}
+    executions: Dict[tuple, Dict[str, Any]] = {}
+    report = LeadTimeReport()
+
+    for record in records:
+        if channel_ids and record.get('channel_id') not in channel_ids:
+            continue
+        key = (record.get('channel_id'), record.get('action_name'))
+        if record.get('event') == 'execution':
+            # An execution seen on a pipeline replaces one inferred from the schedule
+            if key not in executions or (executions[key].get('inferred') and not record.get('inferred')):
+                executions[key] = record
+        elif record.get('event') == 'submit' and record.get('operation') == 'create':
+            if record.get('status') == 'ok':
+                submissions[key] = record
+            else:
+                report.failed.append(record)
+
+    report.submitted = len(submissions)
+    for key, record in submissions.items():
+        if record.get('lead_seconds') is None:
+            continue
+        lead = record['lead_seconds']
+        report.lead_by_type.setdefault(record.get('action_type', 'Unknown'), []).append(lead)
+        if lead < late_threshold_seconds:
+            report.late.append(LateSubmission(channel_id=key[0], action_name=key[1],
+                                              action_type=record.get('action_type', 'Unknown'),
+                                              intended_time=record['intended_time'], lead_seconds=lead))
+        execution = executions.get(key)
+        if execution is None:
+            report.unobserved += 1
+            continue
+        if execution.get('inferred'):
+            report.inferred += 1
+            continue
+        delay = (parse_schedule_time(execution['observed_at'])
+                 - parse_schedule_time(record['intended_time'])).total_seconds()
+        report.execution_delays[f"{key[0]}/{key[1]}"] = delay
+
+    report.late.sort(key=lambda late: late.lead_seconds)
+    return report
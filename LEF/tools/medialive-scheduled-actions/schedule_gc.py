@@ -0,0 +1,195 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+"""
+Garbage collection of expired MediaLive scheduled actions.
+
+Long running channels accumulate thousands of executed SCTE-35, overlay and input switch actions.
+prune_schedule() pages the schedule, selects actions that are safely in the past and removes them
+with batched 'Deletes'. The following actions are always kept:
+
+- Actions that are not provably in the past (fixed time within the minimum age, or in the future)
+- Follow mode actions and every action in their reference chain (follow-mode anchors)
+- The input switch and motion graphics actions reported as active by the channel pipelines
+- Static image activations that may still be displayed on their layer, and the immediate layer
+  change that ended a kept immediate activation
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set
+
+import static_image_overlay
+from live_console import get_action_start_time
+
+DEFAULT_MIN_AGE_SECONDS = 300
+DEFAULT_DELETE_BATCH_SIZE = 100
+
+
+@dataclass
+class PruneResult:
+    """Outcome of a schedule garbage collection pass"""
+    channel_id: str
+    total_actions: int = 0
+    deletable: List[str] = field(default_factory=list)
+    kept: Dict[str, str] = field(default_factory=dict)
+    deleted: List[str] = field(default_factory=list)
+    failed_batches: List[str] = field(default_factory=list)
+
+    def kept_by_reason(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for reason in self.kept.values():
+            counts[reason] = counts.get(reason, 0) + 1
+        return counts
+
+
+def describe_full_schedule(client, channel_id: str) -> List[Dict[str, Any]]:
+    """Return every action in the channel schedule, following NextToken pagination"""
+    paginator = client.get_paginator('describe_schedule')
+    actions = []
+    for page in paginator.paginate(ChannelId=channel_id):
+        actions.extend(page.get('ScheduleActions', []))
+    return actions
+
+
+def get_active_action_names(channel_detail: Dict[str, Any]) -> Dict[str, str]:
+    """Return the action names reported as active by the channel pipelines"""
+    active = {}
+    for pipeline in channel_detail.get('PipelineDetails', []):
+        if pipeline.get('ActiveInputSwitchActionName'):
+            active[pipeline['ActiveInputSwitchActionName']] = 'active input switch'
+        if pipeline.get('ActiveMotionGraphicsActionName'):
+            active[pipeline['ActiveMotionGraphicsActionName']] = 'active motion graphics'
+    return active
+
+
+def _get_follow_reference(action: Dict[str, Any]) -> Optional[str]:
+    follow = action.get('ScheduleActionStartSettings', {}).get('FollowModeScheduleActionStartSettings')
+    return follow.get('ReferenceActionName') if follow else None
+
+
+def _is_immediate(action: Dict[str, Any]) -> bool:
+    return 'ImmediateModeScheduleActionStartSettings' in action.get('ScheduleActionStartSettings', {})
+
+
+def _get_layer_changes_ending(actions: List[Dict[str, Any]], activation_names: Set[str]) -> List[str]:
+    """Names of the immediate static image actions that end the given immediate activations"""
+    ending = []
+    for position, action in enumerate(actions):
+        settings = action.get('ScheduleActionSettings', {}).get('StaticImageActivateSettings')
+        if action['ActionName'] not in activation_names or settings is None or not _is_immediate(action):
+            continue
+        for later in actions[position + 1:]:
+            later_settings = later.get('ScheduleActionSettings', {})
+            layer_settings = (later_settings.get('StaticImageDeactivateSettings')
+                              or later_settings.get('StaticImageActivateSettings'))
+            if layer_settings is not None and layer_settings.get('Layer', 0) == settings.get('Layer', 0):
+                if _is_immediate(later):
+                    ending.append(later['ActionName'])
+                break
+    return ending
+
+
+def select_expired_actions(channel_id: str, actions: List[Dict[str, Any]], channel_detail: Dict[str, Any],
+                           now: Optional[datetime] = None,
+                           min_age_seconds: int = DEFAULT_MIN_AGE_SECONDS) -> PruneResult:
+    """
+    Split a schedule into actions that can be deleted and actions that must be kept.
+
+    Args:
+        channel_id: Channel the schedule belongs to
+        actions: All schedule actions (see describe_full_schedule)
+        channel_detail: describe_channel response used to find active actions
+        now: Reference time (default: current UTC time)
+        min_age_seconds: Fixed mode actions must be at least this old to be deleted
+
+    Returns:
+        PruneResult with 'deletable' names and 'kept' names mapped to the reason they were kept
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(seconds=min_age_seconds)
+    result = PruneResult(channel_id=channel_id, total_actions=len(actions))
+    by_name = {action['ActionName']: action for action in actions}
+
+    kept = dict(get_active_action_names(channel_detail))
+
+    # Follow mode actions and the full chain of actions they reference must stay in the schedule
+    for action in actions:
+        reference = _get_follow_reference(action)
+        if reference is None:
+            continue
+        kept.setdefault(action['ActionName'], 'follow mode action')
+        visited = {action['ActionName']}
+        while reference is not None and reference in by_name and reference not in visited:
+            visited.add(reference)
+            kept.setdefault(reference, 'follow-mode anchor')
+            reference = _get_follow_reference(by_name[reference])
+
+    for name in static_image_overlay.get_possibly_active_activations(actions, now):
+        kept.setdefault(name, 'overlay may be active')
+
+    for action in actions:
+        name = action['ActionName']
+        if name in kept:
+            continue
+        start_time = get_action_start_time(action)
+        if start_time is not None and start_time <= cutoff:
+            result.deletable.append(name)
+        elif start_time is None and _is_immediate(action):
+            # Immediate actions execute when they are received so they are always in the past
+            result.deletable.append(name)
+        else:
+            kept[name] = 'not yet expired'
+
+    # Without the immediate layer change that ended a kept activation, the activation would look
+    # active forever on the next pass
+    for name in _get_layer_changes_ending(actions, set(kept)):
+        if name in result.deletable:
+            result.deletable.remove(name)
+            kept[name] = 'ends a kept overlay'
+
+    result.kept = {name: reason for name, reason in kept.items() if name in by_name}
+    return result
+
+
+def delete_actions(client, channel_id: str, action_names: List[str],
+                   batch_size: int = DEFAULT_DELETE_BATCH_SIZE) -> Dict[str, List[str]]:
+    """
+    Delete actions from the schedule in batches.
+
+    Returns:
+        Dictionary with the 'deleted' action names and the 'failed' batch error messages
+    """
+    deleted, failed = [], []
+    for i in range(0, len(action_names), batch_size):
+        batch = action_names[i:i + batch_size]
+        try:
+            client.batch_update_schedule(ChannelId=channel_id, Deletes={"ActionNames": batch})
+            deleted.extend(batch)
+        except Exception as e:
+            failed.append(f"Batch starting at '{batch[0]}' ({len(batch)} actions): {str(e)}")
+    return {'deleted': deleted, 'failed': failed}
+
+
+def prune_schedule(client, channel_id: str, dry_run: bool = True, min_age_seconds: int = DEFAULT_MIN_AGE_SECONDS,
+                   batch_size: int = DEFAULT_DELETE_BATCH_SIZE) -> PruneResult:
+    """Run a single garbage collection pass over a channel schedule"""
+    channel_detail = client.describe_channel(ChannelId=channel_id)
+    actions = describe_full_schedule(client, channel_id)
+    result = select_expired_actions(channel_id, actions, channel_detail, min_age_seconds=min_age_seconds)
+
+    if not dry_run and result.deletable:
+        outcome = delete_actions(client, channel_id, result.deletable, batch_size=batch_size)
+        result.deleted = outcome['deleted']
+        result.failed_batches = outcome['failed']
+    return result
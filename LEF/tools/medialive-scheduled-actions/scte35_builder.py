@@ -0,0 +1,445 @@
+#!/usr/bin/env python
+
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+"""
+Typed builders for MediaLive SCTE-35 time signal scheduled actions.
+
+A splice plan is a list of splice events (provider ads, placement opportunities, chapters,
+blackouts and cancels). compile_splice_plan() validates the plan and converts it into the
+'ScheduleActions' list expected by MediaLive batch_update_schedule.
+
+Running this module directly executes a throughput benchmark:
+
+    python3 scte35_builder.py --benchmark 10000
+"""
+
+import argparse
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from enum import IntEnum
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# SCTE-35 timing is expressed in 90kHz clock ticks
+TICKS_PER_SECOND = 90000
+
+# Field limits from the SCTE-35 segmentation_descriptor() syntax
+MAX_SEGMENTATION_EVENT_ID = 0xFFFFFFFF
+MAX_SEGMENTATION_DURATION = 0xFFFFFFFFFF
+MAX_UPID_LENGTH_BYTES = 255
+
+# Number of actions sent in a single batch_update_schedule request
+DEFAULT_BATCH_SIZE = 100
+
+HEX_PATTERN = re.compile(r'^[0-9a-fA-F]*$')
+
+
+class SegmentationType(IntEnum):
+    """SCTE-35 segmentation_type_id values supported by the builder"""
+    PROGRAM_START = 0x10
+    PROGRAM_END = 0x11
+    CHAPTER_START = 0x20
+    CHAPTER_END = 0x21
+    PROVIDER_ADVERTISEMENT_START = 0x30
+    PROVIDER_ADVERTISEMENT_END = 0x31
+    DISTRIBUTOR_ADVERTISEMENT_START = 0x32
+    DISTRIBUTOR_ADVERTISEMENT_END = 0x33
+    PROVIDER_PLACEMENT_OPPORTUNITY_START = 0x34
+    PROVIDER_PLACEMENT_OPPORTUNITY_END = 0x35
+    DISTRIBUTOR_PLACEMENT_OPPORTUNITY_START = 0x36
+    DISTRIBUTOR_PLACEMENT_OPPORTUNITY_END = 0x37
+    NETWORK_START = 0x50
+    NETWORK_END = 0x51
+
+
+class UpidType(IntEnum):
+    """SCTE-35 segmentation_upid_type values"""
+    NOT_USED = 0x00
+    USER_DEFINED = 0x01
+    ISCI = 0x02
+    AD_ID = 0x03
+    UMID = 0x04
+    ISAN_DEPRECATED = 0x05
+    ISAN = 0x06
+    TID = 0x07
+    TI = 0x08
+    ADI = 0x09
+    EIDR = 0x0A
+    ATSC = 0x0B
+    MPU = 0x0C
+    MID = 0x0D
+    ADS_INFO = 0x0E
+    URI = 0x0F
+    UUID = 0x10
+
+
+class SpliceValidationError(ValueError):
+    """Raised when a splice event or plan cannot be converted into valid schedule actions"""
+    pass
+
+
+def format_schedule_time(value: datetime) -> str:
+    """Format a datetime in the millisecond precision UTC format used by MediaLive schedules"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def immediate_start() -> Dict[str, Any]:
+    """Start settings for an action executed as soon as it is received"""
+    return {"ImmediateModeScheduleActionStartSettings": {}}
+
+
+def fixed_start(start_time: datetime) -> Dict[str, Any]:
+    """Start settings for an action executed at a fixed UTC time"""
+    return {"FixedModeScheduleActionStartSettings": {"Time": format_schedule_time(start_time)}}
+
+
+def follow_start(reference_action_name: str, follow_point: str = "END") -> Dict[str, Any]:
+    """Start settings for an action that follows the start or end of another input switch"""
+    if follow_point not in ("START", "END"):
+        raise SpliceValidationError(f"Follow point must be START or END, not '{follow_point}'")
+    return {
+        "FollowModeScheduleActionStartSettings": {
+            "FollowPoint": follow_point,
+            "ReferenceActionName": reference_action_name
+        }
+    }
+
+
+@dataclass(frozen=True)
+class Upid:
+    """A segmentation UPID already encoded as a hexadecimal string"""
+    upid_type: int
+    value: str
+
+    def validate(self) -> None:
+        if not 0 <= int(self.upid_type) <= 0xFF:
+            raise SpliceValidationError(f"UPID type {self.upid_type} is outside the range 0-255")
+        if not HEX_PATTERN.match(self.value) or len(self.value) % 2:
+            raise SpliceValidationError(f"UPID '{self.value}' must be an even length hexadecimal string")
+        if len(self.value) // 2 > MAX_UPID_LENGTH_BYTES:
+            raise SpliceValidationError(f"UPID '{self.value}' exceeds {MAX_UPID_LENGTH_BYTES} bytes")
+
+
+@dataclass(frozen=True)
+class DeliveryRestrictions:
+    """SCTE-35 delivery restriction flags. Omitted from the descriptor when not set on an event."""
+    archive_allowed: bool = True
+    web_delivery_allowed: bool = False
+    no_regional_blackout: bool = False
+    device_restrictions: str = "NONE"
+
+    def to_settings(self) -> Dict[str, str]:
+        return {
+            "ArchiveAllowedFlag": "ARCHIVE_ALLOWED" if self.archive_allowed else "ARCHIVE_NOT_ALLOWED",
+            "DeviceRestrictions": self.device_restrictions,
+            "NoRegionalBlackoutFlag": "NO_REGIONAL_BLACKOUT" if self.no_regional_blackout else "REGIONAL_BLACKOUT",
+            "WebDeliveryAllowedFlag": "WEB_DELIVERY_ALLOWED" if self.web_delivery_allowed else "WEB_DELIVERY_NOT_ALLOWED"
+        }
+
+
+@dataclass
+class SpliceEvent:
+    """
+    A single SCTE-35 time signal carrying one segmentation descriptor.
+
+    Attributes:
+        action_name: Unique name of the scheduled action in the channel schedule
+        event_id: SCTE-35 segmentation_event_id
+        segmentation_type: SCTE-35 segmentation_type_id
+        start: Schedule action start settings (see immediate_start/fixed_start/follow_start)
+        duration_seconds: Optional segmentation duration, converted to 90kHz ticks
+        upid: Optional segmentation UPID
+        delivery_restrictions: Optional delivery restriction flags
+        segment_num/segments_expected/sub_segment_num/sub_segments_expected: Segment numbering fields
+        canceled: True to emit a cancel for a previously signalled event id
+    """
+    action_name: str
+    event_id: int
+    segmentation_type: int
+    start: Dict[str, Any] = field(default_factory=immediate_start)
+    duration_seconds: Optional[float] = None
+    upid: Optional[Upid] = None
+    delivery_restrictions: Optional[DeliveryRestrictions] = None
+    segment_num: int = 0
+    segments_expected: int = 0
+    sub_segment_num: Optional[int] = None
+    sub_segments_expected: Optional[int] = None
+    canceled: bool = False
+
+    def validate(self) -> None:
+        if not self.action_name:
+            raise SpliceValidationError("Action name must not be empty")
+        if not 0 <= self.event_id <= MAX_SEGMENTATION_EVENT_ID:
+            raise SpliceValidationError(f"{self.action_name}: event id {self.event_id} is outside the 32-bit range")
+        if not 0 <= int(self.segmentation_type) <= 0xFF:
+            raise SpliceValidationError(f"{self.action_name}: segmentation type {self.segmentation_type} is invalid")
+        if self.duration_seconds is not None:
+            if self.duration_seconds < 0:
+                raise SpliceValidationError(f"{self.action_name}: duration must not be negative")
+            if self.duration_ticks > MAX_SEGMENTATION_DURATION:
+                raise SpliceValidationError(f"{self.action_name}: duration exceeds the 40-bit tick range")
+        for name in ('segment_num', 'segments_expected', 'sub_segment_num', 'sub_segments_expected'):
+            value = getattr(self, name)
+            if value is not None and not 0 <= value <= 0xFF:
+                raise SpliceValidationError(f"{self.action_name}: {name} {value} is outside the range 0-255")
+        if self.upid is not None:
+            self.upid.validate()
+
+    @property
+    def duration_ticks(self) -> Optional[int]:
+        if self.duration_seconds is None:
+            return None
+        return int(round(self.duration_seconds * TICKS_PER_SECOND))
+
+    def to_descriptor_settings(self) -> "OrderedDict[str, Any]":
+        """Build the SegmentationDescriptorScte35DescriptorSettings structure"""
+        settings = OrderedDict()
+        settings["SegmentationEventId"] = self.event_id
+        if self.canceled:
+            # A cancel only carries the event id and the cancel indicator
+            settings["SegmentationCancelIndicator"] = "SEGMENTATION_EVENT_CANCELED"
+            return settings
+
+        settings["SegmentationCancelIndicator"] = "SEGMENTATION_EVENT_NOT_CANCELED"
+        settings["SegmentationTypeId"] = int(self.segmentation_type)
+        if self.upid is not None:
+            settings["SegmentationUpidType"] = int(self.upid.upid_type)
+            settings["SegmentationUpid"] = self.upid.value
+        if self.duration_ticks is not None:
+            settings["SegmentationDuration"] = self.duration_ticks
+        settings["SegmentNum"] = self.segment_num
+        settings["SegmentsExpected"] = self.segments_expected
+        if self.sub_segment_num is not None:
+            settings["SubSegmentNum"] = self.sub_segment_num
+        if self.sub_segments_expected is not None:
+            settings["SubSegmentsExpected"] = self.sub_segments_expected
+        if self.delivery_restrictions is not None:
+            settings["DeliveryRestrictions"] = self.delivery_restrictions.to_settings()
+        return settings
+
+    def to_schedule_action(self) -> Dict[str, Any]:
+        """Convert the event into a single MediaLive ScheduleAction"""
+        return {
+            "ActionName": self.action_name,
+            "ScheduleActionStartSettings": self.start,
+            "ScheduleActionSettings": {
+                "Scte35TimeSignalSettings": {
+                    "Scte35Descriptors": [
+                        {
+                            "Scte35DescriptorSettings": {
+                                "SegmentationDescriptorScte35DescriptorSettings": self.to_descriptor_settings()
+                            }
+                        }
+                    ]
+                }
+            }
+        }
+
+
+def provider_ad(action_name: str, event_id: int, duration_seconds: float, start: Optional[Dict[str, Any]] = None,
+                upid: Optional[Upid] = None) -> SpliceEvent:
+    """Provider Advertisement Start (0x30) with a break duration"""
+    return SpliceEvent(action_name, event_id, SegmentationType.PROVIDER_ADVERTISEMENT_START,
+                       start=start or immediate_start(), duration_seconds=duration_seconds, upid=upid)
+
+
+def placement_opportunity(action_name: str, event_id: int, duration_seconds: float,
+                          start: Optional[Dict[str, Any]] = None, upid: Optional[Upid] = None,
+                          distributor: bool = False) -> SpliceEvent:
+    """Provider (0x34) or Distributor (0x36) Placement Opportunity Start with a break duration"""
+    segmentation_type = (SegmentationType.DISTRIBUTOR_PLACEMENT_OPPORTUNITY_START if distributor
+                         else SegmentationType.PROVIDER_PLACEMENT_OPPORTUNITY_START)
+    return SpliceEvent(action_name, event_id, segmentation_type, start=start or immediate_start(),
+                       duration_seconds=duration_seconds, upid=upid,
+                       sub_segment_num=0, sub_segments_expected=0)
+
+
+def chapter(action_name: str, event_id: int, chapter_num: int, chapters_expected: int,
+            duration_seconds: Optional[float] = None, start: Optional[Dict[str, Any]] = None,
+            upid: Optional[Upid] = None, end: bool = False) -> SpliceEvent:
+    """Chapter Start (0x20) or Chapter End (0x21)"""
+    segmentation_type = SegmentationType.CHAPTER_END if end else SegmentationType.CHAPTER_START
+    return SpliceEvent(action_name, event_id, segmentation_type, start=start or immediate_start(),
+                       duration_seconds=duration_seconds, upid=upid,
+                       segment_num=chapter_num, segments_expected=chapters_expected)
+
+
+def network_start(action_name: str, event_id: int, upid: Upid,
+                  start: Optional[Dict[str, Any]] = None) -> SpliceEvent:
+    """Network Start (0x50). Ends a blackout when the channel has blackout slate enabled."""
+    return SpliceEvent(action_name, event_id, SegmentationType.NETWORK_START, start=start or immediate_start(),
+                       duration_seconds=0, upid=upid)
+
+
+def network_end(action_name: str, event_id: int, upid: Upid, start: Optional[Dict[str, Any]] = None,
+                delivery_restrictions: Optional[DeliveryRestrictions] = None) -> SpliceEvent:
+    """Network End (0x51). Starts a blackout when the channel has blackout slate enabled."""
+    return SpliceEvent(action_name, event_id, SegmentationType.NETWORK_END, start=start or immediate_start(),
+                       duration_seconds=0, upid=upid,
+                       delivery_restrictions=delivery_restrictions or DeliveryRestrictions())
+
+
+def blackout(action_name_prefix: str, event_id: int, upid: Upid, start_time: datetime,
+             duration_seconds: float) -> List[SpliceEvent]:
+    """
+    A blackout window expressed as a Network End at start_time followed by a Network Start
+    duration_seconds later. The two events use consecutive event ids.
+    """
+    end_time = start_time + timedelta(seconds=duration_seconds)
+    return [
+        network_end(f"{action_name_prefix}_NetworkEnd", event_id, upid, start=fixed_start(start_time)),
+        network_start(f"{action_name_prefix}_NetworkStart", event_id + 1, upid, start=fixed_start(end_time))
+    ]
+
+
+def cancel(action_name: str, event_id: int, start: Optional[Dict[str, Any]] = None) -> SpliceEvent:
+    """Cancel a previously signalled segmentation event"""
+    return SpliceEvent(action_name, event_id, 0, start=start or immediate_start(), canceled=True)
+
+
+def get_scheduled_event_ids(schedule_actions: Iterable[Dict[str, Any]]) -> Set[int]:
+    """
+    Collect the segmentation event ids signalled by the SCTE-35 time signal actions of a schedule.
+
+    Args:
+        schedule_actions: ScheduleActions as returned by describe_schedule
+
+    Returns:
+        Event ids of the actions that are not themselves cancels
+    """
+    event_ids = set()
+    for action in schedule_actions:
+        time_signal = action.get("ScheduleActionSettings", {}).get("Scte35TimeSignalSettings", {})
+        for descriptor in time_signal.get("Scte35Descriptors", []):
+            settings = descriptor.get("Scte35DescriptorSettings", {}).get(
+                "SegmentationDescriptorScte35DescriptorSettings", {})
+            if ("SegmentationEventId" in settings
+                    and settings.get("SegmentationCancelIndicator") != "SEGMENTATION_EVENT_CANCELED"):
+                event_ids.add(settings["SegmentationEventId"])
+    return event_ids
+
+
+def compile_splice_plan(events: Iterable[SpliceEvent],
+                        existing_action_names: Iterable[str] = (),
+                        scheduled_event_ids: Iterable[int] = ()) -> List[Dict[str, Any]]:
+    """
+    Validate a splice plan and convert it into a list of MediaLive ScheduleActions.
+
+    Args:
+        events: Splice events in the order they should be submitted
+        existing_action_names: Action names already present in the channel schedule
+        scheduled_event_ids: Event ids already signalled in the channel schedule (see get_scheduled_event_ids)
+
+    Returns:
+        List of ScheduleAction dictionaries
+
+    Raises:
+        SpliceValidationError: If an event is invalid, an action name is reused or a cancel
+                               references an event id that is neither in the plan nor in the schedule
+    """
+    action_names = set(existing_action_names)
+    signalled_event_ids = set(scheduled_event_ids)
+    schedule_actions = []
+
+    for event in events:
+        event.validate()
+        if event.action_name in action_names:
+            raise SpliceValidationError(f"Duplicate action name '{event.action_name}'")
+        action_names.add(event.action_name)
+
+        if event.canceled:
+            if event.event_id not in signalled_event_ids:
+                raise SpliceValidationError(
+                    f"{event.action_name}: cancel references event id {event.event_id} "
+                    f"which is neither in the plan nor in the schedule")
+        else:
+            signalled_event_ids.add(event.event_id)
+
+        schedule_actions.append(event.to_schedule_action())
+
+    return schedule_actions
+
+
+def chunk_schedule_actions(schedule_actions: List[Dict[str, Any]],
+                           batch_size: int = DEFAULT_BATCH_SIZE) -> List[Dict[str, Any]]:
+    """Split ScheduleActions into 'Creates' bodies of at most batch_size actions"""
+    return [
+        {"ScheduleActions": schedule_actions[i:i + batch_size]}
+        for i in range(0, len(schedule_actions), batch_size)
+    ]
+
+
+def benchmark(count: int, upid: Optional[Upid] = None) -> Dict[str, float]:
+    """
+    Measure how quickly a season-long splice plan can be compiled.
+
+    Builds 'count' events cycling through ad breaks, placement opportunities, chapters and
+    blackouts spaced one minute apart and compiles them into ScheduleActions.
+    """
+    upid = upid or Upid(UpidType.MPU, "00000000")
+    base_time = datetime.now(timezone.utc) + timedelta(minutes=5)
+
+    start = time.perf_counter()
+    events = []
+    event_id = 1
+    while len(events) < count:
+        slot = len(events)
+        start_time = base_time + timedelta(minutes=slot)
+        kind = slot % 4
+        if kind == 0:
+            events.append(provider_ad(f"Bench_Ad_{slot}", event_id, 30, start=fixed_start(start_time)))
+        elif kind == 1:
+            events.append(placement_opportunity(f"Bench_Po_{slot}", event_id, 60, start=fixed_start(start_time)))
+        elif kind == 2:
+            events.append(chapter(f"Bench_Chapter_{slot}", event_id, 1, 1, start=fixed_start(start_time)))
+        else:
+            events.extend(blackout(f"Bench_Blackout_{slot}", event_id, upid, start_time, 30))
+            event_id += 1
+        event_id += 1
+    events = events[:count]
+    built = time.perf_counter()
+
+    schedule_actions = compile_splice_plan(events)
+    batches = chunk_schedule_actions(schedule_actions)
+    compiled = time.perf_counter()
+
+    elapsed = compiled - start
+    return {
+        "actions": len(schedule_actions),
+        "batches": len(batches),
+        "build_seconds": built - start,
+        "compile_seconds": compiled - built,
+        "actions_per_second": len(schedule_actions) / elapsed if elapsed else float('inf')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SCTE-35 splice plan builder throughput benchmark.')
+    parser.add_argument('--benchmark', type=int, default=10000, help='Number of splice events to compile')
+    args = parser.parse_args()
+
+    results = benchmark(args.benchmark)
+    print(f"Compiled {results['actions']} actions into {results['batches']} batches")
+    print(f"Build time:   {results['build_seconds']:.3f}s")
+    print(f"Compile time: {results['compile_seconds']:.3f}s")
+    print(f"Throughput:   {results['actions_per_second']:.0f} actions/s")
+
+
+if __name__ == "__main__":
+    main()
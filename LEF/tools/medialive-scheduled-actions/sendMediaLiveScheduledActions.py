@@ -15,50 +15,33 @@
 
 import boto3
 import sys
-import json
 import signal
+import argparse
+import time
 from pprint import pprint
 from datetime import datetime, timedelta, timezone
 from botocore.exceptions import BotoCoreError, ClientError
-from collections import OrderedDict
 
-# Global variable to store the last used layer
-last_used_layer = 0
+import scte35_builder
+import live_console
+import schedule_gc
+import input_prepare_planner
+import static_image_overlay
+import fake_medialive
+import schedule_audit
+import upid_codec
+import rehearsal
+from console_output import Colors, print_header, print_info, print_success, print_warning, print_error, print_json
 
-# ANSI color codes for terminal output
-class Colors:
-    HEADER = '\033[95m'
-    BLUE = '\033[94m'
-    CYAN = '\033[96m'
-    GREEN = '\033[92m'
-    YELLOW = '\033[93m'
-    RED = '\033[91m'
-    ENDC = '\033[0m'
-    BOLD = '\033[1m'
-    UNDERLINE = '\033[4m'
+# Number of channels requested per list_channels page and shown per page of the channel selector
+CHANNEL_PAGE_SIZE = 20
+DEFAULT_SEGMENTATION_EIDR = "10.1234/1234-1234-1234-1234-1234-F"
 
-def print_header(message):
-    print(f"{Colors.HEADER}{Colors.BOLD}=== {message} ==={Colors.ENDC}")
+def get_aws_region(region=None):
+    """Get the AWS region from the command line, boto3 configuration or prompt user if not configured"""
+    if region:
+        return region
 
-def print_info(message):
-    print(f"{Colors.BLUE}INFO: {message}{Colors.ENDC}")
-
-def print_success(message):
-    print(f"{Colors.GREEN}SUCCESS: {message}{Colors.ENDC}")
-
-def print_warning(message):
-    print(f"{Colors.YELLOW}WARNING: {message}{Colors.ENDC}")
-
-def print_error(message):
-    print(f"{Colors.RED}ERROR: {message}{Colors.ENDC}")
-
-def print_json(title, data):
-    print(f"{Colors.CYAN}{title}:{Colors.ENDC}")
-    formatted_json = json.dumps(data, indent=2)
-    print(formatted_json)
-
-def get_aws_region():
-    """Get the AWS region from boto3 configuration or prompt user if not configured"""
     session = boto3.session.Session()
     default_region = session.region_name
     
@@ -72,15 +55,59 @@ def get_aws_region():
         region = default_region
     return region
 
-def list_medialive_channels(client):
-    """List all MediaLive channels in the account"""
+def channel_matches(channel, states=None, tags=None, name_prefix=None):
+    """
+    Check a list_channels summary against the discovery filters.
+
+    Args:
+        channel: Channel summary from list_channels
+        states: Optional list of channel states to include
+        tags: Optional dictionary of tag keys to required values (None matches any value)
+        name_prefix: Optional channel name prefix
+    """
+    if states and channel.get('State') not in states:
+        return False
+    if name_prefix and not channel.get('Name', '').startswith(name_prefix):
+        return False
+    channel_tags = channel.get('Tags', {})
+    for key, value in (tags or {}).items():
+        if key not in channel_tags or (value is not None and channel_tags[key] != value):
+            return False
+    return True
+
+def iter_medialive_channels(client, states=None, tags=None, name_prefix=None, page_size=CHANNEL_PAGE_SIZE):
+    """
+    Lazily yield the MediaLive channels in the account that match the filters.
+
+    Pages are only requested from list_channels as the caller consumes channels, and each
+    page is filtered as it arrives using the state, name and tags in the channel summaries.
+    """
+    paginator = client.get_paginator('list_channels')
+    for page in paginator.paginate(PaginationConfig={'PageSize': page_size}):
+        for channel in page.get('Channels', []):
+            if channel_matches(channel, states, tags, name_prefix):
+                yield channel
+
+def list_medialive_channels(client, states=None, tags=None, name_prefix=None):
+    """List all MediaLive channels in the account that match the filters"""
     try:
-        response = client.list_channels()
-        return response.get('Channels', [])
+        return list(iter_medialive_channels(client, states, tags, name_prefix))
     except Exception as e:
         print_error(f"Failed to list MediaLive channels: {str(e)}")
         return []
 
+def get_channel_filters(args):
+    """Build the channel discovery filters from the command line arguments"""
+    tags = {}
+    for tag in args.tag or []:
+        key, _, value = tag.partition('=')
+        tags[key] = value if '=' in tag else None
+    return {
+        'states': args.state or None,
+        'tags': tags or None,
+        'name_prefix': args.name_prefix
+    }
+
 def get_channel_feature_activations(client, channel_id):
     """Get feature activations for a specific channel"""
     try:
@@ -106,7 +133,7 @@ def get_channel_feature_activations(client, channel_id):
             'BlackoutSlateEnabled': False
         }
 
-def display_channels(channels):
+def display_channels(channels, start_index=1):
     """Display available MediaLive channels with their states"""
     if not channels:
         print_warning("No MediaLive channels found in this account/region.")
@@ -116,7 +143,7 @@ def display_channels(channels):
     print(f"{'Index':<6} {'Channel ID':<15} {'Name':<30} {'State':<15}")
     print("-" * 70)
     
-    for idx, channel in enumerate(channels, 1):
+    for idx, channel in enumerate(channels, start_index):
         channel_id = channel.get('Id', 'N/A')
         name = channel.get('Name', 'Unnamed')
         state = channel.get('State', 'UNKNOWN')
@@ -137,19 +164,75 @@ def display_channels(channels):
     
     return True
 
-def select_channel(channels):
-    """Prompt user to select a channel"""
-    if not channels:
-        return None
-        
+def select_channel(channels, page_size=CHANNEL_PAGE_SIZE):
+    """
+    Prompt user to select a channel.
+
+    'channels' may be a lazy iterator (see iter_medialive_channels). Channels are only fetched
+    when a page needs to be displayed, and the list can be narrowed with an incremental search
+    on the channel name or ID.
+    """
+    iterator = iter(channels)
+    loaded = []
+    exhausted = False
+    search = ''
+    offset = 0
+
     while True:
+        def matches(channel):
+            return (search.lower() in channel.get('Name', '').lower()
+                    or search.lower() in channel.get('Id', '').lower())
+
+        visible = [channel for channel in loaded if matches(channel)]
+        # Fetch channels until the current page is full or there are no more channels
+        while len(visible) < offset + page_size and not exhausted:
+            try:
+                channel = next(iterator)
+            except StopIteration:
+                exhausted = True
+                break
+            except Exception as e:
+                print_error(f"Failed to list MediaLive channels: {str(e)}")
+                exhausted = True
+                break
+            loaded.append(channel)
+            if matches(channel):
+                visible.append(channel)
+
+        if not loaded:
+            return None
+
+        page = visible[offset:offset + page_size]
+        if search and not page:
+            print_warning(f"No channels match '{search}'. Clearing search.")
+            search, offset = '', 0
+            continue
+        if search:
+            print_info(f"Channels matching '{search}'")
+        display_channels(page, start_index=offset + 1)
+
+        options = ["index to select", "'/text' to search", "'/' to clear search"]
+        if not exhausted or len(visible) > offset + page_size:
+            options.append("'n' for next page")
+        if offset > 0:
+            options.append("'p' for previous page")
+        choice = input(f"\nEnter the channel {', '.join(options)}: ").strip()
+
+        if choice.lower() == 'n':
+            if len(visible) > offset + page_size or not exhausted:
+                offset += page_size
+            continue
+        if choice.lower() == 'p':
+            offset = max(0, offset - page_size)
+            continue
+        if choice.startswith('/'):
+            search, offset = choice[1:].strip(), 0
+            continue
         try:
-            choice = input("\nEnter the index of the channel you want to work with: ").strip()
             idx = int(choice) - 1
-            if 0 <= idx < len(channels):
-                return channels[idx]
-            else:
-                print_error(f"Invalid selection. Please enter a number between 1 and {len(channels)}.")
+            if 0 <= idx < len(visible):
+                return visible[idx]
+            print_error(f"Invalid selection. Please enter a number between 1 and {len(visible)}.")
         except ValueError:
             print_error("Please enter a valid number.")
 
@@ -373,6 +456,22 @@ def create_input_switch_action(client, channel_id):
             }
         ]
     }
+
+    # Pre-warm the input ahead of a future switch when the channel supports input prepare
+    if advanced_notice is not None and not selected_input.get('IsActive'):
+        feature_activations = get_channel_feature_activations(client, channel_id)
+        if feature_activations['InputPrepareScheduleActions'] == 'ENABLED':
+            use_prepare = input("\nSchedule an input prepare before this switch? (y/n, default: y): ").strip().lower()
+            if use_prepare != 'n':
+                active_input = next((i.get('InputAttachmentName') for i in inputs if i.get('IsActive')), None)
+                switch = input_prepare_planner.RundownSwitch(actionName, selected_input.get('InputAttachmentName'),
+                                                             timeInsertion)
+                plan = input_prepare_planner.plan_input_prepares([switch], active_input=active_input)
+                for planned in plan:
+                    if planned.warning:
+                        print_warning(f"Input prepare for {planned.input_name}: {planned.warning}")
+                scheduledActionBody["ScheduleActions"] = (
+                    input_prepare_planner.to_schedule_actions(plan) + scheduledActionBody["ScheduleActions"])
     
     # Send the request
     try:
@@ -503,37 +602,22 @@ def create_timesignal_provider_ad_action(client, channel_id):
         }
         print_info("Using immediate insertion")
     
-    # Create the scheduled action body
-    scheduledActionBody = {
-        "ScheduleActions": [
-            {
-                "ActionName": actionName,
-                "ScheduleActionStartSettings": scheduleActionStartSettings,
-                "ScheduleActionSettings": {
-                    "Scte35TimeSignalSettings": {
-                        "Scte35Descriptors": [
-                            {
-                                "Scte35DescriptorSettings": {
-                                    "SegmentationDescriptorScte35DescriptorSettings": {
-                                        "SubSegmentsExpected": 0,
-                                        "SegmentationEventId": eventId,
-                                        "SegmentationDuration": break_duration * 90000,  # Duration in 90kHz clock ticks
-                                        "SegmentationCancelIndicator": "SEGMENTATION_EVENT_NOT_CANCELED",
-                                        "SubSegmentNum": 0,
-                                        "SegmentationUpidType": 12,
-                                        "SegmentNum": 0,
-                                        "SegmentationUpid": f"{eventId}",
-                                        "SegmentationTypeId": 52,  # Provider Advertisement (52)
-                                        "SegmentsExpected": 0
-                                    }
-                                }
-                            }
-                        ]
-                    }
-                }
-            }
-        ]
-    }
+    # Create the scheduled action body. Segmentation type 0x34 (Provider Placement Opportunity
+    # Start) is used as MediaTailor treats it as an ad avail.
+    splice_event = scte35_builder.placement_opportunity(
+        actionName,
+        eventId,
+        break_duration,
+        start=scheduleActionStartSettings,
+        upid=scte35_builder.Upid(scte35_builder.UpidType.MPU, f"{eventId}")
+    )
+    try:
+        scheduledActionBody = {
+            "ScheduleActions": scte35_builder.compile_splice_plan([splice_event])
+        }
+    except scte35_builder.SpliceValidationError as e:
+        print_error(f"Invalid SCTE-35 action: {str(e)}")
+        return False
     
     # Send the request
     try:
@@ -559,9 +643,14 @@ def create_network_start_action(client, channel_id):
     advanced_notice = get_schedule_time()
     
     # Get segmentation ID (optional)
-    segmentation_id = input("\nEnter segmentation ID (hex, default: 10.1234/1234-1234-1234-1234-1234-C): ").strip()
+    segmentation_id = input(f"\nEnter segmentation ID (EIDR, default: {DEFAULT_SEGMENTATION_EIDR}): ").strip()
     if not segmentation_id:
-        segmentation_id = "10.1234/1234-1234-1234-1234-1234-C"
+        segmentation_id = DEFAULT_SEGMENTATION_EIDR
+    try:
+        segmentation_upid = scte35_builder.Upid(scte35_builder.UpidType.EIDR, convert_segmentation_id(segmentation_id))
+    except upid_codec.UpidError as e:
+        print_error(f"Invalid segmentation ID: {str(e)}")
+        return False
     
     # Generate action name and event ID
     timeNow = datetime.now(timezone.utc)
@@ -586,38 +675,20 @@ def create_network_start_action(client, channel_id):
         }
         print_info("Using immediate insertion")
 
-    # Create the scheduled action body with OrderedDict
-    segment_settings = OrderedDict([
-        ("SegmentationEventId", eventId),
-        ("SegmentationCancelIndicator", "SEGMENTATION_EVENT_NOT_CANCELED"),
-        ("SegmentationTypeId", 80),  # Network Start (0x50 = 80)
-        ("SegmentationUpidType", 12),
-        ("SegmentationUpid", convert_segmentation_id(segmentation_id)),
-        ("SegmentationDuration", 0),
-        ("SegmentNum", 0),
-        ("SegmentsExpected", 0)
-    ])
-
     # Create the scheduled action body
-    scheduledActionBody = {
-        "ScheduleActions": [
-            {
-                "ActionName": actionName,
-                "ScheduleActionStartSettings": scheduleActionStartSettings,
-                "ScheduleActionSettings": {
-                    "Scte35TimeSignalSettings": {
-                        "Scte35Descriptors": [
-                            {
-                                "Scte35DescriptorSettings": {
-                                    "SegmentationDescriptorScte35DescriptorSettings": segment_settings
-                                }
-                            }
-                        ]
-                    }
-                }
-            }
-        ]
-    }
+    splice_event = scte35_builder.network_start(
+        actionName,
+        eventId,
+        segmentation_upid,
+        start=scheduleActionStartSettings
+    )
+    try:
+        scheduledActionBody = {
+            "ScheduleActions": scte35_builder.compile_splice_plan([splice_event])
+        }
+    except scte35_builder.SpliceValidationError as e:
+        print_error(f"Invalid SCTE-35 action: {str(e)}")
+        return False
     
     # Send the request
     try:
@@ -643,9 +714,14 @@ def create_network_end_action(client, channel_id):
     advanced_notice = get_schedule_time()
     
     # Get segmentation ID (optional)
-    segmentation_id = input("\nEnter segmentation ID (hex, default: 10.1234/1234-1234-1234-1234-1234-C): ").strip()
+    segmentation_id = input(f"\nEnter segmentation ID (EIDR, default: {DEFAULT_SEGMENTATION_EIDR}): ").strip()
     if not segmentation_id:
-        segmentation_id = "10.1234/1234-1234-1234-1234-1234-C"
+        segmentation_id = DEFAULT_SEGMENTATION_EIDR
+    try:
+        segmentation_upid = scte35_builder.Upid(scte35_builder.UpidType.EIDR, convert_segmentation_id(segmentation_id))
+    except upid_codec.UpidError as e:
+        print_error(f"Invalid segmentation ID: {str(e)}")
+        return False
 
     # Generate action name and event ID
     timeNow = datetime.now(timezone.utc)
@@ -670,44 +746,20 @@ def create_network_end_action(client, channel_id):
         }
         print_info("Using immediate insertion")
 
-    # Create the scheduled action body with OrderedDict
-    segment_settings = OrderedDict([
-        ("SegmentationEventId", eventId),
-        ("SegmentationCancelIndicator", "SEGMENTATION_EVENT_NOT_CANCELED"),
-        ("SegmentationTypeId", 81),  # Network End (0x51 = 81)
-        ("SegmentationUpidType", 12),
-        ("SegmentationUpid", convert_segmentation_id(segmentation_id)),
-        ("SegmentationDuration", 0),
-        ("SegmentNum", 0),
-        ("SegmentsExpected", 0),
-        ("DeliveryRestrictions", {
-            "ArchiveAllowedFlag": "ARCHIVE_ALLOWED",
-            "DeviceRestrictions": "NONE",
-            "NoRegionalBlackoutFlag": "REGIONAL_BLACKOUT",
-            "WebDeliveryAllowedFlag": "WEB_DELIVERY_NOT_ALLOWED"
-        })
-    ])
-
     # Create the scheduled action body
-    scheduledActionBody = {
-        "ScheduleActions": [
-            {
-                "ActionName": actionName,
-                "ScheduleActionStartSettings": scheduleActionStartSettings,
-                "ScheduleActionSettings": {
-                    "Scte35TimeSignalSettings": {
-                        "Scte35Descriptors": [
-                            {
-                                "Scte35DescriptorSettings": {
-                                    "SegmentationDescriptorScte35DescriptorSettings": segment_settings
-                                }
-                            }
-                        ]
-                    }
-                }
-            }
-        ]
-    }
+    splice_event = scte35_builder.network_end(
+        actionName,
+        eventId,
+        segmentation_upid,
+        start=scheduleActionStartSettings
+    )
+    try:
+        scheduledActionBody = {
+            "ScheduleActions": scte35_builder.compile_splice_plan([splice_event])
+        }
+    except scte35_builder.SpliceValidationError as e:
+        print_error(f"Invalid SCTE-35 action: {str(e)}")
+        return False
     
     # Send the request
     try:
@@ -740,14 +792,28 @@ def create_static_image_overlay_action(client, channel_id):
     
     # StaticImageActivateSettings applies to all outputs, no need to specify output names
     
+    # Default to the lowest layer that is free at the scheduled time according to the channel schedule
+    default_layer = 0
+    try:
+        allocator = static_image_overlay.LayerAllocator.from_schedule(
+            schedule_gc.describe_full_schedule(client, channel_id))
+        start_time = datetime.now(timezone.utc) + timedelta(seconds=advanced_notice or 0)
+        occupied_layers = allocator.occupied_layers(start_time)
+        if occupied_layers:
+            print_info(f"Layers in use at the scheduled time: {', '.join(str(layer) for layer in occupied_layers)}")
+        free_layer = allocator.first_free_layer(start_time, None)
+        if free_layer is None:
+            print_warning("All layers are in use. Activating an image on a layer replaces its current image.")
+        else:
+            default_layer = free_layer
+    except Exception as e:
+        print_warning(f"Could not determine layers in use from the schedule: {str(e)}")
+
     # Get layer settings
     while True:
         try:
-            layer = int(input("\nEnter layer (0-7, default: 0): ").strip() or "0")
+            layer = int(input(f"\nEnter layer (0-7, default: {default_layer}): ").strip() or str(default_layer))
             if 0 <= layer <= 7:
-                # Store the layer in a global variable for deactivation
-                global last_used_layer
-                last_used_layer = layer
                 break
             else:
                 print_error("Layer must be between 0 and 7.")
@@ -860,10 +926,32 @@ def create_static_image_overlay_deactivate_action(client, channel_id):
     
     # StaticImageDeactivateSettings applies to all outputs, no need to specify output names
     
-    # Use the last activated layer
-    global last_used_layer
-    layer = last_used_layer
-    print_info(f"Using last activated layer: {layer}")
+    # Default to the layer of the most recent activation still displayed according to the channel schedule
+    default_layer = 0
+    try:
+        allocator = static_image_overlay.LayerAllocator.from_schedule(
+            schedule_gc.describe_full_schedule(client, channel_id))
+        deactivate_time = datetime.now(timezone.utc) + timedelta(seconds=advanced_notice or 0)
+        occupied_layers = allocator.occupied_layers(deactivate_time)
+        latest = allocator.latest_activation(deactivate_time)
+        if latest is None:
+            print_warning("No active overlays found in the channel schedule.")
+        else:
+            print_info(f"Layers in use: {', '.join(str(layer) for layer in occupied_layers)}")
+            default_layer = latest.layer
+    except Exception as e:
+        print_warning(f"Could not determine layers in use from the schedule: {str(e)}")
+
+    while True:
+        try:
+            layer = int(input(f"\nEnter layer to deactivate (0-7, default: {default_layer}): ").strip()
+                        or str(default_layer))
+            if 0 <= layer <= 7:
+                break
+            else:
+                print_error("Layer must be between 0 and 7.")
+        except ValueError:
+            print_error("Please enter a valid number.")
     
     # Generate action name and event ID
     timeNow = datetime.now(timezone.utc)
@@ -931,35 +1019,19 @@ def create_static_image_overlay_deactivate_action(client, channel_id):
 
 def convert_segmentation_id(segmentation_id):
     """
-    Convert a segmentation ID to a valid 24-character hexadecimal format.
+    Convert an EIDR segmentation ID to its 24-character hexadecimal UPID (SCTE-35 type 0x0A).
     
     Args:
-        segmentation_id: The segmentation ID to convert (e.g., "10.1234/1234-1234-1234-1234-1234-C")
+        segmentation_id: The EIDR to convert (e.g., "10.5240/7791-8534-2C23-9030-8610-5"). The
+            trailing check character is optional but must be correct when given.
     
     Returns:
-        A 24-character string containing only valid hexadecimal values
-    """
-    # 1. Remove characters preceding the first '.' in the string
-    if '.' in segmentation_id:
-        segmentation_id = segmentation_id.split('.', 1)[1]
+        A 24-character string holding the 16-bit DOI prefix and the 80-bit EIDR suffix
     
-    # 2. Remove characters following the final '-' in the string
-    if '-' in segmentation_id:
-        segmentation_id = segmentation_id.rsplit('-', 1)[0]
-    
-    # 3. Remove all '/', '-' or '.' characters
-    segmentation_id = segmentation_id.replace('/', '').replace('-', '').replace('.', '')
-    
-    # Ensure the string contains only valid hexadecimal characters (0-9, a-f, A-F)
-    hex_chars = ''.join(c for c in segmentation_id if c.lower() in '0123456789abcdef')
-    
-    # Pad or truncate to exactly 20 characters
-    if len(hex_chars) < 24:
-        hex_chars = hex_chars.ljust(20, '0')
-    else:
-        hex_chars = hex_chars[:24]
-    
-    return hex_chars
+    Raises:
+        upid_codec.UpidError: If the segmentation ID is not a valid EIDR
+    """
+    return upid_codec.encode_eidr(segmentation_id).value
 
 def signal_handler(sig, frame):
     """Handle keyboard interrupts gracefully"""
@@ -968,34 +1040,434 @@ def signal_handler(sig, frame):
     print_info("Script terminated by user. Thank you for using the MediaLive Scheduled Actions Tool.")
     sys.exit(0)
 
+def parse_args():
+    """Parse command line arguments. Without a command the interactive menu is started."""
+    parser = argparse.ArgumentParser(description='Create scheduled actions on MediaLive channels.')
+    parser.add_argument('--region', type=str, help='AWS region (default: boto3 configuration)')
+    parser.add_argument('--state', action='append',
+                        help='Only list channels in this state, e.g. RUNNING (can be repeated)')
+    parser.add_argument('--tag', action='append',
+                        help='Only list channels with this tag, as KEY or KEY=VALUE (can be repeated)')
+    parser.add_argument('--name-prefix', help='Only list channels whose name starts with this prefix')
+    parser.add_argument('--fake', action='store_true',
+                        help='Use an in-process fake MediaLive service instead of AWS (for testing)')
+    parser.add_argument('--fake-channels', type=int, default=3,
+                        help='Number of sample channels created by --fake (default: 3)')
+    parser.add_argument('--audit-log',
+                        help=f"Append-only audit log of scheduled actions (default: {schedule_audit.DEFAULT_AUDIT_LOG_PATH}, "
+                             "not written with --fake unless given)")
+    parser.add_argument('--no-audit-log', action='store_true', help='Do not record scheduled actions in the audit log')
+    subparsers = parser.add_subparsers(dest='command')
+
+    console_parser = subparsers.add_parser('console', help='Live operations console watching one or more channels')
+    console_parser.add_argument('--channel-id', dest='channel_ids', action='append', default=[],
+                                help='Channel to watch (can be repeated, default: select interactively)')
+    console_parser.add_argument('--poll-interval', type=float, default=live_console.DEFAULT_POLL_INTERVAL,
+                                help='Seconds between channel state polls')
+    console_parser.add_argument('--schedule-interval', type=float, default=live_console.DEFAULT_SCHEDULE_INTERVAL,
+                                help='Seconds between schedule refreshes')
+
+    prune_parser = subparsers.add_parser('prune', help='Delete expired actions from channel schedules')
+    prune_parser.add_argument('--channel-id', dest='channel_ids', action='append', default=[],
+                              help='Channel to prune (can be repeated, default: select interactively)')
+    prune_parser.add_argument('--dry-run', action='store_true',
+                              help='Report the actions that would be deleted without deleting them')
+    prune_parser.add_argument('--min-age', type=int, default=schedule_gc.DEFAULT_MIN_AGE_SECONDS,
+                              help='Minimum age in seconds of an action before it is deleted')
+    prune_parser.add_argument('--batch-size', type=int, default=schedule_gc.DEFAULT_DELETE_BATCH_SIZE,
+                              help='Number of actions deleted per batch_update_schedule request')
+    prune_parser.add_argument('--interval', type=int,
+                              help='Repeat the prune every N seconds until interrupted (scheduled mode)')
+
+    prepare_parser = subparsers.add_parser('prepare',
+                                           help='Schedule input prepare actions ahead of upcoming input switches')
+    prepare_parser.add_argument('--channel-id', help='Channel to plan (default: select interactively)')
+    prepare_parser.add_argument('--rundown',
+                                help='JSON rundown of input switches to schedule (default: upcoming switches '
+                                     'already in the channel schedule)')
+    prepare_parser.add_argument('--lead-time', type=float, default=input_prepare_planner.DEFAULT_LEAD_SECONDS,
+                                help='Seconds between an input prepare and its switch')
+    prepare_parser.add_argument('--dry-run', action='store_true', help='Show the plan without scheduling it')
+
+    slideshow_parser = subparsers.add_parser('slideshow',
+                                             help='Schedule a sequence of static image overlays in one update')
+    slideshow_parser.add_argument('--channel-id', help='Channel to schedule (default: select interactively)')
+    slideshow_parser.add_argument('--slides', required=True, help='JSON file describing the slides')
+    slideshow_parser.add_argument('--start-in', type=float, default=10,
+                                  help='Seconds from now until the first slide is displayed')
+    slideshow_parser.add_argument('--repeat', type=int, default=1, help='Number of times to play the slides')
+    slideshow_parser.add_argument('--layer', type=int, choices=range(0, static_image_overlay.MAX_LAYER + 1),
+                                  help='Layer for all slides (default: allocate free layers)')
+    slideshow_parser.add_argument('--dry-run', action='store_true', help='Show the actions without scheduling them')
+
+    report_parser = subparsers.add_parser('audit-report',
+                                          help='Summarise scheduling lead-time margins from the audit log')
+    report_parser.add_argument('--channel-id', dest='channel_ids', action='append', default=[],
+                               help='Only report on this channel (can be repeated)')
+    report_parser.add_argument('--late-threshold', type=float,
+                               default=schedule_audit.DEFAULT_LATE_THRESHOLD_SECONDS,
+                               help='Actions accepted with less lead time than this (seconds) are reported as late')
+    report_parser.add_argument('--observe', action='store_true',
+                               help='Record executions of past fixed mode actions found in the channel schedules '
+                                    'before reporting')
+
+    export_parser = subparsers.add_parser('export', help='Export the schedule of a channel to a JSON file')
+    export_parser.add_argument('--channel-id', help='Channel to export (default: select interactively)')
+    export_parser.add_argument('--output', required=True, help='File the schedule is written to')
+
+    rehearse_parser = subparsers.add_parser('rehearse',
+                                            help='Replay an exported schedule against a test channel and report drift')
+    rehearse_parser.add_argument('--channel-id', help='Test channel to replay on (default: select interactively)')
+    rehearse_parser.add_argument('--schedule', required=True, help='Schedule exported with the export command')
+    rehearse_parser.add_argument('--compression', type=float, default=1.0,
+                                 help='Time compression factor, e.g. 10 replays an hour in six minutes')
+    rehearse_parser.add_argument('--start-in', type=float, default=rehearsal.DEFAULT_START_IN_SECONDS,
+                                 help='Seconds from now until the first replayed action')
+    rehearse_parser.add_argument('--prefix', default=rehearsal.DEFAULT_ACTION_PREFIX,
+                                 help='Prefix added to replayed action names')
+    rehearse_parser.add_argument('--input-map', action='append', default=[],
+                                 help='Map an input attachment of the export to one on the test channel, '
+                                      'as EXPORTED=TEST (can be repeated)')
+    rehearse_parser.add_argument('--poll-interval', type=float, default=rehearsal.DEFAULT_POLL_INTERVAL,
+                                 help='Seconds between channel polls while watching the rehearsal')
+    rehearse_parser.add_argument('--dry-run', action='store_true', help='Show the replay plan without sending it')
+
+    return parser.parse_args()
+
+def run_export(client, args):
+    """Export a channel schedule for a later rehearsal"""
+    channel_id = args.channel_id or select_channel_id(client, args)
+    try:
+        count = rehearsal.export_schedule(client, channel_id, args.output)
+    except (BotoCoreError, ClientError, OSError) as e:
+        print_error(f"Failed to export the schedule of channel {channel_id}: {str(e)}")
+        return False
+    print_success(f"Exported {count} actions from channel {channel_id} to {args.output}")
+    return True
+
+def run_rehearsal(client, args, audit_log=None):
+    """Replay an exported schedule on a test channel and report drift between planned and actual execution"""
+    input_map = {}
+    for mapping in args.input_map:
+        exported, _, test = mapping.partition('=')
+        if not test:
+            print_error(f"Invalid input mapping '{mapping}'. Use EXPORTED=TEST")
+            return False
+        input_map[exported] = test
+
+    try:
+        actions = rehearsal.load_export(args.schedule)
+        start_time = datetime.now(timezone.utc) + timedelta(seconds=args.start_in)
+        plan = rehearsal.plan_replay(actions, start_time, compression=args.compression,
+                                     action_prefix=args.prefix, input_map=input_map)
+    except rehearsal.RehearsalError as e:
+        print_error(str(e))
+        return False
+
+    print_header(f"Rehearsal of {args.schedule}")
+    print_info(f"Replaying {len(plan.schedule_actions)} of {len(actions)} actions "
+               f"at {args.compression:g}x from {scte35_builder.format_schedule_time(start_time)}")
+    for name, reason in plan.skipped.items():
+        print_warning(f"Skipping '{name}': {reason}")
+    if plan.end_time is not None:
+        print_info(f"Last fixed mode action at {scte35_builder.format_schedule_time(plan.end_time)}")
+    if args.dry_run:
+        for action in plan.schedule_actions:
+            start = plan.planned_times.get(action['ActionName'])
+            when = scte35_builder.format_schedule_time(start) if start else 'follow mode'
+            print(f"  {when:<26} {action['ActionName']:<50} {live_console.get_action_type(action)}")
+        return True
+
+    channel_id = args.channel_id or select_channel_id(client, args)
+    try:
+        rehearsal.send_plan(client, channel_id, plan)
+    except (BotoCoreError, ClientError) as e:
+        print_error(f"Failed to schedule the rehearsal: {str(e)}")
+        return False
+    print_success(f"Scheduled {len(plan.schedule_actions)} actions on channel {channel_id}")
+
+    switches = rehearsal.get_planned_switches(plan)
+    if not switches:
+        print_info("The rehearsal has no fixed mode input switches to observe")
+        return True
+
+    def on_observed(drift):
+        print_info(f"'{drift.action_name}' active on pipeline {drift.pipeline_id} ({drift.drift_seconds:+.2f}s)")
+        if audit_log is not None:
+            audit_log.record_execution(channel_id, drift.action_name, drift.observed, 'pipeline',
+                                       pipeline_id=drift.pipeline_id)
+
+    print_info(f"Watching {len(switches)} input switches. Press Ctrl+C to stop.")
+    until = plan.end_time + timedelta(seconds=rehearsal.DEFAULT_GRACE_SECONDS)
+    rehearsal.watch_execution(client, channel_id, switches, until, poll_interval=args.poll_interval,
+                              on_observed=on_observed)
+
+    print_header("Rehearsal Drift Report")
+    observed = [drift for drift in switches.values() if drift.observed is not None]
+    for drift in sorted(switches.values(), key=lambda drift: drift.planned):
+        result = f"{drift.drift_seconds:+.2f}s" if drift.observed else "not observed"
+        print(f"  {scte35_builder.format_schedule_time(drift.planned):<26} {drift.action_name:<50} {result}")
+    if observed:
+        drifts = sorted(drift.drift_seconds for drift in observed)
+        print_info(f"{len(observed)} of {len(switches)} switches observed, drift min {drifts[0]:+.2f}s, "
+                   f"median {drifts[len(drifts) // 2]:+.2f}s, max {drifts[-1]:+.2f}s")
+    if len(observed) < len(switches):
+        print_warning(f"{len(switches) - len(observed)} switches were not observed. Switches closer together "
+                      "than the poll interval can be superseded before they are seen.")
+    return True
+
+def run_audit_report(client, audit_log, args):
+    """Display scheduling lead-time margins and observed executions recorded in the audit log"""
+    if args.observe:
+        channel_ids = args.channel_ids or sorted({record.get('channel_id') for record in audit_log.read()
+                                                  if record.get('channel_id')})
+        for channel_id in channel_ids:
+            try:
+                actions = schedule_gc.describe_full_schedule(client, channel_id)
+            except (BotoCoreError, ClientError) as e:
+                print_warning(f"Unable to read the schedule of channel {channel_id}: {str(e)}")
+                continue
+            count = schedule_audit.observe_schedule_executions(audit_log, channel_id, actions)
+            print_info(f"Recorded {count} inferred executions from the schedule of channel {channel_id}")
+
+    report = schedule_audit.build_lead_time_report(audit_log.read(), late_threshold_seconds=args.late_threshold,
+                                                   channel_ids=args.channel_ids or None)
+    print_header(f"Scheduling Lead Time Report ({audit_log.path})")
+    print_info(f"{report.submitted} actions submitted, {len(report.failed)} failed submissions")
+
+    for action_type, stats in sorted(report.lead_statistics().items()):
+        print(f"  {action_type:<28} count {stats['count']:>5}  min {stats['min']:>9.1f}s  "
+              f"p5 {stats['p5']:>9.1f}s  median {stats['median']:>9.1f}s")
+
+    if report.late:
+        print_warning(f"{len(report.late)} actions were accepted less than {args.late_threshold:g}s "
+                      "before their start time:")
+        for late in report.late:
+            print(f"  {late.channel_id}  {late.action_name:<40} {late.action_type:<24} "
+                  f"{late.intended_time}  lead {late.lead_seconds:+.1f}s")
+    else:
+        print_success(f"All fixed mode actions were accepted at least {args.late_threshold:g}s ahead")
+
+    for failure in report.failed:
+        print_error(f"{failure.get('channel_id')}  {failure.get('action_name')}: {failure.get('error')}")
+
+    if report.execution_delays:
+        delays = sorted(report.execution_delays.values())
+        print_info(f"{len(delays)} executions observed, delay from intended time "
+                   f"min {delays[0]:+.2f}s, max {delays[-1]:+.2f}s")
+    if report.inferred:
+        print_info(f"{report.inferred} executions inferred from the schedule, not included in the delays")
+    if report.unobserved:
+        print_info(f"{report.unobserved} fixed mode actions have no observed execution")
+
+def run_slideshow(client, args):
+    """Compile a slideshow file into static image activations and schedule them in one batched update"""
+    channel_id = args.channel_id or select_channel_id(client, args)
+
+    feature_activations = get_channel_feature_activations(client, channel_id)
+    if feature_activations['OutputStaticImageOverlayScheduleActions'] != 'ENABLED':
+        print_error("Static Image Overlay feature is "
+                    f"{feature_activations['OutputStaticImageOverlayScheduleActions']} for this channel.")
+        print_warning("This feature must be enabled when creating the channel.")
+        return False
+
+    try:
+        slideshow = static_image_overlay.load_slideshow(args.slides)
+        schedule = schedule_gc.describe_full_schedule(client, channel_id)
+        allocator = static_image_overlay.LayerAllocator.from_schedule(schedule)
+        start_time = datetime.now(timezone.utc) + timedelta(seconds=args.start_in)
+        schedule_actions = static_image_overlay.compile_slideshow(
+            slideshow['slides'], start_time, allocator,
+            action_prefix=f"Slideshow_{int(start_time.timestamp())}", repeat=args.repeat,
+            layer=args.layer if args.layer is not None else slideshow['layer'])
+    except static_image_overlay.OverlayError as e:
+        print_error(str(e))
+        return False
+
+    print_header("Slideshow")
+    print(f"{'Start Time':<26} {'Layer':<6} {'Duration (ms)':<14} {'Image':<40}")
+    print("-" * 88)
+    for action in schedule_actions:
+        settings = action['ScheduleActionSettings']['StaticImageActivateSettings']
+        print(f"{action['ScheduleActionStartSettings']['FixedModeScheduleActionStartSettings']['Time']:<26} "
+              f"{settings['Layer']:<6} {settings['Duration']:<14} {settings['Image']['Uri']:<40}")
+
+    if args.dry_run:
+        print_info(f"Dry run: {len(schedule_actions)} actions would be scheduled")
+        return True
+
+    for creates in scte35_builder.chunk_schedule_actions(schedule_actions):
+        try:
+            client.batch_update_schedule(ChannelId=channel_id, Creates=creates)
+        except Exception as e:
+            print_error(f"Failed to schedule slideshow: {str(e)}")
+            return False
+    print_success(f"Scheduled {len(schedule_actions)} static image overlay actions")
+    return True
+
+def run_prepare_planner(client, args):
+    """Plan and schedule input prepare actions for a rundown or the upcoming switches in the schedule"""
+    channel_id = args.channel_id or select_channel_id(client, args)
+
+    feature_activations = get_channel_feature_activations(client, channel_id)
+    if feature_activations['InputPrepareScheduleActions'] != 'ENABLED':
+        print_error(f"Input Prepare feature is {feature_activations['InputPrepareScheduleActions']} for this channel.")
+        print_warning("This feature must be enabled when creating the channel.")
+        return False
+
+    schedule = schedule_gc.describe_full_schedule(client, channel_id)
+    existing_action_names = [action['ActionName'] for action in schedule]
+    if args.rundown:
+        try:
+            switches = input_prepare_planner.load_rundown(args.rundown)
+        except input_prepare_planner.RundownError as e:
+            print_error(str(e))
+            return False
+    else:
+        switches = input_prepare_planner.get_scheduled_switches(schedule)
+    if not switches:
+        print_warning("No upcoming input switches to prepare.")
+        return True
+
+    active_input = next((i.get('InputAttachmentName') for i in list_channel_inputs(client, channel_id)
+                         if i.get('IsActive')), None)
+    plan = input_prepare_planner.plan_input_prepares(
+        switches, active_input=active_input, lead_seconds=args.lead_time,
+        scheduled_prepares=input_prepare_planner.get_scheduled_prepares(schedule))
+
+    print_header("Input Prepare Plan")
+    print(f"{'Prepare Time':<26} {'Switch Time':<26} {'Lead (s)':<10} {'Input':<30}")
+    print("-" * 92)
+    for planned in plan:
+        print(f"{scte35_builder.format_schedule_time(planned.time):<26} "
+              f"{scte35_builder.format_schedule_time(planned.switch.time):<26} "
+              f"{planned.lead_seconds:<10.1f} {planned.input_name:<30}")
+        if planned.warning:
+            print_warning(f"{planned.switch.action_name}: {planned.warning}")
+
+    schedule_actions = input_prepare_planner.to_schedule_actions(
+        plan, switches if args.rundown else None, existing_action_names)
+    if args.dry_run or not schedule_actions:
+        print_info(f"{len(schedule_actions)} actions would be scheduled")
+        return True
+
+    for creates in scte35_builder.chunk_schedule_actions(schedule_actions):
+        try:
+            client.batch_update_schedule(ChannelId=channel_id, Creates=creates)
+        except Exception as e:
+            print_error(f"Failed to schedule input prepare actions: {str(e)}")
+            return False
+    print_success(f"Scheduled {len(schedule_actions)} actions")
+    return True
+
+def display_prune_result(result, dry_run):
+    """Display the outcome of a schedule garbage collection pass"""
+    print_header(f"Schedule Garbage Collection for {result.channel_id}")
+    print_info(f"Schedule contains {result.total_actions} actions")
+    for reason, count in sorted(result.kept_by_reason().items()):
+        print_info(f"Keeping {count} actions: {reason}")
+
+    if dry_run:
+        print_info(f"Dry run: {len(result.deletable)} actions would be deleted")
+        for name in result.deletable:
+            print(f"  {name}")
+        return
+
+    if result.deleted:
+        print_success(f"Deleted {len(result.deleted)} expired actions")
+    elif not result.deletable:
+        print_info("No expired actions to delete")
+    for failure in result.failed_batches:
+        print_error(f"Failed to delete actions. {failure}")
+
+def run_prune(client, args):
+    """Run the prune command once, or repeatedly when an interval is given"""
+    channel_ids = args.channel_ids or [select_channel_id(client, args)]
+    while True:
+        for channel_id in channel_ids:
+            try:
+                result = schedule_gc.prune_schedule(client, channel_id, dry_run=args.dry_run,
+                                                    min_age_seconds=args.min_age, batch_size=args.batch_size)
+                display_prune_result(result, args.dry_run)
+            except Exception as e:
+                print_error(f"Failed to prune schedule for channel {channel_id}: {str(e)}")
+        if not args.interval:
+            return
+        print_info(f"Next prune in {args.interval} seconds")
+        time.sleep(args.interval)
+
+def select_channel_from_account(client, args):
+    """Discover channels lazily using the command line filters and prompt the user to select one"""
+    print_info("Retrieving available MediaLive channels...")
+    channels = iter_medialive_channels(client, **get_channel_filters(args))
+
+    selected_channel = select_channel(channels)
+    if not selected_channel:
+        print_error("No MediaLive channels found. Exiting.")
+        sys.exit(1)
+
+    return selected_channel
+
+def select_channel_id(client, args):
+    """Prompt the user to select a channel and return its ID, exiting if none are available"""
+    return select_channel_from_account(client, args).get('Id')
+
 def main():
     """Main function to run the script"""
+    args = parse_args()
+
     # Set up signal handler for Ctrl+C
     signal.signal(signal.SIGINT, signal_handler)
     
     print_header("MediaLive Scheduled Actions Tool")
     
-    # Get AWS region
-    region = get_aws_region()
-    
     try:
         # Initialize AWS client
-        print_info(f"Initializing AWS MediaLive client in region {region}")
-        client = boto3.client("medialive", region_name=region)
-        
-        # List available channels
-        print_info("Retrieving available MediaLive channels...")
-        channels = list_medialive_channels(client)
-        
-        if not display_channels(channels):
-            print_error("No MediaLive channels found. Exiting.")
-            sys.exit(1)
+        if args.fake:
+            print_warning(f"Using a fake MediaLive service with {args.fake_channels} sample channels")
+            client = fake_medialive.create_fake_client(args.fake_channels)
+        else:
+            region = get_aws_region(args.region)
+            print_info(f"Initializing AWS MediaLive client in region {region}")
+            client = boto3.client("medialive", region_name=region)
+
+        # Actions scheduled on the fake service must not end up in the audit log of real events
+        audit_log_path = args.audit_log or schedule_audit.DEFAULT_AUDIT_LOG_PATH
+        audit_log = None
+        if not args.no_audit_log and not (args.fake and args.audit_log is None):
+            audit_log = schedule_audit.AuditLog(audit_log_path)
+            client = schedule_audit.AuditedClient(client, audit_log)
+
+        if args.command == 'audit-report':
+            run_audit_report(client, audit_log or schedule_audit.AuditLog(audit_log_path), args)
+            return
+        if args.command == 'export':
+            if not run_export(client, args):
+                sys.exit(1)
+            return
+        if args.command == 'rehearse':
+            if not run_rehearsal(client, args, audit_log=audit_log):
+                sys.exit(1)
+            return
+        if args.command == 'console':
+            channel_ids = args.channel_ids or [select_channel_id(client, args)]
+            live_console.run_console(client, channel_ids, poll_interval=args.poll_interval,
+                                     schedule_interval=args.schedule_interval, audit_log=audit_log)
+            return
+        if args.command == 'prune':
+            run_prune(client, args)
+            return
+        if args.command == 'slideshow':
+            if not run_slideshow(client, args):
+                sys.exit(1)
+            return
+        if args.command == 'prepare':
+            if not run_prepare_planner(client, args):
+                sys.exit(1)
+            return
         
         # Select a channel
-        selected_channel = select_channel(channels)
-        if not selected_channel:
-            print_error("No channel selected. Exiting.")
-            sys.exit(1)
+        selected_channel = select_channel_from_account(client, args)
         
         channel_id = selected_channel.get('Id')
         channel_name = selected_channel.get('Name')
@@ -0,0 +1,266 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+"""
+Static image overlay layer allocation and slideshows.
+
+Layer occupancy is recovered from the channel schedule rather than remembered by the tool, so a
+layer allocated by another operator or a previous run of the tool is not reused by mistake.
+A slideshow compiles a sequence of images with durations, fades and positions into activation
+actions that are sent in a single batched schedule update. Each activation carries its own
+Duration so no separate deactivation actions are needed.
+
+A slideshow file is a JSON document with a list of slides and optional defaults:
+
+    {
+        "layer": 2,
+        "slides": [
+            {"uri": "s3://bucket/sponsor-a.png", "duration": 20000, "x": 1600, "y": 40},
+            {"uri": "s3://bucket/sponsor-b.png", "duration": 20000, "x": 1600, "y": 40, "fadeIn": 500}
+        ]
+    }
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import scte35_builder
+from live_console import get_action_start_time
+
+MAX_LAYER = 7
+DEFAULT_FADE_IN_MS = 2000
+DEFAULT_FADE_OUT_MS = 2000
+
+
+class OverlayError(ValueError):
+    """Raised when a slideshow is invalid or no overlay layer is available"""
+    pass
+
+
+# End of an immediate activation that was replaced or deactivated by a later immediate action. Both
+# happened at an unknown time in the past.
+ENDED_IN_THE_PAST = datetime.min.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class OverlayInterval:
+    """
+    Time a layer is occupied by an activation. A start of None means the activation was immediate
+    and has already happened, an end of None means it is displayed until deactivated and an end of
+    ENDED_IN_THE_PAST means it was already replaced or deactivated.
+    """
+    action_name: str
+    layer: int
+    start: Optional[datetime]
+    end: Optional[datetime]
+
+    def overlaps(self, start: datetime, end: Optional[datetime]) -> bool:
+        starts_before_end = self.start is None or end is None or self.start < end
+        ends_after_start = self.end is None or self.end > start
+        return starts_before_end and ends_after_start
+
+
+@dataclass
+class Slide:
+    """A single image in a slideshow"""
+    uri: str
+    duration_ms: int
+    x: int = 0
+    y: int = 0
+    opacity: int = 100
+    fade_in_ms: int = DEFAULT_FADE_IN_MS
+    fade_out_ms: int = DEFAULT_FADE_OUT_MS
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+    def validate(self) -> None:
+        if not self.uri.startswith("s3://"):
+            raise OverlayError(f"Invalid S3 URL '{self.uri}'. URL must start with 's3://'")
+        if self.duration_ms <= 0:
+            raise OverlayError(f"Slide '{self.uri}' must have a positive duration")
+        if not 0 <= self.opacity <= 100:
+            raise OverlayError(f"Slide '{self.uri}' opacity must be between 0 and 100")
+
+    @classmethod
+    def from_dict(cls, entry: Dict[str, Any]) -> 'Slide':
+        return cls(uri=entry['uri'], duration_ms=int(entry['duration']), x=entry.get('x', 0),
+                   y=entry.get('y', 0), opacity=entry.get('opacity', 100),
+                   fade_in_ms=entry.get('fadeIn', DEFAULT_FADE_IN_MS),
+                   fade_out_ms=entry.get('fadeOut', DEFAULT_FADE_OUT_MS),
+                   width=entry.get('width'), height=entry.get('height'))
+
+
+def get_overlay_intervals(schedule_actions: List[Dict[str, Any]]) -> List[OverlayInterval]:
+    """
+    Derive layer occupancy from the static image actions in a schedule. An activation ends when its
+    Duration elapses, or at the first later deactivation or activation (which replaces the image) on
+    its layer.
+
+    Immediate actions have no start time, so they are ordered by their position in the schedule. An
+    immediate activation ends at the first change of its layer that follows it in the schedule.
+    """
+    # Position in the schedule and start time (None for immediate actions) of every change of each layer
+    layer_changes: Dict[int, List[Tuple[int, Optional[datetime]]]] = {}
+    for position, action in enumerate(schedule_actions):
+        action_settings = action.get('ScheduleActionSettings', {})
+        settings = (action_settings.get('StaticImageDeactivateSettings')
+                    or action_settings.get('StaticImageActivateSettings'))
+        if settings is not None:
+            layer_changes.setdefault(settings.get('Layer', 0), []).append(
+                (position, get_action_start_time(action)))
+
+    intervals = []
+    for position, action in enumerate(schedule_actions):
+        settings = action.get('ScheduleActionSettings', {}).get('StaticImageActivateSettings')
+        if settings is None:
+            continue
+        layer = settings.get('Layer', 0)
+        start_time = get_action_start_time(action)
+        changes = layer_changes.get(layer, [])
+        if start_time is not None:
+            candidates = [changed for _, changed in changes if changed is not None and changed > start_time]
+            if settings.get('Duration'):
+                candidates.append(start_time + timedelta(milliseconds=settings['Duration']))
+        else:
+            candidates = [changed if changed is not None else ENDED_IN_THE_PAST
+                          for changed_position, changed in changes if changed_position > position]
+        end_time = min(candidates) if candidates else None
+        intervals.append(OverlayInterval(action['ActionName'], layer, start_time, end_time))
+    return intervals
+
+
+def get_possibly_active_activations(schedule_actions: List[Dict[str, Any]], now: datetime) -> List[str]:
+    """Return the names of activations that may still be displayed at 'now'"""
+    return [interval.action_name for interval in get_overlay_intervals(schedule_actions)
+            if interval.end is None or interval.end > now]
+
+
+class LayerAllocator:
+    """Allocates overlay layers (0-7) that are free for a given time window"""
+
+    def __init__(self, intervals: Optional[List[OverlayInterval]] = None):
+        self.intervals = list(intervals or [])
+
+    @classmethod
+    def from_schedule(cls, schedule_actions: List[Dict[str, Any]]) -> 'LayerAllocator':
+        return cls(get_overlay_intervals(schedule_actions))
+
+    def is_free(self, layer: int, start: datetime, end: Optional[datetime]) -> bool:
+        return not any(interval.layer == layer and interval.overlaps(start, end) for interval in self.intervals)
+
+    def occupied_layers(self, at: datetime) -> List[int]:
+        """Layers with an activation that may be displayed at the given time"""
+        return sorted({interval.layer for interval in self.intervals if interval.overlaps(at, at)})
+
+    def latest_activation(self, at: datetime) -> Optional[OverlayInterval]:
+        """Most recently started activation that may be displayed at the given time"""
+        active = [interval for interval in self.intervals if interval.overlaps(at, at)]
+        if not active:
+            return None
+        oldest = datetime.min.replace(tzinfo=timezone.utc)
+        return max(active, key=lambda interval: interval.start or oldest)
+
+    def first_free_layer(self, start: datetime, end: Optional[datetime]) -> Optional[int]:
+        """Lowest layer free for the window [start, end), or None when all layers are occupied"""
+        return next((layer for layer in range(MAX_LAYER + 1) if self.is_free(layer, start, end)), None)
+
+    def allocate(self, action_name: str, start: datetime, end: Optional[datetime],
+                 layer: Optional[int] = None) -> int:
+        """
+        Reserve a layer for the window [start, end). When no layer is requested the lowest free
+        layer is used.
+
+        Raises:
+            OverlayError: If the requested layer, or every layer, is occupied for the window
+        """
+        if layer is None:
+            layer = self.first_free_layer(start, end)
+            if layer is None:
+                raise OverlayError("All overlay layers are occupied for the requested time")
+        elif not self.is_free(layer, start, end):
+            raise OverlayError(f"Overlay layer {layer} is occupied for the requested time")
+        self.intervals.append(OverlayInterval(action_name, layer, start, end))
+        return layer
+
+
+def load_slideshow(path: str) -> Dict[str, Any]:
+    """Load a slideshow file and return its 'slides' and optional 'layer'"""
+    try:
+        with open(path, 'r') as f:
+            document = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise OverlayError(f"Unable to read slideshow '{path}': {str(e)}") from e
+
+    try:
+        slides = [Slide.from_dict(entry) for entry in document.get('slides', [])]
+    except (KeyError, TypeError, ValueError) as e:
+        raise OverlayError(f"Invalid slide in '{path}': {str(e)}") from e
+    if not slides:
+        raise OverlayError(f"Slideshow '{path}' has no slides")
+    return {'slides': slides, 'layer': document.get('layer')}
+
+
+def compile_slideshow(slides: List[Slide], start_time: datetime, allocator: LayerAllocator,
+                      action_prefix: str = "Slideshow", repeat: int = 1,
+                      layer: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Compile slides into StaticImageActivate ScheduleActions played back to back from start_time.
+
+    Each slide is displayed for its duration. When a layer is requested every slide replaces the
+    previous one on that layer. Otherwise the layer of a slide is allocated for its duration plus its
+    fade out so consecutive slides cross fade on alternating layers.
+
+    Raises:
+        OverlayError: If a slide is invalid or no layer is free for a slide
+    """
+    for slide in slides:
+        slide.validate()
+
+    schedule_actions = []
+    slide_start = start_time
+    for iteration in range(repeat):
+        for index, slide in enumerate(slides):
+            action_name = f"{action_prefix}_{iteration}_{index}"
+            display_ms = slide.duration_ms if layer is not None else slide.duration_ms + slide.fade_out_ms
+            slide_end = slide_start + timedelta(milliseconds=display_ms)
+            slide_layer = allocator.allocate(action_name, slide_start, slide_end, layer=layer)
+
+            settings = {
+                "Layer": slide_layer,
+                "ImageX": slide.x,
+                "ImageY": slide.y,
+                "Opacity": slide.opacity,
+                "FadeIn": slide.fade_in_ms,
+                "FadeOut": slide.fade_out_ms,
+                "Duration": slide.duration_ms,
+                "Image": {
+                    "PasswordParam": "",
+                    "Uri": slide.uri,
+                    "Username": ""
+                }
+            }
+            if slide.width is not None:
+                settings["Width"] = slide.width
+            if slide.height is not None:
+                settings["Height"] = slide.height
+
+            schedule_actions.append({
+                "ActionName": action_name,
+                "ScheduleActionStartSettings": scte35_builder.fixed_start(slide_start),
+                "ScheduleActionSettings": {"StaticImageActivateSettings": settings}
+            })
+            slide_start += timedelta(milliseconds=slide.duration_ms)
+
+    return schedule_actions
@@ -0,0 +1,110 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import fake_medialive  # noqa: E402
+import input_prepare_planner  # noqa: E402
+import schedule_gc  # noqa: E402
+import scte35_builder  # noqa: E402
+from input_prepare_planner import RundownSwitch  # noqa: E402
+
+
+def input_switch(name, input_name, start):
+    return {
+        'ActionName': name,
+        'ScheduleActionStartSettings': start,
+        'ScheduleActionSettings': {'InputSwitchSettings': {'InputAttachmentNameReference': input_name}},
+    }
+
+
+class FakeMediaLiveClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = fake_medialive.FakeMediaLiveClient(requests_per_second=None)
+        self.channel_id = self.client.add_channel('Test')
+
+    def schedule(self, *actions):
+        return self.client.batch_update_schedule(ChannelId=self.channel_id,
+                                                 Creates={'ScheduleActions': list(actions)})
+
+    def test_invalid_actions_are_rejected_as_a_batch(self):
+        in_the_past = scte35_builder.fixed_start(datetime.now(timezone.utc) - timedelta(minutes=1))
+        invalid_batches = [
+            [input_switch('Unknown', 'missing', scte35_builder.immediate_start())],
+            [input_switch('Past', 'backup', in_the_past)],
+            [input_switch('Follower', 'backup', scte35_builder.follow_start('Missing'))],
+            [input_switch('Twice', 'backup', scte35_builder.immediate_start()),
+             input_switch('Twice', 'slate', scte35_builder.immediate_start())],
+        ]
+        for actions in invalid_batches:
+            with self.subTest(action_name=actions[0]['ActionName']), self.assertRaises(ClientError) as raised:
+                self.schedule(*actions)
+            self.assertEqual(raised.exception.response['Error']['Code'], 'UnprocessableEntityException')
+        self.assertEqual(schedule_gc.describe_full_schedule(self.client, self.channel_id), [])
+
+    def test_operations_are_throttled(self):
+        client = fake_medialive.FakeMediaLiveClient(requests_per_second=0.001, burst=2)
+        client.list_channels()
+        client.list_channels()
+        with self.assertRaises(ClientError) as raised:
+            client.list_channels()
+        self.assertEqual(raised.exception.response['Error']['Code'], 'TooManyRequestsException')
+        self.assertEqual(client.throttled_counts, {'ListChannels': 1})
+
+    def test_schedule_is_paginated(self):
+        actions = scte35_builder.compile_splice_plan(
+            [scte35_builder.provider_ad(f'Break{index}', index, 30) for index in range(250)])
+        for batch in scte35_builder.chunk_schedule_actions(actions):
+            self.client.batch_update_schedule(ChannelId=self.channel_id, Creates=batch)
+        schedule = schedule_gc.describe_full_schedule(self.client, self.channel_id)
+        self.assertEqual([action['ActionName'] for action in schedule], [f'Break{index}' for index in range(250)])
+        self.assertGreater(self.client.call_counts['DescribeSchedule'], 1)
+
+    def test_prune_keeps_active_switch_and_future_actions(self):
+        future = scte35_builder.fixed_start(datetime.now(timezone.utc) + timedelta(hours=1))
+        self.schedule(input_switch('ToBackup', 'backup', scte35_builder.immediate_start()),
+                      scte35_builder.provider_ad('Break', 1, 30).to_schedule_action())
+        self.schedule(input_switch('ToSlate', 'slate', scte35_builder.immediate_start()),
+                      input_switch('BackToPrimary', 'primary', future))
+
+        result = schedule_gc.prune_schedule(self.client, self.channel_id, dry_run=False, min_age_seconds=0)
+        self.assertEqual(sorted(result.deleted), ['Break', 'ToBackup'])
+        self.assertEqual(result.kept, {'ToSlate': 'active input switch', 'BackToPrimary': 'not yet expired'})
+        self.assertEqual([action['ActionName'] for action in schedule_gc.describe_full_schedule(
+            self.client, self.channel_id)], ['ToSlate', 'BackToPrimary'])
+
+    def test_planned_prepares_are_accepted_and_not_planned_twice(self):
+        now = datetime.now(timezone.utc)
+        switches = [RundownSwitch('S1', 'backup', now + timedelta(minutes=5)),
+                    RundownSwitch('S2', 'primary', now + timedelta(minutes=10))]
+        plan = input_prepare_planner.plan_input_prepares(switches, active_input='primary', now=now)
+        self.schedule(*input_prepare_planner.to_schedule_actions(plan, switches))
+
+        schedule = schedule_gc.describe_full_schedule(self.client, self.channel_id)
+        self.assertEqual(len(schedule), 4)
+        replan = input_prepare_planner.plan_input_prepares(
+            switches, active_input='primary', now=now,
+            scheduled_prepares=input_prepare_planner.get_scheduled_prepares(schedule))
+        self.assertEqual(replan, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
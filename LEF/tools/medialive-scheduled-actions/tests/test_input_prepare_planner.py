@@ -0,0 +1,90 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import input_prepare_planner  # noqa: E402
+from input_prepare_planner import RundownSwitch  # noqa: E402
+
+NOW = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def switch(name, input_name, minutes):
+    return RundownSwitch(name, input_name, NOW + timedelta(minutes=minutes))
+
+
+class PlanInputPreparesTest(unittest.TestCase):
+
+    def test_prepare_is_scheduled_lead_time_before_switch(self):
+        plan = input_prepare_planner.plan_input_prepares([switch('S1', 'backup', 5)], active_input='main',
+                                                         lead_seconds=30, now=NOW)
+        self.assertEqual([planned.action_name for planned in plan], ['S1_Prepare'])
+        self.assertEqual(plan[0].lead_seconds, 30)
+
+    def test_switch_to_active_input_is_not_prepared(self):
+        plan = input_prepare_planner.plan_input_prepares([switch('S1', 'main', 5)], active_input='main', now=NOW)
+        self.assertEqual(plan, [])
+
+    def test_prepare_waits_for_previous_switch(self):
+        plan = input_prepare_planner.plan_input_prepares(
+            [switch('S1', 'backup', 5), switch('S2', 'main', 5.25)], active_input='main', lead_seconds=30, now=NOW)
+        self.assertEqual(plan[1].time, NOW + timedelta(minutes=5, seconds=1))
+        self.assertEqual(plan[1].lead_seconds, 14)
+
+    def test_switches_already_prepared_in_schedule_are_skipped(self):
+        switches = [switch('S1', 'backup', 5), switch('S2', 'main', 10)]
+        plan = input_prepare_planner.plan_input_prepares(switches, active_input='main', now=NOW)
+        schedule = input_prepare_planner.to_schedule_actions(plan)
+        scheduled_prepares = input_prepare_planner.get_scheduled_prepares(schedule)
+
+        replan = input_prepare_planner.plan_input_prepares(switches + [switch('S3', 'backup', 15)],
+                                                           active_input='main', now=NOW,
+                                                           scheduled_prepares=scheduled_prepares)
+        self.assertEqual([planned.action_name for planned in replan], ['S3_Prepare'])
+
+    def test_prepare_before_previous_switch_does_not_count(self):
+        scheduled_prepares = [(NOW + timedelta(minutes=1), 'main')]
+        plan = input_prepare_planner.plan_input_prepares(
+            [switch('S1', 'backup', 5), switch('S2', 'main', 10)], active_input='main', now=NOW,
+            scheduled_prepares=scheduled_prepares)
+        self.assertEqual([planned.action_name for planned in plan], ['S1_Prepare', 'S2_Prepare'])
+
+
+class LoadRundownTest(unittest.TestCase):
+
+    def load(self, entries):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump(entries, f)
+        self.addCleanup(os.remove, f.name)
+        return input_prepare_planner.load_rundown(f.name, now=NOW)
+
+    def test_switches_are_ordered_by_time(self):
+        switches = self.load([{'input': 'b', 'offset': 120}, {'input': 'a', 'offset': 60, 'name': 'First'}])
+        self.assertEqual([s.action_name for s in switches][0], 'First')
+
+    def test_malformed_entries_raise_rundown_error(self):
+        for entries in ({'input': 'a'}, [{'offset': 1}], [{'input': 'a'}], [{'input': 'a', 'time': 'soon'}],
+                        [{'input': 'a', 'offset': 'later'}], ['a']):
+            with self.subTest(entries=entries), self.assertRaises(input_prepare_planner.RundownError):
+                self.load(entries)
+
+
+if __name__ == '__main__':
+    unittest.main()
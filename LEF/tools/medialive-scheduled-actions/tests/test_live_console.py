@@ -0,0 +1,80 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import live_console  # noqa: E402
+
+
+def throttled():
+    return ClientError({'Error': {'Code': 'TooManyRequestsException', 'Message': 'Too many requests'}},
+                       'DescribeChannel')
+
+
+class FakeClient:
+    """Answers describe_channel with the given outcomes in turn"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+
+    def describe_channel(self, ChannelId):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class PollChannelTest(unittest.TestCase):
+
+    def poll(self, outcomes):
+        """Run the channel poll loop until the outcomes are used up and return the delays it slept"""
+        console = live_console.LiveOperationsConsole(FakeClient(outcomes), [])
+        delays = []
+
+        async def sleep(delay):
+            delays.append(delay)
+            if len(delays) == len(outcomes):
+                raise asyncio.CancelledError()
+
+        watcher = live_console.ChannelWatcher('1234567')
+        with mock.patch.object(live_console.asyncio, 'sleep', sleep), \
+                mock.patch.object(live_console, 'print_warning'):
+            with self.assertRaises(asyncio.CancelledError):
+                asyncio.run(console._poll_channel(watcher))
+        return delays, watcher
+
+    def test_default_interval(self):
+        delays, watcher = self.poll([{'State': 'RUNNING'}, {'State': 'RUNNING'}])
+        self.assertEqual(delays, [live_console.DEFAULT_POLL_INTERVAL] * 2)
+        self.assertEqual(watcher.state, 'RUNNING')
+
+    def test_backs_off_while_throttled(self):
+        delays, _ = self.poll([throttled()] * 6 + [{'State': 'RUNNING'}])
+        self.assertEqual(delays, [4.0, 8.0, 16.0, 30.0, 30.0, 30.0, live_console.DEFAULT_POLL_INTERVAL])
+
+    def test_other_errors_wait_for_schedule_interval(self):
+        error = ClientError({'Error': {'Code': 'NotFoundException', 'Message': 'not found'}}, 'DescribeChannel')
+        delays, _ = self.poll([error])
+        self.assertEqual(delays, [live_console.DEFAULT_SCHEDULE_INTERVAL])
+
+
+if __name__ == '__main__':
+    unittest.main()
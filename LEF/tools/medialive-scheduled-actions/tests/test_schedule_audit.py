@@ -0,0 +1,82 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import schedule_audit  # noqa: E402
+import scte35_builder  # noqa: E402
+
+NOW = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def fixed_action(name, start):
+    return {
+        'ActionName': name,
+        'ScheduleActionStartSettings': {
+            'FixedModeScheduleActionStartSettings': {'Time': scte35_builder.format_schedule_time(start)}
+        },
+        'ScheduleActionSettings': {'InputSwitchSettings': {'InputAttachmentNameReference': 'main'}},
+    }
+
+
+def submission(name, intended):
+    return {'event': 'submit', 'operation': 'create', 'status': 'ok', 'channel_id': '1234',
+            'action_name': name, 'action_type': 'InputSwitch', 'lead_seconds': 60.0,
+            'intended_time': scte35_builder.format_schedule_time(intended)}
+
+
+class ObserveScheduleExecutionsTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.audit_log = schedule_audit.AuditLog(os.path.join(directory.name, 'audit.jsonl'))
+
+    def test_past_actions_are_recorded_once_as_inferred(self):
+        actions = [fixed_action('Past', NOW - timedelta(minutes=5)), fixed_action('Future', NOW + timedelta(minutes=5))]
+        self.assertEqual(schedule_audit.observe_schedule_executions(self.audit_log, '1234', actions, now=NOW), 1)
+        self.assertEqual(schedule_audit.observe_schedule_executions(self.audit_log, '1234', actions, now=NOW), 0)
+
+        [record] = list(self.audit_log.read())
+        self.assertTrue(record['inferred'])
+        self.assertEqual(record['observed_at'], scte35_builder.format_schedule_time(NOW))
+
+    def test_inferred_executions_are_left_out_of_delays(self):
+        start = NOW - timedelta(minutes=5)
+        self.audit_log.append([submission('Past', start)])
+        schedule_audit.observe_schedule_executions(self.audit_log, '1234', [fixed_action('Past', start)], now=NOW)
+
+        report = schedule_audit.build_lead_time_report(self.audit_log.read())
+        self.assertEqual(report.execution_delays, {})
+        self.assertEqual(report.inferred, 1)
+        self.assertEqual(report.unobserved, 0)
+
+    def test_pipeline_execution_replaces_inferred_one(self):
+        start = NOW - timedelta(minutes=5)
+        self.audit_log.append([submission('Past', start)])
+        schedule_audit.observe_schedule_executions(self.audit_log, '1234', [fixed_action('Past', start)], now=NOW)
+        self.audit_log.record_execution('1234', 'Past', start + timedelta(seconds=2), 'pipeline', pipeline_id='0')
+
+        report = schedule_audit.build_lead_time_report(self.audit_log.read())
+        self.assertEqual(report.execution_delays, {'1234/Past': 2.0})
+        self.assertEqual(report.inferred, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import schedule_gc  # noqa: E402
+import scte35_builder  # noqa: E402
+from test_static_image_overlay import activate, deactivate  # noqa: E402
+
+NOW = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def time_signal(name, event_id, start=None):
+    start = scte35_builder.fixed_start(start) if start else None
+    return scte35_builder.provider_ad(name, event_id, 30, start=start).to_schedule_action()
+
+
+def follow(name, reference):
+    action = time_signal(name, 1)
+    action['ScheduleActionStartSettings'] = scte35_builder.follow_start(reference)
+    return action
+
+
+class SelectExpiredActionsTest(unittest.TestCase):
+
+    def select(self, actions, channel_detail=None):
+        return schedule_gc.select_expired_actions('1234', actions, channel_detail or {}, now=NOW)
+
+    def test_old_fixed_and_immediate_actions_are_deletable(self):
+        result = self.select([time_signal('Old', 1, NOW - timedelta(hours=1)), time_signal('Now', 2)])
+        self.assertEqual(result.deletable, ['Old', 'Now'])
+
+    def test_recent_and_future_actions_are_kept(self):
+        result = self.select([time_signal('Recent', 1, NOW - timedelta(seconds=10)),
+                              time_signal('Future', 2, NOW + timedelta(hours=1))])
+        self.assertEqual(result.deletable, [])
+        self.assertEqual(result.kept, {'Recent': 'not yet expired', 'Future': 'not yet expired'})
+
+    def test_follow_mode_chain_is_kept(self):
+        result = self.select([time_signal('Anchor', 1, NOW - timedelta(hours=2)), follow('Follower', 'Anchor')])
+        self.assertEqual(result.deletable, [])
+        self.assertEqual(result.kept['Anchor'], 'follow-mode anchor')
+
+    def test_active_input_switch_is_kept(self):
+        detail = {'PipelineDetails': [{'ActiveInputSwitchActionName': 'Switch'}]}
+        result = self.select([time_signal('Switch', 1, NOW - timedelta(hours=1))], detail)
+        self.assertEqual(result.kept, {'Switch': 'active input switch'})
+
+    def test_displayed_immediate_overlay_is_kept(self):
+        result = self.select([activate('Logo', 0)])
+        self.assertEqual(result.kept, {'Logo': 'overlay may be active'})
+
+    def test_deactivated_immediate_overlay_is_deletable(self):
+        result = self.select([activate('Logo', 0), deactivate('LogoOff', 0)])
+        self.assertEqual(sorted(result.deletable), ['Logo', 'LogoOff'])
+
+    def test_change_ending_a_kept_immediate_overlay_is_kept(self):
+        detail = {'PipelineDetails': [{'ActiveMotionGraphicsActionName': 'Logo'}]}
+        result = self.select([activate('Logo', 0), deactivate('LogoOff', 0)], detail)
+        self.assertEqual(result.deletable, [])
+        self.assertEqual(result.kept['LogoOff'], 'ends a kept overlay')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import scte35_builder  # noqa: E402
+from scte35_builder import SpliceValidationError, Upid, UpidType  # noqa: E402
+
+NOW = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+UPID = Upid(UpidType.EIDR, '1478779185342C2390308610')
+
+
+def get_descriptor(action):
+    descriptor = action['ScheduleActionSettings']['Scte35TimeSignalSettings']['Scte35Descriptors'][0]
+    return descriptor['Scte35DescriptorSettings']['SegmentationDescriptorScte35DescriptorSettings']
+
+
+class CompileSplicePlanTest(unittest.TestCase):
+
+    def test_plan_is_converted_in_order(self):
+        actions = scte35_builder.compile_splice_plan([
+            scte35_builder.provider_ad('Break1', 10, 30.5),
+            *scte35_builder.blackout('Blackout', 20, UPID, NOW, 60),
+        ])
+        self.assertEqual([action['ActionName'] for action in actions],
+                         ['Break1', 'Blackout_NetworkEnd', 'Blackout_NetworkStart'])
+        self.assertEqual(get_descriptor(actions[0])['SegmentationDuration'], 30.5 * 90000)
+        self.assertEqual(get_descriptor(actions[2])['SegmentationEventId'], 21)
+        self.assertEqual(actions[2]['ScheduleActionStartSettings'],
+                         scte35_builder.fixed_start(NOW + timedelta(seconds=60)))
+
+    def test_duplicate_action_names_are_rejected(self):
+        with self.assertRaisesRegex(SpliceValidationError, "Duplicate action name 'Break'"):
+            scte35_builder.compile_splice_plan([scte35_builder.provider_ad('Break', 1, 30),
+                                                scte35_builder.provider_ad('Break', 2, 30)])
+        with self.assertRaisesRegex(SpliceValidationError, "Duplicate action name 'Break'"):
+            scte35_builder.compile_splice_plan([scte35_builder.provider_ad('Break', 1, 30)],
+                                               existing_action_names=['Break'])
+
+    def test_cancel_must_reference_a_signalled_event(self):
+        with self.assertRaisesRegex(SpliceValidationError, 'neither in the plan nor in the schedule'):
+            scte35_builder.compile_splice_plan([scte35_builder.cancel('Cancel', 7)])
+
+        actions = scte35_builder.compile_splice_plan([scte35_builder.provider_ad('Break', 7, 30),
+                                                      scte35_builder.cancel('Cancel', 7)])
+        self.assertEqual(get_descriptor(actions[1]),
+                         {'SegmentationEventId': 7, 'SegmentationCancelIndicator': 'SEGMENTATION_EVENT_CANCELED'})
+
+    def test_cancel_of_scheduled_event(self):
+        scheduled = scte35_builder.compile_splice_plan([scte35_builder.provider_ad('Break', 7, 30),
+                                                        scte35_builder.cancel('Cancel', 7)])
+        event_ids = scte35_builder.get_scheduled_event_ids(scheduled)
+        self.assertEqual(event_ids, {7})
+
+        actions = scte35_builder.compile_splice_plan([scte35_builder.cancel('CancelAgain', 7)],
+                                                     scheduled_event_ids=event_ids)
+        self.assertEqual(len(actions), 1)
+
+    def test_invalid_events_are_rejected(self):
+        invalid_events = [
+            scte35_builder.provider_ad('', 1, 30),
+            scte35_builder.provider_ad('TooLargeId', scte35_builder.MAX_SEGMENTATION_EVENT_ID + 1, 30),
+            scte35_builder.provider_ad('NegativeDuration', 1, -1),
+            scte35_builder.provider_ad('TooLong', 1, 2 ** 40 / 90000 + 1),
+            scte35_builder.chapter('Chapter', 1, 256, 300),
+            scte35_builder.provider_ad('OddUpid', 1, 30, upid=Upid(UpidType.URI, 'ABC')),
+        ]
+        for event in invalid_events:
+            with self.subTest(action_name=event.action_name), self.assertRaises(SpliceValidationError):
+                scte35_builder.compile_splice_plan([event])
+
+    def test_follow_point_is_validated(self):
+        with self.assertRaises(SpliceValidationError):
+            scte35_builder.follow_start('Switch', 'MIDDLE')
+
+
+class ChunkScheduleActionsTest(unittest.TestCase):
+
+    def test_actions_are_split_in_batches(self):
+        actions = scte35_builder.compile_splice_plan(
+            [scte35_builder.provider_ad(f'Break{index}', index, 30) for index in range(5)])
+        batches = scte35_builder.chunk_schedule_actions(actions, batch_size=2)
+        self.assertEqual([len(batch['ScheduleActions']) for batch in batches], [2, 2, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
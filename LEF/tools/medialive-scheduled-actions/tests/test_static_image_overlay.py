@@ -0,0 +1,78 @@
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import scte35_builder  # noqa: E402
+import static_image_overlay  # noqa: E402
+
+NOW = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def activate(name, layer, start=None, duration=None):
+    settings = {'Image': {'Uri': f's3://bucket/{name}.png'}, 'Layer': layer}
+    if duration is not None:
+        settings['Duration'] = duration
+    return {
+        'ActionName': name,
+        'ScheduleActionStartSettings': scte35_builder.fixed_start(start) if start else scte35_builder.immediate_start(),
+        'ScheduleActionSettings': {'StaticImageActivateSettings': settings},
+    }
+
+
+def deactivate(name, layer, start=None):
+    return {
+        'ActionName': name,
+        'ScheduleActionStartSettings': scte35_builder.fixed_start(start) if start else scte35_builder.immediate_start(),
+        'ScheduleActionSettings': {'StaticImageDeactivateSettings': {'Layer': layer}},
+    }
+
+
+class OverlayIntervalTest(unittest.TestCase):
+
+    def test_immediate_activation_is_active_until_deactivated(self):
+        allocator = static_image_overlay.LayerAllocator.from_schedule([activate('Logo', 0)])
+        self.assertEqual(allocator.occupied_layers(NOW + timedelta(hours=5)), [0])
+
+    def test_immediate_deactivation_frees_layer_of_earlier_immediate_activation(self):
+        allocator = static_image_overlay.LayerAllocator.from_schedule([activate('Logo', 0), deactivate('LogoOff', 0)])
+        self.assertEqual(allocator.occupied_layers(NOW + timedelta(hours=5)), [])
+        self.assertEqual(allocator.first_free_layer(NOW, None), 0)
+
+    def test_immediate_deactivation_before_activation_does_not_end_it(self):
+        allocator = static_image_overlay.LayerAllocator.from_schedule([deactivate('LogoOff', 0), activate('Logo', 0)])
+        self.assertEqual(allocator.occupied_layers(NOW), [0])
+
+    def test_immediate_activation_ends_at_later_fixed_deactivation(self):
+        off = NOW + timedelta(minutes=10)
+        intervals = static_image_overlay.get_overlay_intervals([activate('Logo', 0), deactivate('LogoOff', 0, off)])
+        self.assertEqual(intervals[0].end, off)
+
+    def test_fixed_activation_ends_after_duration(self):
+        intervals = static_image_overlay.get_overlay_intervals([activate('Logo', 1, NOW, duration=30000)])
+        self.assertEqual(intervals[0].end, NOW + timedelta(seconds=30))
+
+    def test_allocator_skips_occupied_layers(self):
+        allocator = static_image_overlay.LayerAllocator.from_schedule([activate('Logo', 0), deactivate('Off', 1)])
+        self.assertEqual(allocator.allocate('Next', NOW, NOW + timedelta(minutes=1)), 1)
+        with self.assertRaises(static_image_overlay.OverlayError):
+            allocator.allocate('Clash', NOW, NOW + timedelta(minutes=1), layer=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
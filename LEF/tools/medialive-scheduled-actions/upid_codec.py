@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+
+#######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+#  with the License. A copy of the License is located at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  or in the 'license' file accompanying this file. This file is distributed on an 'AS IS' BASIS, WITHOUT WARRANTIES
+#  OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions
+#  and limitations under the License.
+#######################################################################################################################
+
+"""
+Byte exact encoding and decoding of SCTE-35 segmentation UPIDs.
+
+Supported UPID types (SCTE-35 table 22):
+
+- Ad-ID (0x03): 12 ASCII characters, e.g. ABCD0001000H
+- TI (0x08): 64-bit Turner Identifier, given as a decimal or 0x prefixed integer
+- EIDR (0x0A): 12 bytes, the 16-bit DOI prefix suffix (5240 for 10.5240) followed by the 80-bit
+  binary form of the 20 hex digit suffix. The ISO 7064 Mod 37,36 check character is verified when
+  given and regenerated when decoding.
+- MPU (0x0C): 32-bit format_identifier followed by private data, written as FORMAT:HEXDATA
+  (e.g. CUEI:0000000012345678)
+- URI (0x0F): ASCII URI
+
+Encoded UPIDs are returned as scte35_builder.Upid values ready for segmentation descriptors.
+encode_batch() converts catalogue sized lists of IDs in a single pass, collecting errors per ID
+instead of stopping at the first invalid one. Running this module converts a file of IDs:
+
+    python3 upid_codec.py --type eidr ids.txt
+    python3 upid_codec.py --type eidr --decode hex_upids.txt
+"""
+
+import argparse
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from scte35_builder import SpliceValidationError, Upid, UpidType
+
+AD_ID_PATTERN = re.compile(r'^[A-Za-z0-9]{12}$')
+EIDR_PATTERN = re.compile(r'^10\.(\d{1,5})/([0-9A-Fa-f]{4}(?:-[0-9A-Fa-f]{4}){4})(?:-([0-9A-Za-z]))?$')
+MPU_PATTERN = re.compile(r'^([\x20-\x7e]{4}|0x[0-9A-Fa-f]{8}):([0-9A-Fa-f]*)$')
+URI_PATTERN = re.compile(r'^[\x21-\x7e]+$')
+CHECK_ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+EIDR_LENGTH_BYTES = 12
+TI_LENGTH_BYTES = 8
+
+
+class UpidError(SpliceValidationError):
+    """Raised when an ID cannot be encoded as, or decoded from, a UPID"""
+    pass
+
+
+def eidr_check_character(suffix: str) -> str:
+    """ISO 7064 Mod 37,36 check character of an EIDR suffix (hyphens are ignored)"""
+    product = 36
+    for character in suffix.replace('-', '').upper():
+        total = (product + CHECK_ALPHABET.index(character)) % 36 or 36
+        product = (total * 2) % 37
+    return CHECK_ALPHABET[(37 - product) % 36]
+
+
+def encode_ad_id(value: str) -> Upid:
+    if not AD_ID_PATTERN.match(value):
+        raise UpidError(f"Ad-ID '{value}' must be 12 alphanumeric characters")
+    return Upid(UpidType.AD_ID, value.encode('ascii').hex().upper())
+
+
+def encode_ti(value: Union[int, str]) -> Upid:
+    try:
+        number = value if isinstance(value, int) else int(str(value), 0)
+    except ValueError:
+        raise UpidError(f"TI '{value}' is not an integer")
+    if not 0 <= number < 1 << (8 * TI_LENGTH_BYTES):
+        raise UpidError(f"TI '{value}' is outside the 64-bit range")
+    return Upid(UpidType.TI, f"{number:016X}")
+
+
+def encode_eidr(value: str) -> Upid:
+    match = EIDR_PATTERN.match(value.strip())
+    if not match:
+        raise UpidError(f"EIDR '{value}' must look like 10.5240/XXXX-XXXX-XXXX-XXXX-XXXX-C")
+    prefix, suffix, check = match.groups()
+    if int(prefix) > 0xFFFF:
+        raise UpidError(f"EIDR '{value}' has a DOI prefix larger than 16 bits")
+    if check is not None and check.upper() != eidr_check_character(suffix):
+        raise UpidError(f"EIDR '{value}' has an invalid check character "
+                        f"(expected {eidr_check_character(suffix)})")
+    return Upid(UpidType.EIDR, f"{int(prefix):04X}{suffix.replace('-', '').upper()}")
+
+
+def encode_mpu(value: str) -> Upid:
+    match = MPU_PATTERN.match(value)
+    if not match or len(match.group(2)) % 2:
+        raise UpidError(f"MPU '{value}' must be FORMAT:HEXDATA with a 4 character or 0x format identifier")
+    format_identifier, data = match.groups()
+    if format_identifier.startswith('0x'):
+        identifier_hex = format_identifier[2:]
+    else:
+        identifier_hex = format_identifier.encode('ascii').hex()
+    return Upid(UpidType.MPU, (identifier_hex + data).upper())
+
+
+def encode_uri(value: str) -> Upid:
+    if not URI_PATTERN.match(value):
+        raise UpidError(f"URI '{value}' must be printable ASCII without spaces")
+    return Upid(UpidType.URI, value.encode('ascii').hex().upper())
+
+
+def _decode_ascii(upid: Upid) -> str:
+    try:
+        return bytes.fromhex(upid.value).decode('ascii')
+    except (ValueError, UnicodeDecodeError):
+        raise UpidError(f"UPID '{upid.value}' is not ASCII")
+
+
+def decode_ad_id(upid: Upid) -> str:
+    value = _decode_ascii(upid)
+    if not AD_ID_PATTERN.match(value):
+        raise UpidError(f"UPID '{upid.value}' is not a valid Ad-ID")
+    return value
+
+
+def decode_ti(upid: Upid) -> str:
+    if len(upid.value) != 2 * TI_LENGTH_BYTES:
+        raise UpidError(f"TI UPID '{upid.value}' must be {TI_LENGTH_BYTES} bytes")
+    return str(int(upid.value, 16))
+
+
+def decode_eidr(upid: Upid) -> str:
+    if len(upid.value) != 2 * EIDR_LENGTH_BYTES:
+        raise UpidError(f"EIDR UPID '{upid.value}' must be {EIDR_LENGTH_BYTES} bytes")
+    digits = upid.value[4:].upper()
+    suffix = '-'.join(digits[i:i + 4] for i in range(0, 20, 4))
+    return f"10.{int(upid.value[:4], 16)}/{suffix}-{eidr_check_character(suffix)}"
+
+
+def decode_mpu(upid: Upid) -> str:
+    if len(upid.value) < 8:
+        raise UpidError(f"MPU UPID '{upid.value}' is shorter than its format identifier")
+    identifier = bytes.fromhex(upid.value[:8])
+    if all(0x20 <= byte <= 0x7e for byte in identifier):
+        format_identifier = identifier.decode('ascii')
+    else:
+        format_identifier = '0x' + upid.value[:8].upper()
+    return f"{format_identifier}:{upid.value[8:].upper()}"
+
+
+def decode_uri(upid: Upid) -> str:
+    value = _decode_ascii(upid)
+    if not URI_PATTERN.match(value):
+        raise UpidError(f"UPID '{upid.value}' is not a valid URI")
+    return value
+
+
+ENCODERS: Dict[int, Callable[[str], Upid]] = {
+    UpidType.AD_ID: encode_ad_id,
+    UpidType.TI: encode_ti,
+    UpidType.EIDR: encode_eidr,
+    UpidType.MPU: encode_mpu,
+    UpidType.URI: encode_uri,
+}
+
+DECODERS: Dict[int, Callable[[Upid], str]] = {
+    UpidType.AD_ID: decode_ad_id,
+    UpidType.TI: decode_ti,
+    UpidType.EIDR: decode_eidr,
+    UpidType.MPU: decode_mpu,
+    UpidType.URI: decode_uri,
+}
+
+TYPE_NAMES = {
+    'ad-id': UpidType.AD_ID,
+    'ti': UpidType.TI,
+    'eidr': UpidType.EIDR,
+    'mpu': UpidType.MPU,
+    'uri': UpidType.URI,
+}
+
+
+def _get_codec(table: Dict[int, Callable], upid_type: int) -> Callable:
+    try:
+        return table[upid_type]
+    except KeyError:
+        raise UpidError(f"UPID type {upid_type:#04x} is not supported")
+
+
+def canonical_form(upid_type: int, value: str) -> str:
+    """Textual form produced by decoding, used to compare IDs written in different ways"""
+    return decode_upid(encode_upid(upid_type, value))
+
+
+def encode_upid(upid_type: int, value: str, verify: bool = False) -> Upid:
+    """
+    Encode a textual ID as a UPID of the given type.
+
+    Args:
+        upid_type: SCTE-35 segmentation_upid_type
+        value: ID in the textual form described in the module docstring
+        verify: Decode the result and check it re-encodes to the same bytes
+
+    Raises:
+        UpidError: If the ID is invalid for the type or does not survive a round trip
+    """
+    upid = _get_codec(ENCODERS, upid_type)(value)
+    upid.validate()
+    if verify:
+        decoded = decode_upid(upid)
+        if _get_codec(ENCODERS, upid_type)(decoded) != upid:
+            raise UpidError(f"'{value}' does not round trip through UPID type {upid_type:#04x} ('{decoded}')")
+    return upid
+
+
+def decode_upid(upid: Upid) -> str:
+    """Decode a UPID into its textual form"""
+    upid.validate()
+    return _get_codec(DECODERS, upid.upid_type)(upid)
+
+
+@dataclass
+class BatchResult:
+    """UPIDs encoded from a list of IDs. Entries that failed are None and have an error by index."""
+    upids: List[Optional[Upid]] = field(default_factory=list)
+    errors: Dict[int, str] = field(default_factory=dict)
+
+
+def encode_batch(upid_type: int, values: Iterable[str], verify: bool = True) -> BatchResult:
+    """Encode many IDs of one type, resolving the codec once and collecting errors per ID"""
+    encoder = _get_codec(ENCODERS, upid_type)
+    decoder = _get_codec(DECODERS, upid_type)
+    result = BatchResult()
+    for index, value in enumerate(values):
+        try:
+            upid = encoder(value)
+            upid.validate()
+            if verify and encoder(decoder(upid)) != upid:
+                raise UpidError(f"'{value}' does not round trip")
+            result.upids.append(upid)
+        except SpliceValidationError as e:
+            result.upids.append(None)
+            result.errors[index] = str(e)
+    return result
+
+
+@dataclass(frozen=True)
+class DecodedUpid:
+    """Textual form of a decoded UPID"""
+    upid_type: int
+    text: str
+
+
+@dataclass
+class DecodeBatchResult:
+    """IDs decoded from a list of UPIDs. Entries that failed are None and have an error by index."""
+    ids: List[Optional[DecodedUpid]] = field(default_factory=list)
+    errors: Dict[int, str] = field(default_factory=dict)
+
+
+def decode_batch(upid_type: int, hex_values: Iterable[str]) -> DecodeBatchResult:
+    """Decode many hexadecimal UPIDs of one type, resolving the codec once and collecting errors per UPID"""
+    decoder = _get_codec(DECODERS, upid_type)
+    result = DecodeBatchResult()
+    for index, value in enumerate(hex_values):
+        try:
+            upid = Upid(upid_type, value)
+            upid.validate()
+            result.ids.append(DecodedUpid(upid_type, decoder(upid)))
+        except SpliceValidationError as e:
+            result.ids.append(None)
+            result.errors[index] = str(e)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert IDs to and from SCTE-35 segmentation UPIDs.')
+    parser.add_argument('--type', required=True, choices=sorted(TYPE_NAMES), help='UPID type')
+    parser.add_argument('--decode', action='store_true', help='Decode hexadecimal UPIDs instead of encoding IDs')
+    parser.add_argument('path', nargs='?', help='File with one ID per line (default: standard input)')
+    args = parser.parse_args()
+
+    source = open(args.path, 'r') if args.path else sys.stdin
+    with source:
+        values = [line.strip() for line in source if line.strip()]
+
+    upid_type = TYPE_NAMES[args.type]
+    if args.decode:
+        result = decode_batch(upid_type, values)
+        outputs = [decoded.text if decoded else None for decoded in result.ids]
+    else:
+        result = encode_batch(upid_type, values)
+        outputs = [upid.value if upid else None for upid in result.upids]
+
+    for index, value in enumerate(values):
+        if outputs[index] is None:
+            print(f"{value},ERROR: {result.errors[index]}", file=sys.stderr)
+        else:
+            print(f"{value},{outputs[index]}")
+    sys.exit(1 if result.errors else 0)
+
+
+if __name__ == "__main__":
+    main()